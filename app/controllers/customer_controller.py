@@ -2,7 +2,7 @@ from app.models.customers import CustomersModel
 from app.utils.event_system import global_event_system
 
 class CustomerController:
-    def __init__(self, db_conn):
+    def __init__(self, db_conn=None):
         self.model = CustomersModel(db_conn)
 
     def add_customer(self, **kwargs):
@@ -15,6 +15,9 @@ class CustomerController:
     def get_customers(self, search=None):
         return self.model.get_customers(search)
 
+    def get_customers_page(self, search=None, after=None, page_size=50):
+        return self.model.get_customers_page(search, after, page_size)
+
     def update_customer(self, customer_id, **kwargs):
         result = self.model.update_customer(customer_id, **kwargs)
         # Notify the event system about the customer update
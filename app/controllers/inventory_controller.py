@@ -7,7 +7,7 @@ from app.utils.database import DatabaseManager
 from app.utils.logger import Logger
 logger = Logger()
 from app.utils.event_system import global_event_system
-from app.utils.cache_manager import global_cache
+from app.utils.cache_manager import global_cache, cached, uncached
 from app.models.inventory import FirebaseInventoryTableModel
 from app.core.inventory import InventoryManager
 import attr
@@ -36,6 +36,20 @@ class InventoryController:
     def refresh_data(self):
         self.model.refresh()
 
+    def load_inventory_data(self):
+        """Products and summary totals for the inventory view; safe to call off the GUI thread."""
+        return {
+            'products': self.manager.list_products(),
+            'stock': self.manager.count_total_stock(),
+            'low': self.manager.count_low_stock(),
+            'recent': self.count_recent_items(),
+            'value': self.manager.calculate_inventory_value(),
+        }
+
+    def apply_inventory_data(self, data):
+        """Show products loaded by load_inventory_data in the table model."""
+        self.model.set_products(data.get('products', []))
+
     def add_product(self, *args, **kwargs):
         if args:
             raise ValueError("add_product only accepts named arguments (use name=..., quantity=..., etc.)")
@@ -61,6 +75,7 @@ class InventoryController:
         product_data = {k: kwargs.get(k, getattr(Product, k, '')) for k in Product.__annotations__.keys()}
         try:
             prod_id = self.data_provider.add_product(product_data)
+            self._invalidate_caches()
             return prod_id
         except Exception as e:
             logger.error(f"Data provider error on add_product: {e}")
@@ -70,8 +85,7 @@ class InventoryController:
         return self.data_provider.get_products()
 
     def get_product(self, name):
-        products = self.data_provider.get_products()
-        for prod in products:
+        for prod in self.data_provider.iter_products():
             if prod.get('name') == name:
                 return prod
         return None
@@ -81,6 +95,7 @@ class InventoryController:
         for prod in self.data_provider.products:
             if prod.get('name') == name:
                 self.data_provider.products.remove(prod)
+                self._invalidate_caches()
                 return True
         return False
 
@@ -89,6 +104,7 @@ class InventoryController:
         for prod in self.data_provider.products:
             if prod.get('name') == name:
                 prod.update(kwargs)
+                self._invalidate_caches()
                 return True
         return False
 
@@ -98,6 +114,7 @@ class InventoryController:
             product_id = self.model.data(self.model.index(row, 0))
             product_name = self.model.data(self.model.index(row, 1))
             result = self.model.removeRow(row)
+            self._invalidate_caches()
             self.refresh_data()
             # Emit inventory update event for real-time sync
             if result:
@@ -127,6 +144,7 @@ class InventoryController:
                     elif key == "selling_price":
                         idx = self.model.index(row, 6)
                         self.model.setData(idx, value, Qt.EditRole)
+            self._invalidate_caches()
             self.refresh_data()
             # Emit inventory update event for real-time sync
             global_event_system.notify_inventory_update({"action": "update", "product": updated_data})
@@ -138,6 +156,7 @@ class InventoryController:
     def insert_item(self, row, item_data):
         try:
             result = self.model.insertRow(row, item_data=item_data)
+            self._invalidate_caches()
             self.refresh_data()
             # Emit inventory update event for real-time sync
             if result:
@@ -147,21 +166,23 @@ class InventoryController:
             logger.error(f"Error inserting product: {e}")
             return False
 
+    @cached(namespace="inventory", ttl=300, invalidate_on=("inventory_updated",))
     def count_total_stock(self):
         try:
             products = self.manager.list_products()
             return sum((getattr(p, 'quantity', getattr(p, 'stock', 0)) or 0) for p in products)
         except Exception as e:
             logger.error(f"Error counting total stock: {e}")
-            return 0
+            return uncached(0)
 
+    @cached(namespace="inventory", ttl=300, invalidate_on=("inventory_updated",))
     def count_low_stock(self, threshold=10):
         try:
             products = self.manager.list_products()
             return sum(1 for p in products if (getattr(p, 'quantity', getattr(p, 'stock', 0)) or 0) < threshold)
         except Exception as e:
             logger.error(f"Error counting low stock: {e}")
-            return 0
+            return uncached(0)
 
     def count_recent_items(self, days=7):
         from datetime import datetime, timedelta
@@ -183,14 +204,16 @@ class InventoryController:
             logger.error(f"Error counting recent items: {e}")
             return 0
 
+    @cached(namespace="inventory", ttl=300, invalidate_on=("inventory_updated",))
     def calculate_inventory_value(self):
         try:
             products = self.manager.list_products()
-            return sum((getattr(p, 'quantity', getattr(p, 'stock', 0)) or 0) * (getattr(p, 'buying_price', getattr(p, 'cost_price', 0.0)) or 0.0) for p in products)
+            return sum((getattr(p, 'stock', 0) or 0) * (getattr(p, 'cost', 0.0) or 0.0) for p in products)
         except Exception as e:
             logger.error(f"Error calculating inventory value: {e}")
-            return 0.0
+            return uncached(0.0)
 
+    @cached(namespace="inventory", ttl=300, invalidate_on=("inventory_updated",))
     def get_all_categories(self):
         try:
             products = self.manager.list_products()
@@ -198,18 +221,21 @@ class InventoryController:
             return sorted(categories | {"Electronics", "Food", "Clothing", "Other"})
         except Exception as e:
             logger.error(f"Error getting categories: {e}")
-            return ["Electronics", "Food", "Clothing", "Other"]
+            return uncached(["Electronics", "Food", "Clothing", "Other"])
 
     def delete_category(self, category_name):
         try:
-            products = self.manager.list_products()
-            count = 0
-            for p in products:
-                if getattr(p, 'category', 'Other') == category_name:
-                    self.manager.update_product(getattr(p, 'id', getattr(p, 'item_id', None)), {"category": "Other"})
-                    count += 1
+            products = self.manager.list_products(category=category_name)
+            # One multi-location update for the whole category instead of a request per product
+            result = self.manager.update_products({
+                getattr(p, 'id', getattr(p, 'item_id', None)): {"category": "Other"}
+                for p in products if getattr(p, 'category', 'Other') == category_name
+            })
+            if result.failed:
+                logger.error(f"Could not move {len(result.keys(result.failed))} products out of {category_name}")
+            self._invalidate_caches()
             self.refresh_data()
-            return True, count
+            return result.ok, len(result.keys())
         except Exception as e:
             logger.error(f"Error deleting category: {e}")
             return False, 0
@@ -232,11 +258,11 @@ class InventoryController:
                     row = [
                         getattr(p, 'id', getattr(p, 'item_id', '')),
                         getattr(p, 'name', ''),
-                        getattr(p, 'details', getattr(p, 'description', '')),
+                        getattr(p, 'description', ''),
                         getattr(p, 'category', 'Other'),
                         quantity,
-                        getattr(p, 'buying_price', getattr(p, 'cost_price', 0.0)),
-                        getattr(p, 'selling_price', 0.0)
+                        getattr(p, 'cost', 0.0),
+                        getattr(p, 'price', 0.0)
                     ]
                     writer.writerow(row)
                     count += 1
@@ -250,12 +276,9 @@ class InventoryController:
         self.model.setFilter(f"name LIKE '%{query}%'")
         self.model.select()
 
+    @cached(namespace="inventory", ttl=300, invalidate_on=("inventory_updated",))
     def count_medium_stock(self, min_threshold=11, max_threshold=50):
         """Counts items with stock between the specified thresholds."""
-        cache_key = f"inventory:medium_stock:{min_threshold}_{max_threshold}"
-        cached_value = global_cache.get(cache_key)
-        if cached_value is not None:
-            return cached_value
         medium = 0
         for row in range(self.model.rowCount()):
             stock = self.model.data(self.model.index(row, 4))
@@ -265,15 +288,11 @@ class InventoryController:
                     medium += 1
             except (ValueError, TypeError):
                 print(f"Warning: Invalid stock at row {row}: {stock}")
-        global_cache.set(cache_key, medium, ttl_seconds=300)
         return medium
 
+    @cached(namespace="inventory", ttl=300, invalidate_on=("inventory_updated",))
     def count_high_stock(self, threshold=50):
         """Counts items with stock above the specified threshold."""
-        cache_key = f"inventory:high_stock:{threshold}"
-        cached_value = global_cache.get(cache_key)
-        if cached_value is not None:
-            return cached_value
         high = 0
         for row in range(self.model.rowCount()):
             stock = self.model.data(self.model.index(row, 4))
@@ -283,15 +302,11 @@ class InventoryController:
                     high += 1
             except (ValueError, TypeError):
                 print(f"Warning: Invalid stock at row {row}: {stock}")
-        global_cache.set(cache_key, high, ttl_seconds=300)
         return high
 
+    @cached(namespace="inventory", ttl=300, invalidate_on=("inventory_updated",))
     def get_low_stock_items(self, threshold=10):
         """Returns a list of items with stock below the specified threshold."""
-        cache_key = f"inventory:low_stock_items:{threshold}"
-        cached_value = global_cache.get(cache_key)
-        if cached_value is not None:
-            return cached_value
         low_stock_items = []
         for row in range(self.model.rowCount()):
             item_id = self.model.data(self.model.index(row, 0))
@@ -309,7 +324,6 @@ class InventoryController:
                     })
             except (ValueError, TypeError):
                 print(f"Warning: Invalid stock at row {row}: {stock}")
-        global_cache.set(cache_key, low_stock_items, ttl_seconds=300)
         return low_stock_items
 
     def get_product_details(self, row):
@@ -326,7 +340,7 @@ class InventoryController:
         error_count = 0
         
         try:
-            with open(filepath, newline='', encoding='utf-8') as csvfile:
+            with open(filepath, newline='', encoding='utf-8') as csvfile, global_event_system.batch():
                 reader = csv.DictReader(csvfile)
                 for row in reader:
                     try:
@@ -346,6 +360,9 @@ class InventoryController:
                         print(f"Warning: Error processing row: {row} - {str(e)}")
                         error_count += 1
                         
+                if success_count:
+                    global_event_system.notify_inventory_update({"action": "bulk_upload", "count": success_count})
+
             print(f"Bulk upload completed. Success: {success_count}, Errors: {error_count}")
             return True, success_count, error_count
         except Exception as e:
@@ -360,17 +377,4 @@ class InventoryController:
 
     def _invalidate_caches(self):
         """Invalidate all inventory-related caches when data changes"""
-        global_cache.delete("inventory:total_stock")
-        global_cache.delete("inventory:total_value")
-        global_cache.delete("inventory:categories")
-        
-        # Delete low stock caches with different thresholds
-        for i in range(1, 21):  # Common threshold values
-            global_cache.delete(f"inventory:low_stock:{i}")
-            global_cache.delete(f"inventory:low_stock_items:{i}")
-            global_cache.delete(f"inventory:high_stock:{i*5}")  # Common high stock thresholds
-            
-        # Delete medium stock caches with common threshold ranges
-        common_ranges = [(1, 10), (5, 20), (10, 50), (11, 50), (10, 100)]
-        for min_val, max_val in common_ranges:
-            global_cache.delete(f"inventory:medium_stock:{min_val}_{max_val}")
\ No newline at end of file
+        global_cache.invalidate_tag("inventory")
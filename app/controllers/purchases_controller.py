@@ -1,7 +1,7 @@
 from app.models.purchases import PurchasesModel
 
 class PurchasesController:
-    def __init__(self, db_conn):
+    def __init__(self, db_conn=None):
         self.model = PurchasesModel(db_conn)
 
     def add_purchase(self, customer_id, product, quantity, price, total, date):
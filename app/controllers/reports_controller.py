@@ -1,11 +1,46 @@
 from app.utils.database import DatabaseManager
 from app.utils.pdf_generator import PDFGenerator
 from app.utils.logger import Logger
-from datetime import datetime, timedelta
+from app.utils.cache_manager import cached, uncached
+from app.models.sales_rollup import rollup_source
+from datetime import date, datetime, timedelta
 import os
+import pandas as pd
 
 logger = Logger()
 
+# Report figures are cached until the data behind them changes
+REPORT_EVENTS = ("sales_updated", "inventory_updated", "customer_updated")
+
+
+def _no_error(result):
+    return not (isinstance(result, dict) and "error" in result)
+
+
+def _month_starts(months, today=None):
+    """First day of each of the last N calendar months, oldest first, ending with the current one"""
+    today = today or date.today()
+    current = today.year * 12 + today.month - 1
+    return [date(m // 12, m % 12 + 1, 1) for m in range(current - months + 1, current + 1)]
+
+
+def _next_month(day):
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def _month_labels(starts):
+    # Add the year once the chart spans more than a year
+    return [start.strftime('%b' if len(starts) <= 12 else '%b %y') for start in starts]
+
+
+def _resample_monthly(dates, values, starts):
+    """Sum values into the calendar months in starts; unparseable dates are dropped"""
+    days = pd.Series([str(d)[:10] if d else None for d in dates], dtype=object)
+    series = pd.Series(values, index=pd.to_datetime(days, format='%Y-%m-%d', errors='coerce'), dtype=float)
+    series = series[series.index.notna()]
+    monthly = series.resample('MS').sum()
+    return monthly.reindex(pd.DatetimeIndex(starts), fill_value=0).tolist()
+
 class ReportsController:
     """
     Controller to handle all report generation and data retrieval functionality
@@ -19,6 +54,7 @@ class ReportsController:
         """Return the path to the reports directory"""
         return PDFGenerator.get_reports_dir()
         
+    @cached(namespace="reports", ttl=300, invalidate_on=REPORT_EVENTS, cache_if=_no_error)
     def get_sales_summary(self, period="last_30_days"):
         """
         Get sales summary data for a specified period
@@ -34,37 +70,34 @@ class ReportsController:
             if hasattr(self.db, 'execute_query'):
                 end_date = datetime.now()
                 
+                # Whole days, today included
                 if period == "today":
-                    start_date = end_date.replace(hour=0, minute=0, second=0, microsecond=0)
+                    start_date = end_date
                 elif period == "last_7_days":
-                    start_date = end_date - timedelta(days=7)
+                    start_date = end_date - timedelta(days=6)
                 elif period == "last_30_days":
-                    start_date = end_date - timedelta(days=30)
+                    start_date = end_date - timedelta(days=29)
                 elif period == "this_month":
-                    start_date = end_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+                    start_date = end_date.replace(day=1)
                 elif period == "this_year":
-                    start_date = end_date.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+                    start_date = end_date.replace(month=1, day=1)
                 else:
                     # Default to last 30 days
-                    start_date = end_date - timedelta(days=30)
-                    
-                # Convert to string format for SQLite
-                start_date_str = start_date.strftime("%Y-%m-%d %H:%M:%S")
-                end_date_str = end_date.strftime("%Y-%m-%d %H:%M:%S")
+                    start_date = end_date - timedelta(days=29)
                 
-                # Get sales data from database
-                query = """
+                # Sum the daily rollup rather than scanning sales
+                query = f"""
                     SELECT 
-                        SUM(total_amount) as total_sales, 
-                        COUNT(*) as total_orders,
-                        AVG(total_amount) as average_order_value
-                    FROM sales
-                    WHERE sale_date BETWEEN ? AND ?
+                        TOTAL(revenue) as total_sales, 
+                        TOTAL(sale_count) as total_orders
+                    FROM {rollup_source(DatabaseManager.get_sqlite_connection())}
+                    WHERE day BETWEEN ? AND ?
                 """
                 
-                sales_data = self.db.execute_query(query, (start_date_str, end_date_str))
+                sales_data = self.db.execute_query(
+                    query, (start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")), timed=True)
                 
-                if not sales_data or not sales_data[0][0]:
+                if not sales_data or not sales_data[0][1]:
                     # No sales data found for the period
                     return {
                         "total_sales": 0,
@@ -76,7 +109,7 @@ class ReportsController:
                 # Process data
                 total_sales = float(sales_data[0][0])
                 total_orders = int(sales_data[0][1])
-                average_order = float(sales_data[0][2]) if sales_data[0][2] else 0
+                average_order = total_sales / total_orders
                 
                 return {
                     "total_sales": total_sales,
@@ -106,6 +139,7 @@ class ReportsController:
                 "error": str(e)
             }
     
+    @cached(namespace="reports", ttl=300, invalidate_on=REPORT_EVENTS, cache_if=_no_error)
     def get_inventory_value(self):
         """
         Calculate the total inventory value
@@ -119,11 +153,11 @@ class ReportsController:
                 query = """
                     SELECT 
                         COUNT(*) as total_items,
-                        SUM(stock * buying_price) as total_value,
-                        SUM(CASE WHEN stock < 5 THEN 1 ELSE 0 END) as low_stock_items
-                    FROM inventory
+                        SUM(stock_quantity * buying_price) as total_value,
+                        SUM(CASE WHEN stock_quantity < 5 THEN 1 ELSE 0 END) as low_stock_items
+                    FROM products
                 """
-                inventory_data = self.db.execute_query(query)
+                inventory_data = self.db.execute_query(query, timed=True)
                 
                 if not inventory_data:
                     return {
@@ -135,7 +169,7 @@ class ReportsController:
                 # Process data
                 total_items = int(inventory_data[0][0])
                 total_value = float(inventory_data[0][1]) if inventory_data[0][1] else 0
-                low_stock_items = int(inventory_data[0][2])
+                low_stock_items = int(inventory_data[0][2] or 0)
                 
                 return {
                     "total_value": total_value,
@@ -164,6 +198,7 @@ class ReportsController:
                 "error": str(e)
             }
     
+    @cached(namespace="reports", ttl=300, invalidate_on=REPORT_EVENTS, cache_if=_no_error)
     def get_profit_summary(self, period="last_30_days"):
         """
         Calculate profit summary for a specified period
@@ -305,12 +340,12 @@ class ReportsController:
             # Get all inventory items
             query = """
                 SELECT 
-                    id, name, category, stock, buying_price, selling_price, last_updated 
-                FROM inventory
+                    id, name, category, stock_quantity, buying_price, selling_price
+                FROM products
                 ORDER BY category, name
             """
             
-            inventory_items = self.db.execute_query(query)
+            inventory_items = self.db.execute_query(query, timed=True)
             
             if not inventory_items:
                 logger.warning("No inventory items found for report")
@@ -325,8 +360,7 @@ class ReportsController:
                     "category": item[2],
                     "stock": item[3],
                     "buying_price": item[4],
-                    "selling_price": item[5],
-                    "last_updated": item[6]
+                    "selling_price": item[5]
                 })
                 
             # Generate PDF
@@ -338,39 +372,47 @@ class ReportsController:
             logger.error(f"Error generating inventory report: {str(e)}")
             return None
 
+    @cached(namespace="reports", ttl=300, invalidate_on=REPORT_EVENTS)
     def get_monthly_sales(self, months=6):
-        """Return sales totals for the last N months as (labels, values)"""
+        """Return sales totals for the last N calendar months as (labels, values), newest first"""
         try:
-            now = datetime.now()
-            labels = []
-            values = []
-            for i in range(months-1, -1, -1):
-                month = (now.replace(day=1) - timedelta(days=30*i)).strftime('%b')
-                labels.append(month)
-                start = (now.replace(day=1) - timedelta(days=30*i)).replace(day=1)
-                end = (start + timedelta(days=32)).replace(day=1) - timedelta(seconds=1)
-                query = """
-                    SELECT SUM(total_amount) FROM sales WHERE sale_date BETWEEN ? AND ?
+            starts = _month_starts(months)
+            # If using SQL
+            if hasattr(self.db, 'execute_query'):
+                query = f"""
+                    SELECT strftime('%Y-%m', day) AS month, SUM(revenue)
+                    FROM {rollup_source(DatabaseManager.get_sqlite_connection())}
+                    WHERE day >= ? AND day < ?
+                    GROUP BY month
                 """
-                result = self.db.execute_query(query, (start.strftime('%Y-%m-%d %H:%M:%S'), end.strftime('%Y-%m-%d %H:%M:%S')))
-                values.append(float(result[0][0]) if result and result[0][0] else 0)
-            return labels[::-1], values[::-1]
+                result = self.db.execute_query(
+                    query, (starts[0].isoformat(), _next_month(starts[-1]).isoformat()), timed=True)
+                totals = {row[0]: float(row[1] or 0) for row in result}
+                values = [totals.get(start.strftime('%Y-%m'), 0) for start in starts]
+            # If using Firebase
+            else:
+                from app.core.sales import SalesManager
+                days = SalesManager(None).ledger.daily_totals(
+                    starts[0].isoformat(), (_next_month(starts[-1]) - timedelta(days=1)).isoformat())
+                values = _resample_monthly([d['date'] for d in days], [d['amount'] for d in days], starts)
+            return _month_labels(starts)[::-1], values[::-1]
         except Exception as e:
             logger.error(f"Error getting monthly sales: {str(e)}")
-            return ["Jan", "Feb", "Mar", "Apr", "May", "Jun"], [0,0,0,0,0,0]
+            return uncached((["Jan", "Feb", "Mar", "Apr", "May", "Jun"], [0,0,0,0,0,0]))
 
+    @cached(namespace="reports", ttl=300, invalidate_on=REPORT_EVENTS)
     def get_sales_by_category(self):
         """Return sales by category as (labels, values)"""
         try:
             # If using SQL
             if hasattr(self.db, 'execute_query'):
                 query = """
-                    SELECT i.category, SUM(s.total_amount)
-                    FROM sales s
-                    LEFT JOIN inventory i ON s.inventory_id = i.id
-                    GROUP BY i.category
+                    SELECT p.category, SUM(si.subtotal)
+                    FROM sale_items si
+                    LEFT JOIN products p ON si.product_id = p.id
+                    GROUP BY p.category
                 """
-                result = self.db.execute_query(query)
+                result = self.db.execute_query(query, timed=True)
                 labels = [row[0] if row[0] is not None else 'Unknown' for row in result]
                 values = [float(row[1]) for row in result]
                 return labels, values
@@ -392,29 +434,38 @@ class ReportsController:
                 return labels, values
         except Exception as e:
             logger.error(f"Error getting sales by category: {str(e)}")
-            return ["Unknown"], [0]
+            return uncached((["Unknown"], [0]))
 
+    @cached(namespace="reports", ttl=300, invalidate_on=REPORT_EVENTS)
     def get_customer_growth(self, months=6):
-        """Return customer count for the last N months as (labels, values)"""
+        """Return new customers in each of the last N calendar months as (labels, values), newest first"""
         try:
-            now = datetime.now()
-            labels = []
-            values = []
-            for i in range(months-1, -1, -1):
-                month = (now.replace(day=1) - timedelta(days=30*i)).strftime('%b')
-                labels.append(month)
-                start = (now.replace(day=1) - timedelta(days=30*i)).replace(day=1)
-                end = (start + timedelta(days=32)).replace(day=1) - timedelta(seconds=1)
+            starts = _month_starts(months)
+            # If using SQL
+            if hasattr(self.db, 'execute_query'):
                 query = """
-                    SELECT COUNT(*) FROM customers WHERE created_at BETWEEN ? AND ?
+                    SELECT strftime('%Y-%m', created_at) AS month, COUNT(*)
+                    FROM customers
+                    WHERE created_at >= ? AND created_at < ?
+                    GROUP BY month
                 """
-                result = self.db.execute_query(query, (start.strftime('%Y-%m-%d %H:%M:%S'), end.strftime('%Y-%m-%d %H:%M:%S')))
-                values.append(int(result[0][0]) if result and result[0][0] else 0)
-            return labels[::-1], values[::-1]
+                result = self.db.execute_query(
+                    query, (starts[0].isoformat(), _next_month(starts[-1]).isoformat()), timed=True)
+                counts = {row[0]: int(row[1]) for row in result}
+                values = [counts.get(start.strftime('%Y-%m'), 0) for start in starts]
+            # If using Firebase
+            else:
+                from app.ui.firebase_utils import get_db
+                from app.utils.firebase_replica import FirebaseReplica
+                customers = FirebaseReplica.for_reference(get_db().child('customers')).values()
+                joined = [c.get('created_at') or c.get('joined') for c in customers if isinstance(c, dict)]
+                values = [int(v) for v in _resample_monthly(joined, [1] * len(joined), starts)]
+            return _month_labels(starts)[::-1], values[::-1]
         except Exception as e:
             logger.error(f"Error getting customer growth: {str(e)}")
-            return ["Jan", "Feb", "Mar", "Apr", "May", "Jun"], [0,0,0,0,0,0]
+            return uncached((["Jan", "Feb", "Mar", "Apr", "May", "Jun"], [0,0,0,0,0,0]))
 
+    @cached(namespace="reports", ttl=300, invalidate_on=REPORT_EVENTS)
     def get_inventory_by_category(self):
         """Return inventory stats per category: name, value, low, out, in, count"""
         try:
@@ -422,20 +473,20 @@ class ReportsController:
             if hasattr(self.db, 'execute_query'):
                 query = """
                     SELECT category,
-                           SUM(stock * buying_price) as total_value,
-                           SUM(CASE WHEN stock < 5 AND stock > 0 THEN 1 ELSE 0 END) as low_stock,
-                           SUM(CASE WHEN stock = 0 THEN 1 ELSE 0 END) as out_stock,
-                           SUM(CASE WHEN stock >= 5 THEN 1 ELSE 0 END) as in_stock,
+                           SUM(stock_quantity * buying_price) as total_value,
+                           SUM(CASE WHEN stock_quantity < 5 AND stock_quantity > 0 THEN 1 ELSE 0 END) as low_stock,
+                           SUM(CASE WHEN stock_quantity = 0 THEN 1 ELSE 0 END) as out_stock,
+                           SUM(CASE WHEN stock_quantity >= 5 THEN 1 ELSE 0 END) as in_stock,
                            COUNT(*) as item_count
-                    FROM inventory
+                    FROM products
                     GROUP BY category
                 """
-                result = self.db.execute_query(query)
+                result = self.db.execute_query(query, timed=True)
                 categories = []
                 for row in result:
                     categories.append({
                         "name": row[0],
-                        "value": f"${row[1]:,.2f}",
+                        "value": f"${row[1] or 0:,.2f}",
                         "low": int(row[2]),
                         "out": int(row[3]),
                         "in": int(row[4]),
@@ -473,4 +524,4 @@ class ReportsController:
                 return categories
         except Exception as e:
             logger.error(f"Error getting inventory by category: {str(e)}")
-            return []
+            return uncached([])
@@ -15,8 +15,7 @@ class SalesController:
         """Add a new sale using the data provider"""
         # Generate invoice number if not provided
         if 'invoice_number' not in sale_data or not sale_data['invoice_number']:
-            sale_data['invoice_number'] = f"INV-{datetime.now().strftime('%Y%m')}-{self.next_id:04d}"
-            self.next_id += 1
+            sale_data['invoice_number'] = self.data_provider.next_invoice_number()
         if 'date' not in sale_data:
             sale_data['date'] = datetime.now().strftime('%Y-%m-%d')
         if 'due_amount' not in sale_data:
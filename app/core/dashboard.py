@@ -0,0 +1,218 @@
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Tuple
+import numpy as np
+import pandas as pd
+from app.utils.logger import Logger
+from app.utils.firebase_replica import FirebaseReplica
+from app.utils.records import record_amount, record_cost, record_day, record_stock
+
+logger = Logger()
+
+LOW_STOCK_THRESHOLD = 10
+
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    """Every dashboard metric, computed together from one read of each collection."""
+    generated_at: datetime
+    total_revenue: float = 0.0
+    revenue_weekly_change: float = 0.0
+    customer_count: int = 0
+    pending_orders: int = 0
+    todays_deliveries: int = 0
+    low_stock_count: int = 0
+    inventory_value: float = 0.0
+    weekly_sales_labels: Tuple[str, ...] = ()
+    weekly_sales_data: Tuple[float, ...] = ()
+    stock_flow_labels: Tuple[str, ...] = ()
+    stock_flow_data: Tuple[int, ...] = ()
+    quarterly_profit_labels: Tuple[str, ...] = ()
+    quarterly_profit_data: Tuple[float, ...] = ()
+    recent_activities: Tuple[Mapping[str, Any], ...] = ()
+    # Refresh cost: collections read and time spent building the snapshot
+    fetch_count: int = 0
+    build_seconds: float = 0.0
+
+    @classmethod
+    def empty(cls):
+        return cls(generated_at=datetime.now())
+
+
+class SalesFrame:
+    """
+    Columnar view of the sales collection built once per snapshot: parsed
+    sale days (datetime64[D]) and amounts as NumPy arrays sorted by day, so
+    time-window totals are searchsorted/bincount operations instead of
+    per-sale date parsing.
+    """
+    def __init__(self, days, amounts, total):
+        order = np.argsort(days, kind='stable')
+        self.days = days[order]
+        self.amounts = amounts[order]
+        self.total = float(total)
+        self._cumulative = np.concatenate(([0.0], np.cumsum(self.amounts)))
+
+    @classmethod
+    def from_records(cls, sales):
+        """Build from (key, record) pairs; sales without a parseable date only count towards total."""
+        count = len(sales)
+        amounts = np.fromiter((record_amount(sale) for _, sale in sales), dtype=float, count=count)
+        days = pd.to_datetime(
+            pd.Series([record_day(sale) for _, sale in sales], dtype=object),
+            format='%Y-%m-%d', errors='coerce'
+        ).to_numpy(dtype='datetime64[D]')
+        dated = ~np.isnat(days)
+        return cls(days[dated], amounts[dated], amounts.sum())
+
+    def window_sum(self, start, end):
+        """Total of sales on days in [start, end)."""
+        lo, hi = np.searchsorted(self.days, np.array([start, end], dtype='datetime64[D]'))
+        return float(self._cumulative[hi] - self._cumulative[lo])
+
+    def daily_sums(self, start, count):
+        """Totals for each of `count` consecutive days from start."""
+        start = np.datetime64(start, 'D')
+        lo, hi = np.searchsorted(self.days, np.array([start, start + count], dtype='datetime64[D]'))
+        offsets = (self.days[lo:hi] - start).astype(int)
+        return np.bincount(offsets, weights=self.amounts[lo:hi], minlength=count)
+
+    def quarterly_sums(self, first_quarter, count):
+        """Totals for `count` consecutive quarters from first_quarter (year * 4 + quarter index)."""
+        months = self.days.astype('datetime64[M]').astype(int)
+        # datetime64[M] counts months from 1970-01
+        quarters = months // 3 + 1970 * 4 - first_quarter
+        in_range = (quarters >= 0) & (quarters < count)
+        return np.bincount(quarters[in_range], weights=self.amounts[in_range], minlength=count)
+
+
+class DashboardSnapshotService:
+    """
+    Builds DashboardSnapshot objects. Each refresh reads the sales, inventory
+    and customers collections once (from their shared replicas) and derives
+    all metrics in a single pass over each.
+    """
+    def __init__(self, sales_ref, inventory_ref, customers_ref):
+        self._sources = {
+            'sales': FirebaseReplica.for_reference(sales_ref),
+            'inventory': FirebaseReplica.for_reference(inventory_ref),
+            'customers': FirebaseReplica.for_reference(customers_ref),
+        }
+
+    def _fetch(self, name):
+        try:
+            return self._sources[name].items()
+        except Exception as e:
+            logger.error(f"Failed to load {name} for dashboard: {e}")
+            return []
+
+    def build(self, now: Optional[datetime] = None) -> DashboardSnapshot:
+        """Fetch each collection once and compute a new snapshot."""
+        started = time.perf_counter()
+        sales = self._fetch('sales')
+        products = self._fetch('inventory')
+        customers = self._fetch('customers')
+        snapshot = build_snapshot(sales, products, customers, now=now)
+        return replace(snapshot, fetch_count=len(self._sources), build_seconds=time.perf_counter() - started)
+
+
+def build_snapshot(sales, products, customers, now: Optional[datetime] = None) -> DashboardSnapshot:
+    """Compute a snapshot from (key, record) pairs of sales, products and customers."""
+    now = now or datetime.now()
+    today = now.date()
+    today_str = today.strftime('%Y-%m-%d')
+
+    # Sales time windows: last 7 days, the 7 before them and the last 4 quarters
+    frame = SalesFrame.from_records(sales)
+    week_days = [today - timedelta(days=i) for i in range(6, -1, -1)]
+    weekly = frame.daily_sums(week_days[0], 7)
+    curr_week = frame.window_sum(week_days[0], today + timedelta(days=1))
+    prev_week = frame.window_sum(today - timedelta(days=13), week_days[0])
+    current_quarter = now.year * 4 + (now.month - 1) // 3
+    quarter_keys = [current_quarter - i for i in range(3, -1, -1)]
+    quarterly = frame.quarterly_sums(quarter_keys[0], 4)
+
+    # Per-sale status fields: pending orders, deliveries and the activity feed
+    pending = deliveries = 0
+    dated_sales = []
+    for key, sale in sales:
+        amount = record_amount(sale)
+        if str(sale.get('status') or '').lower() == 'pending' or _number(sale.get('due_amount')) > 0:
+            pending += 1
+        if str(sale.get('delivery_date') or '')[:10] == today_str:
+            deliveries += 1
+        dated_sales.append((str(sale.get('sale_date') or sale.get('date') or ''), key, sale, amount))
+
+    if prev_week > 0:
+        weekly_change = (curr_week - prev_week) / prev_week * 100
+    elif curr_week > 0:
+        weekly_change = 100.0
+    else:
+        weekly_change = 0.0
+
+    # Inventory: low stock, value and stock level buckets
+    low_stock = inventory_value = 0
+    levels = [0, 0, 0]
+    for _, product in products:
+        stock = record_stock(product)
+        if stock < LOW_STOCK_THRESHOLD:
+            low_stock += 1
+        inventory_value += stock * record_cost(product)
+        levels[0 if stock < 5 else 1 if stock < 20 else 2] += 1
+
+    activities = []
+    for sale_date, key, sale, amount in sorted(dated_sales, key=lambda s: s[0], reverse=True)[:4]:
+        activities.append({
+            "icon": "💰",
+            "title": f"Sale to {sale.get('customer_name') or sale.get('customer') or 'Unknown'}",
+            "value": f"${amount:.2f}",
+            "time": sale_date,
+            "activity_type": "sale",
+            "item_id": key
+        })
+    for key, product in products[:3]:
+        activities.append({
+            "icon": "📦",
+            "title": "Inventory Updated",
+            "value": product.get('name', 'Unknown'),
+            "time": product.get('created_at', ''),
+            "activity_type": "inventory",
+            "item_id": key
+        })
+    for key, customer in customers[:2]:
+        activities.append({
+            "icon": "👤",
+            "title": "New Customer",
+            "value": customer.get('name', 'Unknown'),
+            "time": customer.get('joined', ''),
+            "activity_type": "customer",
+            "item_id": key
+        })
+
+    return DashboardSnapshot(
+        generated_at=now,
+        total_revenue=frame.total,
+        revenue_weekly_change=weekly_change,
+        customer_count=len(customers),
+        pending_orders=pending,
+        todays_deliveries=deliveries,
+        low_stock_count=low_stock,
+        inventory_value=float(inventory_value),
+        weekly_sales_labels=tuple(day.strftime('%a') for day in week_days),
+        weekly_sales_data=tuple(float(v) for v in weekly),
+        stock_flow_labels=("Low", "Medium", "High", "Orders"),
+        stock_flow_data=(levels[0], levels[1], levels[2], pending),
+        quarterly_profit_labels=tuple(f"Q{q % 4 + 1}" for q in quarter_keys),
+        quarterly_profit_data=tuple(float(v) for v in quarterly),
+        recent_activities=tuple(MappingProxyType(a) for a in activities),
+    )
+
+
+def _number(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
@@ -1,78 +1,195 @@
 from typing import Dict, List, Callable, Any
 from datetime import datetime
-from threading import Thread, Event
-from queue import Queue
+from threading import Thread, Lock
+from queue import Queue, Full, Empty
 import time
 from app.utils.logger import Logger
 
 logger = Logger()
 
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_PUBLISH_TIMEOUT = 5.0
+
+# Queued after the pending events to tell a worker to exit
+_STOP = object()
+
+
+def _remaining(deadline):
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
 class EventSystem:
-    def __init__(self):
+    """
+    Publish/subscribe dispatcher backed by a pool of worker threads.
+
+    Each event type is always handled by the same worker, so events of one
+    type are delivered in publish order while different types run in
+    parallel. Worker queues are bounded: publish() blocks for up to
+    publish_timeout when a worker falls behind and drops the event after.
+    """
+    def __init__(self, workers: int = DEFAULT_WORKERS, max_queue_size: int = DEFAULT_QUEUE_SIZE,
+                 publish_timeout: float = DEFAULT_PUBLISH_TIMEOUT):
         self._handlers: Dict[str, List[Callable]] = {}
-        self._event_queue = Queue()
-        self._stop_event = Event()
-        self._worker_thread = None
+        self._queues = [Queue(maxsize=max_queue_size) for _ in range(max(1, workers))]
+        self._workers: List[Thread] = []
+        self._publish_timeout = publish_timeout
+        self._lock = Lock()
+        self._published = 0
+        self._processed = 0
+        self._dropped = 0
+        self._handler_errors = 0
+        self._latency: Dict[str, Dict[str, float]] = {}
     
     def start(self):
-        """Start the event processing thread."""
-        if self._worker_thread is None or not self._worker_thread.is_alive():
-            self._stop_event.clear()
-            self._worker_thread = Thread(target=self._process_events, daemon=True)
-            self._worker_thread.start()
-            logger.info("Event system started")
+        """Start the event processing threads."""
+        with self._lock:
+            if any(worker.is_alive() for worker in self._workers):
+                return
+            self._workers = [
+                Thread(target=self._process_events, args=(queue,), name=f"EventWorker-{index}", daemon=True)
+                for index, queue in enumerate(self._queues)
+            ]
+        for worker in self._workers:
+            worker.start()
+        logger.info(f"Event system started with {len(self._workers)} workers")
     
-    def stop(self):
-        """Stop the event processing thread."""
-        if self._worker_thread and self._worker_thread.is_alive():
-            self._stop_event.set()
-            self._worker_thread.join()
-            logger.info("Event system stopped")
+    def stop(self, timeout: float = None):
+        """
+        Stop the event processing threads once the events already queued are
+        handled. With a timeout, events still queued when it runs out are dropped.
+        """
+        workers = [worker for worker in self._workers if worker.is_alive()]
+        if not workers:
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for queue in self._queues:
+            try:
+                queue.put(_STOP, timeout=_remaining(deadline))
+            except Full:
+                self._discard_queued(queue)
+        for worker in workers:
+            worker.join(_remaining(deadline))
+        logger.info("Event system stopped")
+
+    def _discard_queued(self, queue: Queue):
+        """Drop a full queue's pending events and queue the stop sentinel in their place."""
+        discarded = 0
+        while True:
+            try:
+                queue.get_nowait()
+                queue.task_done()
+                discarded += 1
+                continue
+            except Empty:
+                pass
+            try:
+                queue.put_nowait(_STOP)
+                break
+            except Full:
+                # Refilled by a publisher in the meantime
+                continue
+        with self._lock:
+            self._dropped += discarded
+        logger.warning(f"Event queue still full at stop, dropped {discarded} events")
     
     def subscribe(self, event_type: str, handler: Callable):
         """Subscribe to an event type."""
-        if event_type not in self._handlers:
-            self._handlers[event_type] = []
-        self._handlers[event_type].append(handler)
+        with self._lock:
+            # Copy on write so workers can iterate without holding the lock
+            self._handlers[event_type] = self._handlers.get(event_type, []) + [handler]
         logger.debug(f"Subscribed to event: {event_type}")
     
     def unsubscribe(self, event_type: str, handler: Callable):
         """Unsubscribe from an event type."""
-        if event_type in self._handlers:
-            self._handlers[event_type].remove(handler)
-            logger.debug(f"Unsubscribed from event: {event_type}")
+        with self._lock:
+            if event_type in self._handlers:
+                handlers = list(self._handlers[event_type])
+                handlers.remove(handler)
+                self._handlers[event_type] = handlers
+                logger.debug(f"Unsubscribed from event: {event_type}")
     
-    def publish(self, event_type: str, data: Any = None):
-        """Publish an event."""
+    def publish(self, event_type: str, data: Any = None, timeout: float = None) -> bool:
+        """Publish an event; returns False if it was dropped because its worker's queue stayed full."""
         event = {
             'type': event_type,
             'data': data,
             'timestamp': datetime.utcnow()
         }
-        self._event_queue.put(event)
+        try:
+            self._queue_for(event_type).put(
+                event, timeout=self._publish_timeout if timeout is None else timeout
+            )
+        except Full:
+            with self._lock:
+                self._dropped += 1
+            logger.error(f"Event queue full, dropped event: {event_type}")
+            return False
+        with self._lock:
+            self._published += 1
         logger.debug(f"Published event: {event_type}")
+        return True
+
+    def join(self):
+        """Block until every queued event has been handled."""
+        for queue in self._queues:
+            queue.join()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depths, event counters and per-event-type handler latency (seconds)."""
+        with self._lock:
+            latency = {
+                event_type: {
+                    'count': stats['count'],
+                    'avg': stats['total'] / stats['count'] if stats['count'] else 0.0,
+                    'max': stats['max'],
+                }
+                for event_type, stats in self._latency.items()
+            }
+            return {
+                'workers': len(self._queues),
+                'queue_depths': [queue.qsize() for queue in self._queues],
+                'queue_depth': sum(queue.qsize() for queue in self._queues),
+                'published': self._published,
+                'processed': self._processed,
+                'dropped': self._dropped,
+                'handler_errors': self._handler_errors,
+                'handler_latency': latency,
+            }
+
+    def _queue_for(self, event_type: str) -> Queue:
+        return self._queues[hash(event_type) % len(self._queues)]
     
-    def _process_events(self):
-        """Process events in the queue."""
-        while not self._stop_event.is_set():
+    def _process_events(self, queue: Queue):
+        """Handle events from one worker queue until the stop sentinel arrives."""
+        while True:
+            event = queue.get()
+            try:
+                if event is _STOP:
+                    return
+                self._dispatch(event)
+            finally:
+                queue.task_done()
+
+    def _dispatch(self, event: Dict[str, Any]):
+        event_type = event['type']
+        errors = 0
+        for handler in self._handlers.get(event_type, ()):
+            started = time.perf_counter()
             try:
-                # Get event from queue with timeout
-                event = self._event_queue.get(timeout=1)
-                
-                # Process event
-                event_type = event['type']
-                if event_type in self._handlers:
-                    for handler in self._handlers[event_type]:
-                        try:
-                            handler(event['data'])
-                        except Exception as e:
-                            logger.error(f"Error in event handler for {event_type}: {e}")
-                
-                self._event_queue.task_done()
+                handler(event['data'])
             except Exception as e:
-                if not isinstance(e, TimeoutError):
-                    logger.error(f"Error processing event: {e}")
-                time.sleep(0.1)
+                errors += 1
+                logger.error(f"Error in event handler for {event_type}: {e}")
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                stats = self._latency.setdefault(event_type, {'count': 0, 'total': 0.0, 'max': 0.0})
+                stats['count'] += 1
+                stats['total'] += elapsed
+                stats['max'] = max(stats['max'], elapsed)
+        with self._lock:
+            self._processed += 1
+            self._handler_errors += errors
 
 # Event types
 class EventTypes:
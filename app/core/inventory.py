@@ -5,7 +5,14 @@ from app.utils.database import DatabaseManager
 from app.core.event_system import EventSystem, EventTypes
 from app.models.base import Product, ProductCreate, ProductUpdate, Category, CategoryCreate, CategoryUpdate
 from app.ui.firebase_utils import get_db
-import random
+from app.utils.firebase_replica import FirebaseReplica
+from app.utils.sequences import SequenceAllocator, FirebaseSequenceStore
+from app.utils.records import record_stock, record_cost
+from app.utils.rtdb_query import where, where_at_most
+from app.utils.write_batcher import WriteBatcher, BatchResult
+from app.utils.offline_journal import OfflineJournal, new_record_key, seen_fields
+from app.utils.normalizer import normalizer_for
+from app.utils.cache_manager import invalidate_on_changes
 
 logger = Logger()
 
@@ -13,13 +20,23 @@ class InventoryManager:
     def __init__(self, event_system: EventSystem):
         self.event_system = event_system
         self.db = get_db().child('inventory')
+        # Shared in-memory copy of /inventory kept current from the change stream
+        self.replica = FirebaseReplica.for_reference(self.db)
+        # Record ids come from a shared counter so two terminals never collide
+        self.ids = SequenceAllocator(FirebaseSequenceStore(get_db().child('counters')))
+        # Writes go through the journal, which holds them locally while Firebase is unreachable
+        self.journal = OfflineJournal.for_database(get_db())
+        # Cached inventory figures include changes other terminals make to /inventory
+        for namespace in ('inventory', 'reports'):
+            invalidate_on_changes(namespace, self.replica)
     
     def create_product(self, product_data: ProductCreate) -> Optional[Product]:
         """Create a new product in Firebase."""
         try:
-            product_id = f"prod_{random.randint(1000,9999)}_{int(datetime.now().timestamp())}"
+            product_id = new_record_key(self.journal, self.ids, 'products', 'prod')
             product = product_data.dict() if hasattr(product_data, 'dict') else dict(product_data)
-            self.db.child(product_id).set(product)
+            self.journal.submit('set', f"inventory/{product_id}", product)
+            self.replica.put(product_id, product)
             return product_id
         except Exception as e:
             print(f"Failed to create product: {e}")
@@ -29,81 +46,71 @@ class InventoryManager:
         """Update product information in Firebase."""
         try:
             product = product_data.dict() if hasattr(product_data, 'dict') else dict(product_data)
-            self.db.child(product_id).update(product)
+            self.journal.submit('update', f"inventory/{product_id}", product,
+                                base=seen_fields(self.replica.get(product_id), product))
+            self.replica.patch(product_id, product)
             return True
         except Exception as e:
             print(f"Failed to update product: {e}")
             return False
     
+    def batch(self, **kwargs) -> WriteBatcher:
+        """
+        Write batcher for /inventory that keeps the replica in step with
+        every path it writes. Flushes go through the offline journal. Use
+        as a context manager to flush on exit.
+        """
+        return WriteBatcher(self.journal.reference('inventory'), on_written=self._apply_written, **kwargs)
+
+    def update_products(self, updates: Dict[str, Dict[str, Any]]) -> BatchResult:
+        """Apply {product_id: fields} with one multi-location update."""
+        result = BatchResult()
+        batch = self.batch(on_flush=result.merge)
+        for product_id, fields in updates.items():
+            batch.update(product_id, fields)
+        batch.flush()
+        return result
+
+    def _apply_written(self, path: str, value: Any):
+        product_id, _, field = path.partition('/')
+        if field:
+            self.replica.patch(product_id, {field: value})
+        else:
+            self.replica.put(product_id, value)
+
     def delete_product(self, product_id: str) -> bool:
         """Delete a product from Firebase."""
         try:
-            self.db.child(product_id).delete()
+            self.journal.submit('delete', f"inventory/{product_id}", base=self.replica.get(product_id))
+            self.replica.put(product_id, None)
             return True
         except Exception as e:
             print(f"Failed to delete product: {e}")
             return False
     
     def get_product(self, product_id: str) -> Optional[Product]:
-        """Get product by ID from Firebase."""
+        """Get product by ID from the local inventory replica."""
         try:
-            data_obj = self.db.child(product_id).get()
-            data = data_obj.val() if hasattr(data_obj, 'val') else data_obj
+            data = self.replica.get(product_id)
             if data:
-                if 'buying_price' in data:
-                    data['cost'] = data.pop('buying_price')
-                elif 'cost_price' in data:
-                    data['cost'] = data.pop('cost_price')
-                if 'selling_price' in data:
-                    data.pop('selling_price')
-                if 'details' in data:
-                    data.pop('details')
-                if 'quantity' in data:
-                    data.pop('quantity')
-                if 'product' in data:
-                    data.pop('product')
-                if 'reorder_level' in data:
-                    data.pop('reorder_level')
-                # Normalize numeric fields
-                if 'cost' in data and data['cost'] is None:
-                    data['cost'] = 0
-                if 'quantity' in data and data['quantity'] is None:
-                    data['quantity'] = 0
-                data = filter_to_model(Product, data)
-                return Product(**data)
+                return _products({**data, 'id': product_id})
             return None
         except Exception as e:
             print(f"Failed to get product: {e}")
             return None
     
     def list_products(self, category: Optional[str] = None) -> List[Product]:
-        """List all products, optionally filtered by category, from Firebase."""
+        """
+        List all products from the local inventory replica. A category filter
+        is applied by the server unless the replica is already live.
+        """
         try:
-            all_data_obj = self.db.get()
-            all_data = all_data_obj.val() if hasattr(all_data_obj, 'val') else all_data_obj or {}
-            products = []
-            for v in all_data.values():
-                if 'buying_price' in v:
-                    v['cost'] = v.pop('buying_price')
-                elif 'cost_price' in v:
-                    v['cost'] = v.pop('cost_price')
-                if 'selling_price' in v:
-                    v.pop('selling_price')
-                if 'details' in v:
-                    v.pop('details')
-                if 'quantity' in v:
-                    v.pop('quantity')
-                if 'product' in v:
-                    v.pop('product')
-                if 'reorder_level' in v:
-                    v.pop('reorder_level')
-                # Normalize numeric fields
-                if 'cost' in v and v['cost'] is None:
-                    v['cost'] = 0
-                if 'quantity' in v and v['quantity'] is None:
-                    v['quantity'] = 0
-                v = filter_to_model(Product, v)
-                products.append(Product(**v))
+            if category and not self.replica.is_live:
+                records = where(self.db, 'category', equal_to=category).items()
+            else:
+                records = self.replica.items()
+            # Records are keyed by product id rather than holding it
+            products = _products.normalize_many({**record, 'id': key} for key, record in records)
             if category:
                 products = [p for p in products if p.category == category]
             return products
@@ -114,17 +121,44 @@ class InventoryManager:
     def update_stock(self, product_id: str, quantity: int) -> bool:
         """Update product stock level in Firebase."""
         try:
-            prod_obj = self.db.child(product_id).get()
-            prod = prod_obj.val() if hasattr(prod_obj, 'val') else prod_obj
+            prod = self.replica.get(product_id)
             if not prod:
                 return False
+            base = seen_fields(prod, ['quantity'])
             prod['quantity'] = prod.get('quantity', 0) + quantity
-            self.db.child(product_id).update({'quantity': prod['quantity']})
+            self.journal.submit('update', f"inventory/{product_id}", {'quantity': prod['quantity']}, base=base)
+            self.replica.patch(product_id, {'quantity': prod['quantity']})
             return True
         except Exception as e:
             print(f"Failed to update stock: {e}")
             return False
     
+    def count_total_stock(self) -> int:
+        """Sum of stock across all products, served from the replica."""
+        return sum(record_stock(v) for v in self.replica.values())
+    
+    def count_low_stock(self, threshold: int = 10) -> int:
+        """Number of products with stock below threshold, from the replica or a server-side range query."""
+        return len(self.low_stock_records(threshold))
+
+    def low_stock_records(self, threshold: int = 10) -> Dict[str, Dict[str, Any]]:
+        """
+        Raw records of products with stock below threshold, keyed by product
+        id. Served from the replica while it is live; otherwise this makes
+        four range queries, numeric and text values of quantity and of stock.
+        """
+        if self.replica.is_live:
+            return {k: v for k, v in self.replica.items() if record_stock(v) < threshold}
+        # Records store their level as quantity or stock; query both and keep what record_stock reads
+        records = {}
+        for field in ('quantity', 'stock'):
+            records.update(where_at_most(self.db, field, threshold))
+        return {k: v for k, v in records.items() if record_stock(v) < threshold}
+    
+    def calculate_inventory_value(self) -> float:
+        """Total stock value at buying price, served from the replica."""
+        return sum(record_stock(v) * record_cost(v) for v in self.replica.values())
+    
     def create_category(self, category_data: CategoryCreate) -> Optional[Category]:
         """Create a new category."""
         try:
@@ -201,14 +235,5 @@ class InventoryManager:
         with DatabaseManager().get_session() as session:
             return session.query(Category).filter(Category.name == name).first()
 
-def filter_to_model(model, data):
-    # Support Pydantic v1 (__fields__), v2 (model_fields), or fallback to __annotations__
-    if hasattr(model, 'model_fields'):
-        allowed = set(model.model_fields.keys())
-    elif hasattr(model, '__fields__'):
-        allowed = set(model.__fields__.keys())
-    elif hasattr(model, '__annotations__'):
-        allowed = set(model.__annotations__.keys())
-    else:
-        allowed = set()
-    return {k: v for k, v in data.items() if k in allowed} 
\ No newline at end of file
+# Raw /inventory records -> Product, compiled once for the record layout
+_products = normalizer_for(Product, 'firebase_inventory')
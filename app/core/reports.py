@@ -12,6 +12,7 @@ from app.utils.config_manager import config_manager
 from app.utils.database import db_manager
 from app.core.event_system import EventSystem, EventTypes
 from app.ui.firebase_utils import get_db
+from app.utils.rtdb_query import where, PREFIX_END
 
 logger = Logger()
 
@@ -29,8 +30,10 @@ class ReportManager:
     def generate_sales_report(self, start_date: datetime, end_date: datetime, format: str = 'pdf') -> Optional[str]:
         """Generate sales report for a date range from Firebase."""
         try:
-            sales_data_obj = get_db().child('sales').get()
-            sales_data = sales_data_obj.val() if hasattr(sales_data_obj, 'val') else sales_data_obj or {}
+            # The server narrows to whole days; the exact bounds are checked below
+            sales_data = where(get_db().child('sales'), 'sale_date',
+                               start_at=start_date.strftime('%Y-%m-%d'),
+                               end_at=end_date.strftime('%Y-%m-%d') + PREFIX_END)
             sales = []
             for v in sales_data.values():
                 sale_date = pd.to_datetime(v.get('sale_date'))
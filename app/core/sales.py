@@ -7,7 +7,12 @@ from app.utils.database import DatabaseManager
 from app.core.event_system import EventSystem, EventTypes
 from app.models.base import Sale, SaleCreate, SaleUpdate, SaleItem, SaleItemCreate, Product
 from app.ui.firebase_utils import get_db
-import random
+from app.utils.firebase_replica import FirebaseReplica
+from app.utils.sequences import SequenceAllocator, FirebaseSequenceStore
+from app.utils.offline_journal import OfflineJournal, new_record_key, seen_fields
+from app.utils.normalizer import normalizer_for
+from app.utils.sales_ledger import SalesLedger
+from app.utils.cache_manager import global_cache, cached, uncached, invalidate_on_changes
 
 logger = Logger()
 
@@ -15,13 +20,24 @@ class SalesManager:
     def __init__(self, event_system: EventSystem):
         self.event_system = event_system
         self.db = get_db().child('sales')
+        # Shared replica of /sales and the ledger of aggregates maintained from it
+        self.replica = FirebaseReplica.for_reference(self.db)
+        # Record ids come from a shared counter so two terminals never collide
+        self.ids = SequenceAllocator(FirebaseSequenceStore(get_db().child('counters')))
+        # Writes go through the journal, which holds them locally while Firebase is unreachable
+        self.journal = OfflineJournal.for_database(get_db())
+        self.ledger = SalesLedger.for_replica(self.replica, _sale_from_record)
+        # Cached reports include changes other terminals make to /sales
+        invalidate_on_changes('reports', self.replica)
     
     def create_sale(self, sale_data: SaleCreate) -> Optional[Sale]:
         """Create a new sale transaction in Firebase."""
         try:
-            sale_id = f"sale_{random.randint(1000,9999)}_{int(datetime.now().timestamp())}"
+            sale_id = new_record_key(self.journal, self.ids, 'sales', 'sale')
             sale = sale_data.dict() if hasattr(sale_data, 'dict') else dict(sale_data)
-            self.db.child(sale_id).set(sale)
+            self.journal.submit('set', f"sales/{sale_id}", sale)
+            self.replica.put(sale_id, sale)
+            global_cache.invalidate_tag('sales')
             return sale_id
         except Exception as e:
             print(f"Failed to create sale: {e}")
@@ -31,7 +47,10 @@ class SalesManager:
         """Update sale information in Firebase."""
         try:
             sale = sale_data.dict() if hasattr(sale_data, 'dict') else dict(sale_data)
-            self.db.child(sale_id).update(sale)
+            self.journal.submit('update', f"sales/{sale_id}", sale,
+                                base=seen_fields(self.replica.get(sale_id), sale))
+            self.replica.patch(sale_id, sale)
+            global_cache.invalidate_tag('sales')
             return True
         except Exception as e:
             print(f"Failed to update sale: {e}")
@@ -40,75 +59,26 @@ class SalesManager:
     def delete_sale(self, sale_id: int) -> bool:
         """Delete a sale from Firebase."""
         try:
-            self.db.child(sale_id).delete()
+            self.journal.submit('delete', f"sales/{sale_id}", base=self.replica.get(sale_id))
+            self.replica.put(sale_id, None)
+            global_cache.invalidate_tag('sales')
             return True
         except Exception as e:
             print(f"Failed to delete sale: {e}")
             return False
     
-    def filter_to_model(self, model, data):
-        # Support Pydantic v1 (__fields__), v2 (model_fields), or fallback to __annotations__
-        if hasattr(model, 'model_fields'):
-            allowed = set(model.model_fields.keys())
-        elif hasattr(model, '__fields__'):
-            allowed = set(model.__fields__.keys())
-        elif hasattr(model, '__annotations__'):
-            allowed = set(model.__annotations__.keys())
-        else:
-            allowed = set()
-        return {k: v for k, v in data.items() if k in allowed}
-    
     def get_sale(self, sale_id: int) -> Optional[Sale]:
-        """Get sale by ID from Firebase."""
+        """Get sale by ID from the sales ledger."""
         try:
-            data_obj = self.db.child(sale_id).get()
-            data = data_obj.val() if hasattr(data_obj, 'val') else data_obj
-            if data:
-                if 'amount' in data:
-                    data['total_amount'] = data.pop('amount')
-                if 'customer' in data:
-                    data.pop('customer')
-                if 'date' in data:
-                    data.pop('date')
-                if 'product' in data:
-                    data.pop('product')
-                if 'quantity' in data:
-                    data.pop('quantity')
-                # Normalize numeric fields
-                if 'total_amount' in data and data['total_amount'] is None:
-                    data['total_amount'] = 0
-                data = self.filter_to_model(Sale, data)
-                return Sale(**data)
-            return None
+            return self.ledger.get(sale_id)
         except Exception as e:
             print(f"Failed to get sale: {e}")
             return None
     
     def list_sales(self, customer_id: Optional[int] = None) -> List[Sale]:
-        """List all sales, optionally filtered by customer_id, from Firebase."""
+        """List all sales, optionally filtered by customer_id, from the sales ledger."""
         try:
-            all_data_obj = self.db.get()
-            all_data = all_data_obj.val() if hasattr(all_data_obj, 'val') else all_data_obj or {}
-            sales = []
-            for v in all_data.values():
-                if 'amount' in v:
-                    v['total_amount'] = v.pop('amount')
-                if 'customer' in v:
-                    v.pop('customer')
-                if 'date' in v:
-                    v.pop('date')
-                if 'product' in v:
-                    v.pop('product')
-                if 'quantity' in v:
-                    v.pop('quantity')
-                # Normalize numeric fields
-                if 'total_amount' in v and v['total_amount'] is None:
-                    v['total_amount'] = 0
-                v = self.filter_to_model(Sale, v)
-                sales.append(Sale(**v))
-            if customer_id:
-                sales = [s for s in sales if s.customer_id == customer_id]
-            return sales
+            return self.ledger.sales(customer_id)
         except Exception as e:
             print(f"Failed to list sales: {e}")
             return []
@@ -119,35 +89,9 @@ class SalesManager:
             return session.query(SaleItem).filter(SaleItem.sale_id == sale_id).all()
     
     def get_sales_summary(self) -> Dict[str, Any]:
-        """Get sales summary from Firebase."""
+        """Get sales summary from the running totals in the sales ledger."""
         try:
-            all_data_obj = self.db.get()
-            all_data = all_data_obj.val() if hasattr(all_data_obj, 'val') else all_data_obj or {}
-            sales = []
-            for v in all_data.values():
-                if 'amount' in v:
-                    v['total_amount'] = v.pop('amount')
-                if 'customer' in v:
-                    v.pop('customer')
-                if 'date' in v:
-                    v.pop('date')
-                if 'product' in v:
-                    v.pop('product')
-                if 'quantity' in v:
-                    v.pop('quantity')
-                # Normalize numeric fields
-                if 'total_amount' in v and v['total_amount'] is None:
-                    v['total_amount'] = 0
-                v = self.filter_to_model(Sale, v)
-                sales.append(Sale(**v))
-            total_sales = len(sales)
-            total_revenue = sum(s.total_amount or 0 for s in sales)
-            avg_sale = total_revenue / total_sales if total_sales > 0 else 0.0
-            return {
-                'total_sales': total_sales,
-                'total_revenue': total_revenue,
-                'average_sale': avg_sale
-            }
+            return self.ledger.summary()
         except Exception as e:
             print(f"Failed to get sales summary: {e}")
             return {
@@ -156,6 +100,7 @@ class SalesManager:
                 'average_sale': 0.0
             }
     
+    @cached(namespace='sales', ttl=300, invalidate_on=('sales_updated',))
     def get_daily_sales(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
         """Get daily sales data for a date range."""
         try:
@@ -178,8 +123,9 @@ class SalesManager:
                 ]
         except Exception as e:
             logger.error(f"Failed to get daily sales: {e}")
-            return []
+            return uncached([])
     
+    @cached(namespace='sales', ttl=300, invalidate_on=('sales_updated',))
     def get_payment_method_summary(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
         """Get summary of sales by payment method."""
         try:
@@ -202,4 +148,7 @@ class SalesManager:
                 ]
         except Exception as e:
             logger.error(f"Failed to get payment method summary: {e}")
-            return [] 
\ No newline at end of file
+            return uncached([])
+
+# Raw /sales records -> Sale, compiled once for the record layout
+_sale_from_record = normalizer_for(Sale, 'firebase_sales')
@@ -1,6 +1,12 @@
 from abc import ABC, abstractmethod
 from config.settings import COLLECTION_INVENTORY, COLLECTION_SALES
 from config.database import FirebaseDB
+from app.utils.database import transaction, iter_rows, FETCH_BATCH_SIZE
+from app.models.sales import write_sale, last_invoice_number
+from app.utils.search_index import has_search_index, search
+from app.utils.sequences import (
+    SequenceAllocator, SQLiteSequenceStore, FirebaseSequenceStore, MemorySequenceStore, issue_invoice_number
+)
 import sqlite3
 
 class BaseDataProvider(ABC):
@@ -13,104 +19,108 @@ class BaseDataProvider(ABC):
     def add_product(self, product_data):
         pass
 
+    def iter_products(self):
+        # Providers that cannot stream yield from the full list
+        return iter(self.get_products())
+
     # Sales
     @abstractmethod
     def get_sales(self):
         pass
 
+    def iter_sales(self):
+        return iter(self.get_sales())
+
     @abstractmethod
     def add_sale(self, sale_data):
         pass
 
+    def next_invoice_number(self):
+        # Providers without shared storage number invoices per process
+        if not hasattr(self, '_invoice_numbers'):
+            self._invoice_numbers = SequenceAllocator(MemorySequenceStore())
+        return issue_invoice_number(self._invoice_numbers)
+
 # SQLAlchemy/SQLite implementation
 class SQLDataProvider(BaseDataProvider):
     def __init__(self, db_manager):
         self.db = db_manager
+        self._invoice_numbers = SequenceAllocator(SQLiteSequenceStore(self._connection))
+
+    def _connection(self):
+        # The calling thread's pooled connection, or a raw sqlite3 connection passed in directly
+        if hasattr(self.db, 'get_sqlite_connection'):
+            return self.db.get_sqlite_connection()
+        return self.db
 
     def get_products(self):
-        # Query all products from the products table
-        conn = self.db.get_qt_connection() if hasattr(self.db, 'get_qt_connection') else self.db
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM products")
-        columns = [desc[0] for desc in cur.description]
-        return [dict(zip(columns, row)) for row in cur.fetchall()]
+        # All products as dicts; exports and reports should stream with iter_products
+        return list(self.iter_products())
+
+    def iter_products(self, row_factory='dict', batch_size=FETCH_BATCH_SIZE):
+        """Stream products in id order, batch_size rows at a time. row_factory is 'dict', 'namedtuple', 'tuple' or 'row'."""
+        return iter_rows(self._connection(), "SELECT * FROM products ORDER BY id", None, row_factory, batch_size)
+
+    def search_products(self, query, limit=20):
+        # Ranked prefix search over name, details and category; LIKE on name without the index
+        conn = self._connection()
+        if has_search_index(conn, 'products'):
+            return search('products', query, limit, conn=conn, row_factory='dict')
+        return list(iter_rows(conn, "SELECT * FROM products WHERE name LIKE ? LIMIT ?",
+                              (f'%{query}%', limit), 'dict'))
 
     def add_product(self, product_data):
         # Insert a new product into the products table
-        conn = self.db.get_qt_connection() if hasattr(self.db, 'get_qt_connection') else self.db
-        cur = conn.cursor()
-        cur.execute("""
-            INSERT INTO products (name, stock_quantity, price, category, details, buying_price, selling_price)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            product_data.get('name'),
-            product_data.get('quantity', product_data.get('stock', 0)),
-            product_data.get('price', 0.0),
-            product_data.get('category', 'Other'),
-            product_data.get('details', ''),
-            product_data.get('buying_price', 0.0),
-            product_data.get('selling_price', 0.0)
-        ))
-        conn.commit()
+        conn = self._connection()
+        with transaction(conn):
+            cur = conn.execute("""
+                INSERT INTO products (name, stock_quantity, price, category, details, buying_price, selling_price)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (
+                product_data.get('name'),
+                product_data.get('quantity', product_data.get('stock', 0)),
+                product_data.get('price', 0.0),
+                product_data.get('category', 'Other'),
+                product_data.get('details', ''),
+                product_data.get('buying_price', 0.0),
+                product_data.get('selling_price', 0.0)
+            ))
         return cur.lastrowid
 
     def get_sales(self):
-        # Query all sales from the sales table
-        conn = self.db.get_qt_connection() if hasattr(self.db, 'get_qt_connection') else self.db
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM sales")
-        columns = [desc[0] for desc in cur.description]
-        return [dict(zip(columns, row)) for row in cur.fetchall()]
+        # All sales as dicts; exports and reports should stream with iter_sales
+        return list(self.iter_sales())
+
+    def iter_sales(self, row_factory='dict', batch_size=FETCH_BATCH_SIZE):
+        """Stream sales in id order, batch_size rows at a time. row_factory is 'dict', 'namedtuple', 'tuple' or 'row'."""
+        return iter_rows(self._connection(), "SELECT * FROM sales ORDER BY id", None, row_factory, batch_size)
 
     def add_sale(self, sale_data):
-        # Insert a new sale into the sales table
-        conn = self.db.get_qt_connection() if hasattr(self.db, 'get_qt_connection') else self.db
-        cur = conn.cursor()
-        cur.execute("""
-            INSERT INTO sales (invoice_number, date, customer_id, total_price, discount, payment_amount, payment_method, due_amount, status, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            sale_data.get('invoice_number'),
-            sale_data.get('date'),
-            sale_data.get('customer_id'),
-            sale_data.get('total_price'),
-            sale_data.get('discount', 0),
-            sale_data.get('payment_amount', 0),
-            sale_data.get('payment_method', 'Cash'),
-            sale_data.get('due_amount', 0),
-            sale_data.get('status', 'Completed'),
-            sale_data.get('notes', '')
-        ))
-        sale_id = cur.lastrowid
-        # Insert sale items if provided
-        items = sale_data.get('items', [])
-        for item in items:
-            cur.execute("""
-                INSERT INTO sale_items (sale_id, product_id, quantity, unit_price, discount, subtotal)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                sale_id,
-                item['product_id'],
-                item['quantity'],
-                item['unit_price'],
-                item.get('discount', 0),
-                item['subtotal']
-            ))
-            # Update inventory
-            cur.execute("UPDATE products SET stock_quantity = stock_quantity - ? WHERE id = ?", (item['quantity'], item['product_id']))
-        conn.commit()
-        return sale_id
+        # Insert a new sale with its items and stock movement in one write transaction
+        conn = self._connection()
+        with transaction(conn, immediate=True):
+            return write_sale(conn, sale_data, sale_data.get('items') or None)
+
+    def next_invoice_number(self):
+        # Blocks come from the sequences table, seeded from invoices already in sales
+        return issue_invoice_number(
+            self._invoice_numbers, lambda prefix: last_invoice_number(self._connection(), prefix))
 
 # Firebase implementation
 class FirebaseDataProvider(BaseDataProvider):
     def __init__(self, firebase_client=None):
         self.client = firebase_client or FirebaseDB()
+        self._counters = None
 
     def get_products(self):
         # Fetch all products from Firebase inventory collection
+        return list(self.iter_products())
+
+    def iter_products(self):
+        # Documents are converted as the stream delivers them
         collection = self.client.get_collection(COLLECTION_INVENTORY)
-        docs = collection.stream() if collection else []
-        return [doc.to_dict() | {'id': doc.id} for doc in docs]
+        for doc in (collection.stream() if collection else []):
+            yield doc.to_dict() | {'id': doc.id}
 
     def add_product(self, product_data):
         # Add a product to Firebase inventory collection
@@ -122,9 +132,13 @@ class FirebaseDataProvider(BaseDataProvider):
 
     def get_sales(self):
         # Fetch all sales from Firebase sales collection
+        return list(self.iter_sales())
+
+    def iter_sales(self):
+        # Documents are converted as the stream delivers them
         collection = self.client.get_collection(COLLECTION_SALES)
-        docs = collection.stream() if collection else []
-        return [doc.to_dict() | {'id': doc.id} for doc in docs]
+        for doc in (collection.stream() if collection else []):
+            yield doc.to_dict() | {'id': doc.id}
 
     def add_sale(self, sale_data):
         # Add a sale to Firebase sales collection
@@ -132,4 +146,11 @@ class FirebaseDataProvider(BaseDataProvider):
         if not collection:
             return None
         result = collection.add(sale_data)
-        return getattr(result, 'id', None) if hasattr(result, 'id') else None 
\ No newline at end of file
+        return getattr(result, 'id', None) if hasattr(result, 'id') else None 
+
+    def next_invoice_number(self):
+        # Invoice counters live in the Realtime Database so every till shares them
+        if self._counters is None:
+            from app.ui.firebase_utils import get_db
+            self._counters = SequenceAllocator(FirebaseSequenceStore(get_db().child('counters')))
+        return issue_invoice_number(self._counters)
@@ -0,0 +1,29 @@
+import sqlite3
+from app.utils.migrations import Migration
+from app.utils.database import ensure_indexes
+
+# Indexes as of this migration: (name, table, columns, partial index condition)
+INDEXES = [
+    ("idx_sales_date", "sales", ("date",), None),
+    ("idx_sales_customer_id", "sales", ("customer_id",), None),
+    ("idx_sales_due", "sales", ("date",), "due_amount > 0"),
+    ("idx_sale_items_sale_id", "sale_items", ("sale_id",), None),
+    ("idx_purchases_customer_date", "purchases", ("customer_id", "date"), None),
+    ("idx_customers_name", "customers", ("name",), None),
+    # Databases created by the sales module name the column full_name
+    ("idx_customers_full_name", "customers", ("full_name",), None),
+]
+
+class Migration(Migration):
+    def __init__(self, version: int, name: str):
+        super().__init__(version, name)
+    
+    def up(self, connection: sqlite3.Connection):
+        """Add the secondary indexes used by sales, customer and purchase lookups."""
+        # Tables created after this runs get the same indexes from their models
+        ensure_indexes(connection, INDEXES)
+    
+    def down(self, connection: sqlite3.Connection):
+        """Drop the indexes again."""
+        for name, _, _, _ in INDEXES:
+            connection.execute(f"DROP INDEX IF EXISTS {name}")
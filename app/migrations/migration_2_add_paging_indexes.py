@@ -0,0 +1,22 @@
+import sqlite3
+from app.utils.migrations import Migration
+from app.utils.database import ensure_indexes
+
+# Indexes as of this migration: (name, table, columns, partial index condition)
+INDEXES = [
+    ("idx_customers_created_at", "customers", ("created_at",), None),
+]
+
+class Migration(Migration):
+    def __init__(self, version: int, name: str):
+        super().__init__(version, name)
+    
+    def up(self, connection: sqlite3.Connection):
+        """Add the index behind keyset paging of customers by (created_at, id)."""
+        # Sales pages seek on idx_sales_date, whose entries already end in the rowid
+        ensure_indexes(connection, INDEXES)
+    
+    def down(self, connection: sqlite3.Connection):
+        """Drop the index again."""
+        for name, _, _, _ in INDEXES:
+            connection.execute(f"DROP INDEX IF EXISTS {name}")
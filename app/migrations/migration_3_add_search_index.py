@@ -0,0 +1,16 @@
+import sqlite3
+from app.utils.migrations import Migration
+from app.utils.search_index import ensure_search_index, drop_search_index
+
+class Migration(Migration):
+    def __init__(self, version: int, name: str):
+        super().__init__(version, name)
+    
+    def up(self, connection: sqlite3.Connection):
+        """Add FTS5 search indexes for products, customers and invoices."""
+        # Filled from existing rows; triggers keep them current afterwards
+        ensure_search_index(connection)
+    
+    def down(self, connection: sqlite3.Connection):
+        """Drop the search indexes and their triggers."""
+        drop_search_index(connection)
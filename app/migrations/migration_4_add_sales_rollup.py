@@ -0,0 +1,15 @@
+import sqlite3
+from app.utils.migrations import Migration
+from app.models.sales_rollup import ensure_sales_rollup, drop_sales_rollup
+
+class Migration(Migration):
+    def __init__(self, version: int, name: str):
+        super().__init__(version, name)
+    
+    def up(self, connection: sqlite3.Connection):
+        """Add the sales_daily_rollup table and its triggers, backfilled from existing sales."""
+        ensure_sales_rollup(connection)
+    
+    def down(self, connection: sqlite3.Connection):
+        """Drop the rollup table and its triggers."""
+        drop_sales_rollup(connection)
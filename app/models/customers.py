@@ -1,10 +1,22 @@
 import sqlite3
+from app.utils.database import DatabaseManager, transaction, ensure_indexes, keyset_filter, keyset_page
+from app.utils.search_index import ensure_search_index, has_search_index, match_rowids
+
+CUSTOMER_INDEXES = [
+    ('idx_customers_name', 'customers', ('name',), None),
+    ('idx_customers_created_at', 'customers', ('created_at',), None),
+]
 
 class CustomersModel:
-    def __init__(self, db_conn):
-        self.conn = db_conn
+    def __init__(self, db_conn=None):
+        self._conn = db_conn
         self.create_table()
 
+    @property
+    def conn(self):
+        """The injected connection, or the calling thread's pooled one"""
+        return self._conn or DatabaseManager.get_sqlite_connection()
+
     def create_table(self):
         self.conn.execute('''
             CREATE TABLE IF NOT EXISTS customers (
@@ -16,35 +28,67 @@ class CustomersModel:
                 created_at TEXT
             )
         ''')
+        ensure_indexes(self.conn, CUSTOMER_INDEXES)
         self.conn.commit()
+        ensure_search_index(self.conn, ['customers'])
 
     def add_customer(self, name, contact, address, history, created_at):
-        cur = self.conn.cursor()
-        cur.execute('''
-            INSERT INTO customers (name, contact, address, history, created_at)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (name, contact, address, history, created_at))
-        self.conn.commit()
+        with transaction(self.conn) as conn:
+            cur = conn.execute('''
+                INSERT INTO customers (name, contact, address, history, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (name, contact, address, history, created_at))
         return cur.lastrowid
 
-    def get_customers(self, search=None):
+    def get_customers(self, search=None, limit=None, after=None):
+        """
+        Customers newest first; after = (created_at, id) of the last row seen seeks past it.
+        Search matches word prefixes through the full-text index when there is one.
+        """
+        query = '''SELECT * FROM customers WHERE 1=1'''
+        params = []
+        if search and has_search_index(self.conn, 'customers'):
+            matches, match_params = match_rowids('customers', search)
+            if matches:
+                query += f''' AND rowid IN ({matches})'''
+                params.extend(match_params)
+        elif search:
+            query += ''' AND (name LIKE ? OR contact LIKE ?)'''
+            params.extend([f'%{search}%', f'%{search}%'])
+        if after:
+            condition, seek_params = keyset_filter('created_at', 'id', after)
+            query += f''' AND {condition}'''
+            params.extend(seek_params)
+        query += ''' ORDER BY created_at DESC, id DESC'''
+        if limit is not None:
+            query += ''' LIMIT ?'''
+            params.append(limit)
         cur = self.conn.cursor()
-        if search:
-            cur.execute('''SELECT * FROM customers WHERE name LIKE ? OR contact LIKE ? ORDER BY created_at DESC''', (f'%{search}%', f'%{search}%'))
-        else:
-            cur.execute('''SELECT * FROM customers ORDER BY created_at DESC''')
+        cur.execute(query, params)
         return cur.fetchall()
 
+    def get_customers_page(self, search=None, after=None, page_size=50):
+        """
+        One page of customers: {'rows': [...], 'next_cursor': (created_at, id) or None}.
+        Customers without created_at come after all dated ones.
+        """
+        rows = self.get_customers(search, limit=page_size + 1, after=after)
+        if after and after[0] is not None and len(rows) <= page_size:
+            # The seek range skips undated customers, which sort after every dated one
+            rows = list(rows) + list(self.get_customers(
+                search, limit=page_size + 1 - len(rows), after=(None, float('inf'))))
+        return keyset_page(rows, page_size, 'created_at')
+
     def update_customer(self, customer_id, **kwargs):
         fields = ', '.join([f'{k}=?' for k in kwargs])
         values = list(kwargs.values())
         values.append(customer_id)
-        self.conn.execute(f'''UPDATE customers SET {fields} WHERE id=?''', values)
-        self.conn.commit()
+        with transaction(self.conn) as conn:
+            conn.execute(f'''UPDATE customers SET {fields} WHERE id=?''', values)
 
     def delete_customer(self, customer_id):
-        self.conn.execute('''DELETE FROM customers WHERE id=?''', (customer_id,))
-        self.conn.commit()
+        with transaction(self.conn) as conn:
+            conn.execute('''DELETE FROM customers WHERE id=?''', (customer_id,))
 
     def get_customer_by_name(self, name):
         cur = self.conn.cursor()
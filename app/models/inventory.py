@@ -1,8 +1,29 @@
 from datetime import datetime
 from config.database import FirebaseDB
 from config.settings import COLLECTION_INVENTORY
-from PyQt5.QtCore import QAbstractTableModel, Qt, QModelIndex, QVariant
+from PyQt5.QtCore import QAbstractTableModel, Qt, QModelIndex, QVariant, pyqtSignal
 from app.core.inventory import InventoryManager
+from app.models.base import Product
+from app.utils.normalizer import normalizer_for
+from app.utils.write_behind import WriteBehindQueue
+
+# Seconds an edited cell waits for other edits before they are written together
+CELL_WRITE_DELAY = 0.5
+# Seconds refresh() and removeRow() wait for queued edits to be written
+CELL_WRITE_FLUSH_TIMEOUT = 10.0
+# Editable columns: (Product field shown in the row, field saved in Firebase)
+COLUMN_FIELDS = {
+    1: ("name", "name"),
+    2: ("description", "details"),
+    3: ("category", "category"),
+    4: ("stock", "quantity"),
+    5: ("cost", "buying_price"),
+    6: ("price", "selling_price"),
+}
+# Product field for each field saved in Firebase, to undo failed edits
+ROW_FIELDS = {saved: shown for shown, saved in COLUMN_FIELDS.values()}
+
+_products = normalizer_for(Product, 'firebase_inventory')
 
 # --- Optionally keep InventoryItem for reference, but not as the main export ---
 class InventoryItem:
@@ -126,16 +147,29 @@ class FirebaseInventoryTableModel(QAbstractTableModel):
         "ID", "Product Name", "Product Details", "Category", "Quantity", "Buying Price", "Selling Price"
     ]
 
+    # Emitted from the write-behind worker; delivered on the GUI thread
+    write_failed = pyqtSignal(str, object, str)
+    # User-facing message when an edit could not be saved and was undone
+    error_occurred = pyqtSignal(str)
+
     def __init__(self, event_system=None, parent=None):
         super().__init__(parent)
         self.manager = InventoryManager(event_system)
+        # Cell edits show at once and are saved in the background; edits made
+        # within CELL_WRITE_DELAY seconds go out as one multi-location update
+        self.writes = WriteBehindQueue(self._send_edits, delay=CELL_WRITE_DELAY,
+                                       on_failure=self.write_failed.emit)
+        self.write_failed.connect(self._rollback_edit)
         self.items = []  # List of dicts or objects
         self.item_ids = []  # Firebase keys
         self.load_data()
 
     def load_data(self):
+        self.set_products(self.manager.list_products())
+
+    def set_products(self, products):
+        """Replace the rows with already-loaded products (must run on the GUI thread)."""
         self.beginResetModel()
-        products = self.manager.list_products()
         self.items = []
         self.item_ids = []
         for prod in products:
@@ -143,13 +177,18 @@ class FirebaseInventoryTableModel(QAbstractTableModel):
             if hasattr(prod, 'dict'):
                 data = prod.dict()
             elif hasattr(prod, '__dict__'):
-                data = prod.__dict__
+                data = vars(prod)
             else:
                 data = dict(prod)
-            self.items.append(data)
+            self.items.append(self._row(data))
             self.item_ids.append(data.get('id') or data.get('item_id'))
         self.endResetModel()
 
+    @staticmethod
+    def _row(data):
+        """Plain dict of the Product fields in data, for the table to show and edit"""
+        return _products.fields(data)
+
     def rowCount(self, parent=QModelIndex()):
         return len(self.items)
 
@@ -167,15 +206,15 @@ class FirebaseInventoryTableModel(QAbstractTableModel):
             elif col == 1:
                 return item.get("name", "")
             elif col == 2:
-                return item.get("details", item.get("description", ""))
+                return item.get("description", "")
             elif col == 3:
                 return item.get("category", "Other")
             elif col == 4:
-                return item.get("quantity", item.get("stock", 0))
+                return item.get("stock", 0)
             elif col == 5:
-                return item.get("buying_price", item.get("cost_price", 0.0))
+                return item.get("cost", 0.0)
             elif col == 6:
-                return item.get("selling_price", 0.0)
+                return item.get("price", 0.0)
         return QVariant()
 
     def headerData(self, section, orientation, role=Qt.DisplayRole):
@@ -196,30 +235,47 @@ class FirebaseInventoryTableModel(QAbstractTableModel):
         col = index.column()
         item_id = self.item_ids[row]
         item = self.items[row]
-        key_map = {
-            1: "name",
-            2: "details",
-            3: "category",
-            4: "quantity",
-            5: "buying_price",
-            6: "selling_price"
-        }
-        if col in key_map:
-            field = key_map[col]
+        if col in COLUMN_FIELDS:
+            field, saved = COLUMN_FIELDS[col]
+            previous = item.get(field)
             item[field] = value
-            # Update in Firebase
-            self.manager.update_product(item_id, {field: value})
+            # Saved in the background; rolled back by _rollback_edit if the write fails
+            self.writes.enqueue(item_id, {saved: value}, {saved: previous})
             self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
             return True
         return False
 
+    def _send_edits(self, updates):
+        # Runs on the write-behind worker: one update for every edited row
+        result = self.manager.update_products(updates)
+        failed = {}
+        for path, error in result.failed.items():
+            failed.setdefault(path.split('/')[0], error)
+        return failed
+
+    def _rollback_edit(self, item_id, fields, message):
+        """Restore the saved values of edits that could not be written."""
+        if item_id not in self.item_ids:
+            return
+        row = self.item_ids.index(item_id)
+        item = self.items[row]
+        for saved, value in fields.items():
+            field = ROW_FIELDS.get(saved, saved)
+            if value is None:
+                item.pop(field, None)
+            else:
+                item[field] = value
+        self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1),
+                              [Qt.DisplayRole, Qt.EditRole])
+        self.error_occurred.emit(f"Could not save changes to {item.get('name', item_id)}: {message}")
+
     def insertRow(self, row, parent=QModelIndex(), item_data=None):
         self.beginInsertRows(QModelIndex(), row, row)
         prod_id = self.manager.create_product(item_data)
         if prod_id:
-            item_data = dict(item_data)
-            item_data['id'] = prod_id
-            self.items.insert(row, item_data)
+            data = item_data.dict() if hasattr(item_data, 'dict') else dict(item_data)
+            data['id'] = prod_id
+            self.items.insert(row, self._row(data))
             self.item_ids.insert(row, prod_id)
             self.endInsertRows()
             return True
@@ -231,6 +287,9 @@ class FirebaseInventoryTableModel(QAbstractTableModel):
             return False
         self.beginRemoveRows(QModelIndex(), row, row)
         item_id = self.item_ids[row]
+        # Drop queued edits and let one in flight finish, so it cannot recreate the row
+        self.writes.discard(item_id)
+        self.writes.flush(CELL_WRITE_FLUSH_TIMEOUT)
         self.manager.delete_product(item_id)
         del self.items[row]
         del self.item_ids[row]
@@ -238,6 +297,8 @@ class FirebaseInventoryTableModel(QAbstractTableModel):
         return True
 
     def refresh(self):
+        # Reloading before queued edits are saved would show the old values
+        self.writes.flush(CELL_WRITE_FLUSH_TIMEOUT)
         self.load_data()
 
 # --- Minimal Inventory class for test compatibility ---
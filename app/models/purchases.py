@@ -1,10 +1,20 @@
 import sqlite3
+from app.utils.database import DatabaseManager, transaction, ensure_indexes
+
+PURCHASE_INDEXES = [
+    ('idx_purchases_customer_date', 'purchases', ('customer_id', 'date'), None),
+]
 
 class PurchasesModel:
-    def __init__(self, db_conn):
-        self.conn = db_conn
+    def __init__(self, db_conn=None):
+        self._conn = db_conn
         self.create_table()
 
+    @property
+    def conn(self):
+        """The injected connection, or the calling thread's pooled one"""
+        return self._conn or DatabaseManager.get_sqlite_connection()
+
     def create_table(self):
         self.conn.execute('''
             CREATE TABLE IF NOT EXISTS purchases (
@@ -18,15 +28,15 @@ class PurchasesModel:
                 FOREIGN KEY(customer_id) REFERENCES customers(id)
             )
         ''')
+        ensure_indexes(self.conn, PURCHASE_INDEXES)
         self.conn.commit()
 
     def add_purchase(self, customer_id, product, quantity, price, total, date):
-        cur = self.conn.cursor()
-        cur.execute('''
-            INSERT INTO purchases (customer_id, product, quantity, price, total, date)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (customer_id, product, quantity, price, total, date))
-        self.conn.commit()
+        with transaction(self.conn) as conn:
+            cur = conn.execute('''
+                INSERT INTO purchases (customer_id, product, quantity, price, total, date)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (customer_id, product, quantity, price, total, date))
         return cur.lastrowid
 
     def get_all_purchases(self):
@@ -1,12 +1,133 @@
 import sqlite3
 from datetime import datetime
+from app.utils.database import DatabaseManager, transaction, ensure_indexes, keyset_filter, keyset_page
+from app.utils.error_handler import ValidationError
+from app.utils.search_index import ensure_search_index, has_search_index, match_rowids
+from app.models.sales_rollup import ensure_sales_rollup, period_totals, rollup_source
+from app.utils.sequences import SequenceAllocator, SQLiteSequenceStore, issue_invoice_number
+
+# Date ranges, customer lookups, pending invoices (partial, in date order) and sale items
+SALES_INDEXES = [
+    ('idx_sales_date', 'sales', ('date',), None),
+    ('idx_sales_customer_id', 'sales', ('customer_id',), None),
+    ('idx_sales_due', 'sales', ('date',), 'due_amount > 0'),
+    ('idx_sale_items_sale_id', 'sale_items', ('sale_id',), None),
+]
+
+# Product ids per IN (...) stock lookup, well under SQLite's bound parameter limit
+STOCK_CHECK_CHUNK = 500
+
+SALE_ITEM_INSERT = '''
+    INSERT INTO sale_items (
+        sale_id, product_id, quantity, unit_price,
+        discount, subtotal
+    ) VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+
+def aggregate_quantities(items):
+    """Total quantity per product_id across sale line items"""
+    totals = {}
+    for item in items:
+        totals[item['product_id']] = totals.get(item['product_id'], 0) + item['quantity']
+    return totals
+
+
+def check_stock(conn, required):
+    """
+    Check that every product in required (product_id -> units) has enough
+    stock, with one IN (...) query per chunk of products. Raises
+    ValidationError listing each shortage.
+    """
+    needed = {pid: qty for pid, qty in required.items() if qty > 0}
+    ids = list(needed)
+    available = {}
+    for start in range(0, len(ids), STOCK_CHECK_CHUNK):
+        chunk = ids[start:start + STOCK_CHECK_CHUNK]
+        placeholders = ', '.join('?' * len(chunk))
+        for product_id, stock in conn.execute(
+                f'SELECT id, stock_quantity FROM products WHERE id IN ({placeholders})', chunk):
+            available[product_id] = stock or 0
+
+    shortages = {
+        pid: {'requested': qty, 'available': available.get(pid)}
+        for pid, qty in needed.items()
+        if available.get(pid) is None or available[pid] < qty
+    }
+    if shortages:
+        raise ValidationError("Insufficient stock for sale", details={'shortages': shortages})
+
+
+def insert_sale_items(conn, sale_id, items):
+    """Insert all line items of a sale in one executemany"""
+    conn.executemany(SALE_ITEM_INSERT, [
+        (sale_id, item['product_id'], item['quantity'], item['unit_price'],
+         item.get('discount', 0), item['subtotal'])
+        for item in items
+    ])
+
+
+def apply_stock_changes(conn, changes):
+    """Apply one stock UPDATE per product from product_id -> change in units"""
+    rows = [(change, pid) for pid, change in changes.items() if change]
+    if rows:
+        conn.executemany('UPDATE products SET stock_quantity = stock_quantity + ? WHERE id = ?', rows)
+
+
+def last_invoice_number(conn, prefix):
+    """Highest number already used in invoices named '<prefix>-NNNN', or 0"""
+    row = conn.execute('''
+        SELECT MAX(CAST(substr(invoice_number, ?) AS INTEGER)) FROM sales
+        WHERE invoice_number LIKE ?
+    ''', (len(prefix) + 2, f'{prefix}-%')).fetchone()
+    return row[0] or 0
+
+
+def write_sale(conn, sale_data, items=None, validate_stock=True):
+    """
+    Insert a sale, its items and the stock movement on conn. Callers run
+    this inside transaction(conn, immediate=True). Returns the sale id.
+    """
+    required = aggregate_quantities(items) if items else {}
+    if validate_stock and required:
+        check_stock(conn, required)
+
+    cur = conn.execute('''
+        INSERT INTO sales (
+            invoice_number, date, customer_id, total_price, discount,
+            payment_amount, payment_method, due_amount, status, notes
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        sale_data.get('invoice_number'),
+        sale_data.get('date'),
+        sale_data.get('customer_id'),
+        sale_data.get('total_price'),
+        sale_data.get('discount', 0),
+        sale_data.get('payment_amount', 0),
+        sale_data.get('payment_method', 'Cash'),
+        sale_data.get('due_amount', 0),
+        sale_data.get('status', 'Completed'),
+        sale_data.get('notes', '')
+    ))
+    sale_id = cur.lastrowid
+
+    if items:
+        insert_sale_items(conn, sale_id, items)
+        apply_stock_changes(conn, {pid: -qty for pid, qty in required.items()})
+    return sale_id
 
 class SalesModel:
     """Database model for sales operations"""
     
-    def __init__(self, db_conn):
-        self.conn = db_conn
+    def __init__(self, db_conn=None):
+        self._conn = db_conn
+        self._invoice_numbers = SequenceAllocator(SQLiteSequenceStore(lambda: self.conn))
         self.create_tables()
+
+    @property
+    def conn(self):
+        """The injected connection, or the calling thread's pooled one"""
+        return self._conn or DatabaseManager.get_sqlite_connection()
     
     def create_tables(self):
         """Create necessary tables if they don't exist"""
@@ -43,64 +164,37 @@ class SalesModel:
                 FOREIGN KEY (product_id) REFERENCES products(id)
             )
         ''')
+        ensure_indexes(self.conn, SALES_INDEXES)
         
         self.conn.commit()
+        ensure_search_index(self.conn, ['invoices'])
+        ensure_sales_rollup(self.conn)
     
     def add_sale(self, invoice_number, date, customer_id, total_price, 
                  discount=0, payment_amount=0, payment_method='Cash', 
-                 due_amount=0, status='Completed', notes='', items=None):
+                 due_amount=0, status='Completed', notes='', items=None,
+                 validate_stock=True):
         """
-        Add a new sale record
+        Add a new sale record with its items in one write transaction.
+        Stock for all items is checked up front and ValidationError is
+        raised if any product is short.
         """
-        try:
-            # Insert sale record
-            cur = self.conn.cursor()
-            cur.execute('''
-                INSERT INTO sales (
-                    invoice_number, date, customer_id, total_price, discount,
-                    payment_amount, payment_method, due_amount, status, notes
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                invoice_number, date, customer_id, total_price, discount,
-                payment_amount, payment_method, due_amount, status, notes
-            ))
-            
-            sale_id = cur.lastrowid
-            
-            # Insert sale items if provided
-            if items and isinstance(items, list):
-                for item in items:
-                    cur.execute('''
-                        INSERT INTO sale_items (
-                            sale_id, product_id, quantity, unit_price, 
-                            discount, subtotal
-                        ) VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (
-                        sale_id,
-                        item['product_id'],
-                        item['quantity'],
-                        item['unit_price'],
-                        item.get('discount', 0),
-                        item['subtotal']
-                    ))
-                    
-                    # Update inventory
-                    cur.execute('''
-                        UPDATE products 
-                        SET stock_quantity = stock_quantity - ? 
-                        WHERE id = ?
-                    ''', (item['quantity'], item['product_id']))
-            
-            self.conn.commit()
-            return sale_id
-        
-        except Exception as e:
-            self.conn.rollback()
-            raise e
+        sale_data = {
+            'invoice_number': invoice_number, 'date': date, 'customer_id': customer_id,
+            'total_price': total_price, 'discount': discount,
+            'payment_amount': payment_amount, 'payment_method': payment_method,
+            'due_amount': due_amount, 'status': status, 'notes': notes
+        }
+        if not isinstance(items, list):
+            items = None
+        with transaction(self.conn, immediate=True) as conn:
+            return write_sale(conn, sale_data, items, validate_stock)
     
-    def get_sales(self, search=None, start_date=None, end_date=None, limit=50, offset=0):
+    def get_sales(self, search=None, start_date=None, end_date=None, limit=50, offset=0, after=None):
         """
-        Get sales records with optional filtering
+        Get sales records with optional filtering, newest first. Pass the
+        (date, id) of the last row already shown as after to seek straight
+        to the next rows instead of skipping offset rows.
         """
         cur = self.conn.cursor()
         query = '''
@@ -112,22 +206,53 @@ class SalesModel:
         params = []
         
         if search:
-            query += ' AND (s.invoice_number LIKE ? OR c.full_name LIKE ?)' 
-            params.extend([f'%{search}%', f'%{search}%'])
+            condition, search_params = self._search_condition(search)
+            if condition:
+                query += f' AND {condition}'
+                params.extend(search_params)
         
+        # Range predicates on the bare column so idx_sales_date can be used
         if start_date:
-            query += ' AND date(s.date) >= date(?)'
+            query += ' AND s.date >= date(?)'
             params.append(start_date)
             
         if end_date:
-            query += ' AND date(s.date) <= date(?)'
+            query += ' AND s.date < date(?, \'+1 day\')'
             params.append(end_date)
+
+        if after:
+            condition, seek_params = keyset_filter('s.date', 's.id', after)
+            query += f' AND {condition}'
+            params.extend(seek_params)
             
-        query += ' ORDER BY s.date DESC LIMIT ? OFFSET ?'
-        params.extend([limit, offset])
+        # id breaks ties within a day; the index already holds rows in this order
+        query += ' ORDER BY s.date DESC, s.id DESC LIMIT ?'
+        params.append(limit)
+        if not after:
+            query += ' OFFSET ?'
+            params.append(offset)
         
         cur.execute(query, params)
         return cur.fetchall()
+
+    def _search_condition(self, search):
+        """Invoice number or customer name filter, through the full-text indexes where present"""
+        if not (has_search_index(self.conn, 'invoices') and has_search_index(self.conn, 'customers')):
+            return '(s.invoice_number LIKE ? OR c.full_name LIKE ?)', [f'%{search}%', f'%{search}%']
+        invoices, invoice_params = match_rowids('invoices', search)
+        customers, customer_params = match_rowids('customers', search)
+        if not invoices:
+            return None, []
+        return (f'(s.id IN ({invoices}) OR s.customer_id IN ({customers}))',
+                invoice_params + customer_params)
+
+    def get_sales_page(self, search=None, start_date=None, end_date=None, after=None, page_size=50):
+        """
+        One page of sales for a scrolling view: {'rows': [...], 'next_cursor': (date, id) or None}.
+        Pass next_cursor back as after for the following page.
+        """
+        rows = self.get_sales(search, start_date, end_date, limit=page_size + 1, after=after)
+        return keyset_page(rows, page_size, 'date')
     
     def get_sale_by_id(self, sale_id):
         """Get a sale by ID including its items"""
@@ -158,11 +283,11 @@ class SalesModel:
         sale_dict['items'] = [dict(item) for item in items]
         return sale_dict
     
-    def update_sale(self, sale_id, **kwargs):
+    def update_sale(self, sale_id, validate_stock=True, **kwargs):
         """
         Update a sale record
         """
-        try:
+        with transaction(self.conn, immediate=True) as conn:
             # Handle sale items separately
             items = kwargs.pop('items', None)
             
@@ -172,93 +297,49 @@ class SalesModel:
                 values = list(kwargs.values())
                 values.append(sale_id)
                 
-                self.conn.execute(f'''
+                conn.execute(f'''
                     UPDATE sales 
                     SET {fields} 
                     WHERE id=?
                 ''', values)
             
-            # Update sale items if provided
+            # Replace sale items and move stock by the net change per product
             if items and isinstance(items, list):
-                # First, get current items to calculate stock differences
-                cur = self.conn.cursor()
-                cur.execute('SELECT product_id, quantity FROM sale_items WHERE sale_id = ?', 
-                           (sale_id,))
-                old_items = {row[0]: row[1] for row in cur.fetchall()}
-                
-                # Remove existing items
-                self.conn.execute('DELETE FROM sale_items WHERE sale_id = ?', (sale_id,))
-                
-                # Add new items
-                for item in items:
-                    cur.execute('''
-                        INSERT INTO sale_items (
-                            sale_id, product_id, quantity, unit_price, 
-                            discount, subtotal
-                        ) VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (
-                        sale_id,
-                        item['product_id'],
-                        item['quantity'],
-                        item['unit_price'],
-                        item.get('discount', 0),
-                        item['subtotal']
-                    ))
-                    
-                    # Adjust inventory based on changes
-                    product_id = item['product_id']
-                    old_qty = old_items.get(product_id, 0)
-                    new_qty = item['quantity']
-                    
-                    if old_qty != new_qty:
-                        # Calculate how much stock to add/remove
-                        stock_change = old_qty - new_qty
-                        
-                        cur.execute('''
-                            UPDATE products 
-                            SET stock_quantity = stock_quantity + ? 
-                            WHERE id = ?
-                        ''', (stock_change, product_id))
-            
-            self.conn.commit()
-            return True
-            
-        except Exception as e:
-            self.conn.rollback()
-            raise e
+                old_items = aggregate_quantities(
+                    {'product_id': row[0], 'quantity': row[1]} for row in conn.execute(
+                        'SELECT product_id, quantity FROM sale_items WHERE sale_id = ?', (sale_id,)))
+                new_items = aggregate_quantities(items)
+                changes = {
+                    pid: old_items.get(pid, 0) - new_items.get(pid, 0)
+                    for pid in old_items.keys() | new_items.keys()
+                }
+                if validate_stock:
+                    check_stock(conn, {pid: -change for pid, change in changes.items() if change < 0})
+
+                conn.execute('DELETE FROM sale_items WHERE sale_id = ?', (sale_id,))
+                insert_sale_items(conn, sale_id, items)
+                apply_stock_changes(conn, changes)
+        return True
     
     def delete_sale(self, sale_id):
         """
         Delete a sale record and restore stock
         """
-        try:
-            cur = self.conn.cursor()
+        with transaction(self.conn, immediate=True) as conn:
+            cur = conn.cursor()
             
-            # Get sale items to restore stock
+            # Restore inventory, one update per product
             cur.execute('SELECT product_id, quantity FROM sale_items WHERE sale_id = ?', 
                        (sale_id,))
-            items = cur.fetchall()
-            
-            # Restore inventory
-            for product_id, quantity in items:
-                cur.execute('''
-                    UPDATE products 
-                    SET stock_quantity = stock_quantity + ? 
-                    WHERE id = ?
-                ''', (quantity, product_id))
+            apply_stock_changes(conn, aggregate_quantities(
+                {'product_id': row[0], 'quantity': row[1]} for row in cur.fetchall()))
             
             # Delete sale items
             cur.execute('DELETE FROM sale_items WHERE sale_id = ?', (sale_id,))
             
             # Delete sale
             cur.execute('DELETE FROM sales WHERE id = ?', (sale_id,))
-            
-            self.conn.commit()
-            return True
-        
-        except Exception as e:
-            self.conn.rollback()
-            raise e
+        return True
     
     def get_pending_invoices(self):
         """Get pending invoices (due amount > 0)"""
@@ -277,17 +358,12 @@ class SalesModel:
         cur = self.conn.cursor()
         stats = {}
         
-        # Total sales today
+        # Today's figures and open invoices come from the daily rollup
         today = datetime.now().strftime('%Y-%m-%d')
-        cur.execute('''
-            SELECT COUNT(*), SUM(total_price) 
-            FROM sales 
-            WHERE date(date) = ?
-        ''', (today,))
-        count, total = cur.fetchone()
+        todays = period_totals(self.conn, today, today)
         stats['today'] = {
-            'count': count or 0,
-            'total': total or 0
+            'count': todays['count'],
+            'total': todays['revenue']
         }
         
         # Last sale time
@@ -299,8 +375,8 @@ class SalesModel:
         stats['last_sale'] = result[0] if result else None
         
         # Pending invoices
-        cur.execute('SELECT COUNT(*) FROM sales WHERE due_amount > 0')
-        stats['pending_invoices'] = cur.fetchone()[0]
+        cur.execute(f'SELECT TOTAL(due_count) FROM {rollup_source(self.conn)}')
+        stats['pending_invoices'] = int(cur.fetchone()[0])
         
         # Top customers
         cur.execute('''
@@ -314,41 +390,17 @@ class SalesModel:
         stats['top_customers'] = cur.fetchall()
         
         # Discount usage
-        cur.execute('''
-            SELECT COUNT(*), SUM(discount)
-            FROM sales
-            WHERE date(date) = ? AND discount > 0
-        ''', (today,))
-        count, total = cur.fetchone()
         stats['discount_usage'] = {
-            'count': count or 0,
-            'total': total or 0
+            'count': todays['discount_count'],
+            'total': todays['discount']
         }
         
         return stats
     
     def generate_invoice_number(self):
-        """Generate a unique invoice number"""
-        prefix = datetime.now().strftime('INV-%Y%m')
-        
-        # Get last invoice number with this prefix
-        cur = self.conn.cursor()
-        cur.execute('''
-            SELECT invoice_number FROM sales
-            WHERE invoice_number LIKE ?
-            ORDER BY id DESC LIMIT 1
-        ''', (f'{prefix}%',))
-        
-        result = cur.fetchone()
-        
-        if result:
-            # Extract number part and increment
-            last_num = int(result[0].split('-')[-1])
-            next_num = last_num + 1
-        else:
-            next_num = 1
-            
-        return f"{prefix}-{next_num:04d}"
+        """Generate a unique invoice number from the shared invoice sequence"""
+        return issue_invoice_number(
+            self._invoice_numbers, lambda prefix: last_invoice_number(self.conn, prefix))
 
 # --- Minimal Sales class for test compatibility ---
 class Sales:
@@ -0,0 +1,194 @@
+import sqlite3
+import sys
+from app.utils.database import DatabaseManager, transaction
+
+# One row per day and payment method; day totals sum a handful of rows
+ROLLUP_TABLE = '''
+    CREATE TABLE IF NOT EXISTS sales_daily_rollup (
+        day TEXT NOT NULL,
+        payment_method TEXT NOT NULL,
+        sale_count INTEGER NOT NULL DEFAULT 0,
+        revenue REAL NOT NULL DEFAULT 0,
+        discount REAL NOT NULL DEFAULT 0,
+        discount_count INTEGER NOT NULL DEFAULT 0,
+        due REAL NOT NULL DEFAULT 0,
+        due_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, payment_method)
+    ) WITHOUT ROWID
+'''
+
+# sales columns the rollup reads; older schemas without them get no rollup
+ROLLUP_SOURCE_COLUMNS = {'date', 'total_price', 'discount', 'due_amount', 'payment_method'}
+
+ROLLUP_TRIGGERS = ('sales_rollup_ai', 'sales_rollup_ad', 'sales_rollup_au')
+
+# Without the rollup, its figures are grouped from the first of these sales
+# columns present; a figure with none of them reads as empty
+FALLBACK_COLUMNS = {
+    'day': ('date', 'sale_date', 'created_at'),
+    'payment_method': ('payment_method',),
+    'total': ('total_price', 'total_amount'),
+    'discount': ('discount',),
+    'due': ('due_amount',),
+}
+
+
+def _rollup_key(ref):
+    return f"COALESCE(date({ref}.date), ''), COALESCE({ref}.payment_method, '')"
+
+
+def _apply_sale(ref, sign=''):
+    """Upsert adding (sign '') or removing (sign '-') one sale row's figures"""
+    return f'''
+        INSERT INTO sales_daily_rollup (
+            day, payment_method, sale_count, revenue, discount, discount_count, due, due_count
+        ) VALUES (
+            {_rollup_key(ref)}, {sign}1,
+            {sign}COALESCE({ref}.total_price, 0),
+            {sign}COALESCE({ref}.discount, 0), {sign}(COALESCE({ref}.discount, 0) > 0),
+            {sign}COALESCE({ref}.due_amount, 0), {sign}(COALESCE({ref}.due_amount, 0) > 0)
+        )
+        ON CONFLICT (day, payment_method) DO UPDATE SET
+            sale_count = sale_count + excluded.sale_count,
+            revenue = revenue + excluded.revenue,
+            discount = discount + excluded.discount,
+            discount_count = discount_count + excluded.discount_count,
+            due = due + excluded.due,
+            due_count = due_count + excluded.due_count;
+    '''
+
+
+def _drop_empty(ref):
+    return f'''
+        DELETE FROM sales_daily_rollup
+        WHERE (day, payment_method) = ({_rollup_key(ref)}) AND sale_count = 0;
+    '''
+
+
+def has_sales_rollup(conn):
+    """True if the rollup table exists on conn"""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sales_daily_rollup'"
+    ).fetchone() is not None
+
+
+def rollup_source(conn):
+    """
+    FROM clause item with the rollup's columns: the rollup table, or when it
+    is unavailable (legacy sales schemas) the same figures grouped from sales.
+    """
+    if has_sales_rollup(conn):
+        return 'sales_daily_rollup'
+    present = {row[1] for row in conn.execute("PRAGMA table_info(sales)")}
+    col = {figure: next((c for c in candidates if c in present), 'NULL')
+           for figure, candidates in FALLBACK_COLUMNS.items()}
+    return f'''(
+        SELECT
+            COALESCE(date({col['day']}), '') AS day, COALESCE({col['payment_method']}, '') AS payment_method,
+            COUNT(*) AS sale_count, TOTAL({col['total']}) AS revenue,
+            TOTAL({col['discount']}) AS discount, SUM(COALESCE({col['discount']}, 0) > 0) AS discount_count,
+            TOTAL({col['due']}) AS due, SUM(COALESCE({col['due']}, 0) > 0) AS due_count
+        FROM sales
+        GROUP BY 1, 2
+    )'''
+
+
+def ensure_sales_rollup(conn):
+    """
+    Create the rollup table and the triggers that maintain it from every
+    insert, delete and update of a sale, backfilling it when it is new.
+    Returns False if the sales table is missing or predates these columns.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(sales)")}
+    if not ROLLUP_SOURCE_COLUMNS <= columns:
+        return False
+    created = not has_sales_rollup(conn)
+    with transaction(conn) as c:
+        c.execute(ROLLUP_TABLE)
+        c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS sales_rollup_ai AFTER INSERT ON sales BEGIN
+                {_apply_sale('new')}
+            END
+        ''')
+        c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS sales_rollup_ad AFTER DELETE ON sales BEGIN
+                {_apply_sale('old', '-')}
+                {_drop_empty('old')}
+            END
+        ''')
+        c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS sales_rollup_au
+            AFTER UPDATE OF {', '.join(sorted(ROLLUP_SOURCE_COLUMNS))} ON sales BEGIN
+                {_apply_sale('old', '-')}
+                {_apply_sale('new')}
+                {_drop_empty('old')}
+            END
+        ''')
+        if created:
+            rebuild_sales_rollup(c)
+    return True
+
+
+def drop_sales_rollup(conn):
+    """Remove the rollup table and its triggers"""
+    with transaction(conn) as c:
+        for name in ROLLUP_TRIGGERS:
+            c.execute(f"DROP TRIGGER IF EXISTS {name}")
+        c.execute("DROP TABLE IF EXISTS sales_daily_rollup")
+
+
+def rebuild_sales_rollup(conn):
+    """Recompute the whole rollup from the sales table. Returns the number of rollup rows."""
+    with transaction(conn, immediate=True) as c:
+        c.execute("DELETE FROM sales_daily_rollup")
+        c.execute('''
+            INSERT INTO sales_daily_rollup (
+                day, payment_method, sale_count, revenue, discount, discount_count, due, due_count
+            )
+            SELECT
+                COALESCE(date(date), ''), COALESCE(payment_method, ''), COUNT(*),
+                TOTAL(total_price), TOTAL(discount), SUM(COALESCE(discount, 0) > 0),
+                TOTAL(due_amount), SUM(COALESCE(due_amount, 0) > 0)
+            FROM sales
+            GROUP BY 1, 2
+        ''')
+        return c.execute("SELECT COUNT(*) FROM sales_daily_rollup").fetchone()[0]
+
+
+def period_totals(conn, start_day, end_day):
+    """
+    Totals for sales on days start_day..end_day inclusive ('YYYY-MM-DD'):
+    count, revenue, discount, discount_count, due, due_count and a
+    by_payment_method breakdown of count and revenue. Reads the rollup, or
+    sales itself when the rollup is unavailable.
+    """
+    totals = {'count': 0, 'revenue': 0.0, 'discount': 0.0, 'discount_count': 0,
+              'due': 0.0, 'due_count': 0, 'by_payment_method': {}}
+    for method, count, revenue, discount, discount_count, due, due_count in conn.execute(f'''
+        SELECT payment_method, SUM(sale_count), TOTAL(revenue), TOTAL(discount),
+               SUM(discount_count), TOTAL(due), SUM(due_count)
+        FROM {rollup_source(conn)}
+        WHERE day BETWEEN ? AND ?
+        GROUP BY payment_method
+    ''', (start_day, end_day)):
+        totals['count'] += count
+        totals['revenue'] += revenue
+        totals['discount'] += discount
+        totals['discount_count'] += discount_count
+        totals['due'] += due
+        totals['due_count'] += due_count
+        totals['by_payment_method'][method] = {'count': count, 'revenue': revenue}
+    return totals
+
+
+if __name__ == "__main__":
+    # Backfill: python -m app.models.sales_rollup [path/to/shop.db]
+    db_path = sys.argv[1] if len(sys.argv) > 1 else DatabaseManager.get_db_path()
+    conn = sqlite3.connect(db_path)
+    try:
+        if not ensure_sales_rollup(conn):
+            print(f"❌ No sales table with rollup columns in {db_path}")
+            sys.exit(1)
+        print(f"✅ Rebuilt sales_daily_rollup: {rebuild_sales_rollup(conn)} rows")
+    finally:
+        conn.close()
@@ -0,0 +1,137 @@
+import itertools
+import threading
+import traceback
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+from app.utils.logger import Logger
+
+logger = Logger()
+
+
+class _TaskSignals(QObject):
+    """Carries a worker's outcome back to the loader's (GUI) thread."""
+    finished = pyqtSignal(str, int, object)
+    failed = pyqtSignal(str, int, str)
+
+
+class _LoadTask(QRunnable):
+    def __init__(self, key, generation, fn, args, kwargs):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.key = key
+        self.generation = generation
+        self.cancelled = threading.Event()
+        self.signals = _TaskSignals()
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+        # The pool does not own the runnable, so it keeps itself alive until run() ends
+        self._keepalive = self
+
+    def run(self):
+        try:
+            if self.cancelled.is_set():
+                return
+            try:
+                result = self._fn(*self._args, **self._kwargs)
+            except Exception as e:
+                logger.error(f"Background load '{self.key}' failed: {e}\n{traceback.format_exc()}")
+                if not self.cancelled.is_set():
+                    self.signals.failed.emit(self.key, self.generation, str(e))
+                return
+            if not self.cancelled.is_set():
+                self.signals.finished.emit(self.key, self.generation, result)
+        finally:
+            self._keepalive = None
+
+
+class BackgroundLoader(QObject):
+    """
+    Runs data-loading calls on a QThreadPool and delivers the results on the
+    thread that owns the loader (the GUI thread for views).
+
+    Requests are keyed: submitting a new request for a key supersedes the
+    previous one, which is dropped from the queue if it has not started and
+    has its result discarded if it has.
+    """
+    result_ready = pyqtSignal(str, object)
+    error_occurred = pyqtSignal(str, str)
+
+    _shared_pool = None
+
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self._pool = pool or BackgroundLoader.shared_pool()
+        self._generations = itertools.count(1)
+        self._tasks = {}
+        self._callbacks = {}
+
+    @classmethod
+    def shared_pool(cls):
+        """Thread pool shared by every view's loader."""
+        if cls._shared_pool is None:
+            cls._shared_pool = QThreadPool()
+            cls._shared_pool.setMaxThreadCount(4)
+        return cls._shared_pool
+
+    def submit(self, key, fn, *args, on_result=None, on_error=None, **kwargs):
+        """Run fn(*args, **kwargs) in the pool; returns the request's generation."""
+        self.cancel(key)
+        generation = next(self._generations)
+        task = _LoadTask(key, generation, fn, args, kwargs)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+        self._tasks[key] = task
+        self._callbacks[key] = (on_result, on_error)
+        self._pool.start(task)
+        return generation
+
+    def cancel(self, key):
+        """Drop the pending request for key, if any."""
+        task = self._tasks.pop(key, None)
+        self._callbacks.pop(key, None)
+        if task is not None:
+            task.cancelled.set()
+            if self._pool.tryTake(task):
+                task._keepalive = None
+
+    def cancel_all(self):
+        for key in list(self._tasks):
+            self.cancel(key)
+
+    def is_pending(self, key):
+        return key in self._tasks
+
+    def wait_for_done(self, msecs=-1):
+        """Block until the pool is idle (used on shutdown and in tests)."""
+        return self._pool.waitForDone(msecs)
+
+    def _take_current(self, key, generation):
+        task = self._tasks.get(key)
+        if task is None or task.generation != generation:
+            # Superseded or cancelled while running
+            return None
+        del self._tasks[key]
+        return self._callbacks.pop(key, (None, None))
+
+    @pyqtSlot(str, int, object)
+    def _on_finished(self, key, generation, result):
+        callbacks = self._take_current(key, generation)
+        if callbacks is None:
+            return
+        on_result, _ = callbacks
+        if on_result is not None:
+            try:
+                on_result(result)
+            except Exception as e:
+                logger.error(f"Error applying background load '{key}': {e}")
+        self.result_ready.emit(key, result)
+
+    @pyqtSlot(str, int, str)
+    def _on_failed(self, key, generation, message):
+        callbacks = self._take_current(key, generation)
+        if callbacks is None:
+            return
+        _, on_error = callbacks
+        if on_error is not None:
+            on_error(message)
+        self.error_occurred.emit(key, message)
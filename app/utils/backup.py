@@ -43,7 +43,8 @@ class BackupManager:
             backup_filename = f"shop_db_backup_{timestamp}.db"
             backup_path = os.path.join(backup_dir, backup_filename)
             
-            # Make a direct copy of the database file
+            # Make a direct copy of the database file, with the WAL folded in
+            DatabaseManager.checkpoint()
             shutil.copy2(db_path, backup_path)
             
             logger.info(f"Database backup created at {backup_path}")
@@ -213,9 +214,11 @@ class BackupManager:
                 return False
             
             # Make a backup just in case
+            DatabaseManager.checkpoint()
             shutil.copy2(db_path, pre_restore_backup)
             
-            # Restore the backup
+            # Restore the backup; pooled connections reopen on the restored file
+            DatabaseManager.get_pool().close_all()
             shutil.copy2(backup_path, db_path)
             
             logger.info(f"Database restored from backup {backup_path}")
@@ -1,77 +1,171 @@
+import sys
 import time
-from datetime import datetime, timedelta
+import heapq
+import inspect
+import functools
+import itertools
+import weakref
+from collections import OrderedDict
+from datetime import datetime
 import threading
 from app.utils.logger import Logger
 logger = Logger()
 
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_MISSING = object()
+
+
+def estimate_size(value, _depth=0):
+    """Approximate memory footprint of a cached value in bytes."""
+    if hasattr(value, 'memory_usage') and hasattr(value, 'columns'):
+        # pandas DataFrame
+        try:
+            return int(value.memory_usage(deep=True).sum())
+        except Exception:
+            pass
+    if hasattr(value, 'nbytes'):
+        # NumPy arrays and pandas Series
+        try:
+            return int(value.nbytes)
+        except Exception:
+            pass
+    size = sys.getsizeof(value, 64)
+    if _depth >= 4:
+        return size
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _depth + 1) for item in value)
+    elif hasattr(value, '__dict__'):
+        size += estimate_size(vars(value), _depth + 1)
+    return size
+
+
+def key_prefixes(key):
+    """Colon-delimited prefixes of a key: 'inventory:low_stock:5' -> 'inventory:', 'inventory:low_stock:'."""
+    if not isinstance(key, str):
+        return []
+    parts = key.split(':')[:-1]
+    return [':'.join(parts[:i + 1]) + ':' for i in range(len(parts))]
+
+
 class CacheEntry:
     """Class representing a single cached item"""
-    def __init__(self, value, ttl_seconds=300):
+    def __init__(self, value, ttl_seconds=300, size=0, tags=()):
         self.value = value
-        self.expiry = datetime.now() + timedelta(seconds=ttl_seconds)
-    
-    def is_expired(self):
+        self.size = size
+        self.tags = frozenset(tags)
+        self.expiry = time.monotonic() + ttl_seconds
+
+    def is_expired(self, now=None):
         """Check if the cache entry has expired"""
-        return datetime.now() > self.expiry
-    
+        return (time.monotonic() if now is None else now) > self.expiry
+
     def get_value(self):
         """Get the cached value"""
         return self.value
 
+class _Flight:
+    """A get_or_set miss being computed: callers for the key queue on lock"""
+    __slots__ = ('lock', 'waiters', 'tags', 'stale')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.waiters = 0
+        # Tags and key prefixes the result will be stored under
+        self.tags = frozenset()
+        # Set when an invalidation covers the result being computed
+        self.stale = False
+
+
 class CacheManager:
     """
     Cache manager for storing frequently accessed data to improve performance.
-    Uses a singleton pattern and automatic cache expiry.
+    Uses a singleton pattern, LRU eviction bounded by entry count and
+    estimated bytes, and a monotonic expiry heap so only entries that are
+    actually due are visited when expiring.
+    Entries can carry tags; invalidate_tag() and invalidate_prefix() drop
+    every entry under a tag or colon-delimited key prefix through an index
+    instead of guessing individual keys.
     """
     _instance = None
     _lock = threading.RLock()
-    
+
     def __new__(cls):
         with cls._lock:
             if cls._instance is None:
                 cls._instance = super(CacheManager, cls).__new__(cls)
                 cls._instance._initialize()
             return cls._instance
-    
+
     def _initialize(self):
         """Initialize the cache manager"""
-        self._cache = {}
+        self._cache = OrderedDict()
+        self._tag_index = {}
+        self._expiry_heap = []
+        self._sequence = itertools.count()
+        self._max_entries = DEFAULT_MAX_ENTRIES
+        self._max_bytes = DEFAULT_MAX_BYTES
+        self._current_bytes = 0
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+        # Key -> _Flight; invalidations mark the ones they cover so stale results are not stored
+        self._flights = {}
         self._last_cleanup = datetime.now()
-        
-        # Start the cleanup thread
-        self._cleanup_interval = 60  # seconds
+
+        # Start the cleanup thread; it sleeps until the next entry is due
+        self._cleanup_interval = 60  # seconds, upper bound between wakeups
+        self._wakeup = threading.Event()
         self._cleanup_thread = threading.Thread(target=self._cleanup_loop, daemon=True)
         self._cleanup_thread.start()
-    
+
+    def configure(self, max_entries=None, max_bytes=None):
+        """Change the size bounds; entries over the new bounds are evicted immediately."""
+        with self._lock:
+            if max_entries is not None:
+                self._max_entries = max_entries
+            if max_bytes is not None:
+                self._max_bytes = max_bytes
+            self._enforce_bounds()
+
     def _cleanup_loop(self):
-        """Background thread to periodically clean up expired cache entries"""
+        """Background thread that expires entries as they become due"""
         while True:
-            time.sleep(self._cleanup_interval)
+            with self._lock:
+                if self._expiry_heap:
+                    delay = self._expiry_heap[0][0] - time.monotonic()
+                else:
+                    delay = self._cleanup_interval
+            self._wakeup.wait(min(max(delay, 0.01), self._cleanup_interval))
+            self._wakeup.clear()
             try:
                 self.cleanup()
             except Exception as e:
                 logger.error(f"Error in cache cleanup: {e}")
-    
+
     def cleanup(self):
         """Remove expired cache entries"""
         with self._lock:
-            now = datetime.now()
-            keys_to_remove = []
-            
-            for key, entry in self._cache.items():
-                if entry.is_expired():
-                    keys_to_remove.append(key)
-            
-            for key in keys_to_remove:
-                del self._cache[key]
-            
-            if keys_to_remove:
-                logger.debug(f"Cache cleanup: removed {len(keys_to_remove)} expired entries")
-            
-            self._last_cleanup = now
-    
+            now = time.monotonic()
+            removed = 0
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                _, _, key, entry = heapq.heappop(self._expiry_heap)
+                # Skip heap items left behind by overwritten or deleted keys
+                if self._cache.get(key) is entry:
+                    self._remove(key)
+                    self._expirations += 1
+                    removed += 1
+
+            if removed:
+                logger.debug(f"Cache cleanup: removed {removed} expired entries")
+
+            self._last_cleanup = datetime.now()
+
     def get(self, key, default=None):
         """
         Get a value from the cache.
@@ -79,46 +173,139 @@ class CacheManager:
         """
         with self._lock:
             entry = self._cache.get(key)
-            
+
             if entry is None:
                 self._misses += 1
                 return default
-            
+
             if entry.is_expired():
-                del self._cache[key]
+                self._remove(key)
+                self._expirations += 1
                 self._misses += 1
                 return default
-            
+
+            self._cache.move_to_end(key)
             self._hits += 1
             return entry.get_value()
-    
-    def set(self, key, value, ttl=None, ttl_seconds=None):
+
+    def set(self, key, value, ttl=None, ttl_seconds=None, tags=None):
         """
-        Set a value in the cache with an optional time-to-live.
+        Set a value in the cache with an optional time-to-live and tags.
         Default TTL is 5 minutes (300 seconds).
         """
         if ttl is None and ttl_seconds is None:
             ttl = 300
         if ttl_seconds is not None:
             ttl = ttl_seconds
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+            if size > self._max_bytes:
+                logger.debug(f"Cache: not storing {key}, {size} bytes exceeds the cache limit")
+                self._evictions += 1
+                return
+            entry = CacheEntry(value, ttl, size, tags or ())
+            self._cache[key] = entry
+            self._current_bytes += size
+            for tag in entry.tags.union(key_prefixes(key)):
+                self._tag_index.setdefault(tag, set()).add(key)
+            due_first = not self._expiry_heap or entry.expiry < self._expiry_heap[0][0]
+            heapq.heappush(self._expiry_heap, (entry.expiry, next(self._sequence), key, entry))
+            self._enforce_bounds()
+            self._compact_heap()
+        if due_first:
+            self._wakeup.set()
+
+    def get_or_set(self, key, compute, ttl=None, tags=None, cache_if=None):
+        """
+        Return the cached value for key, or compute, store and return it.
+        Concurrent misses for the same key wait for a single computation.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
         with self._lock:
-            self._cache[key] = CacheEntry(value, ttl)
-    
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+            flight.waiters += 1
+        try:
+            with flight.lock:
+                with self._lock:
+                    entry = self._cache.get(key)
+                    if entry is not None and not entry.is_expired():
+                        # Computed by the thread we waited for
+                        return entry.get_value()
+                    flight.tags = frozenset(tags or ()).union(key_prefixes(key))
+                    flight.stale = False
+                value = compute()
+                with self._lock:
+                    if not flight.stale and (cache_if is None or cache_if(value)):
+                        self.set(key, value, ttl=ttl, tags=tags)
+                return value
+        finally:
+            with self._lock:
+                flight.waiters -= 1
+                if flight.waiters == 0:
+                    self._flights.pop(key, None)
+
+    def _mark_stale(self, covers):
+        """Keep in-flight results for which covers(key, flight) is true from being stored"""
+        for key, flight in self._flights.items():
+            if covers(key, flight):
+                flight.stale = True
+
     def delete(self, key):
         """Delete a specific key from the cache"""
         with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.stale = True
             if key in self._cache:
-                del self._cache[key]
+                self._remove(key)
                 return True
             return False
-    
+
+    def invalidate_tag(self, *tags):
+        """Delete every entry carrying any of the tags; returns the number removed"""
+        with self._lock:
+            self._mark_stale(lambda key, flight: not flight.tags.isdisjoint(tags))
+            removed = 0
+            for tag in tags:
+                for key in list(self._tag_index.get(tag, ())):
+                    self._remove(key)
+                    removed += 1
+            self._invalidations += removed
+            return removed
+
+    def invalidate_prefix(self, prefix):
+        """Delete every entry whose key starts with prefix; returns the number removed"""
+        with self._lock:
+            if prefix.endswith(':'):
+                # Colon-delimited prefixes are indexed like tags
+                return self.invalidate_tag(prefix)
+            self._mark_stale(lambda key, flight: isinstance(key, str) and key.startswith(prefix))
+            keys = [key for key in self._cache if isinstance(key, str) and key.startswith(prefix)]
+            for key in keys:
+                self._remove(key)
+            self._invalidations += len(keys)
+            return len(keys)
+
     def clear(self):
         """Clear all cached entries"""
         with self._lock:
+            self._mark_stale(lambda key, flight: True)
             self._cache.clear()
+            self._tag_index = {}
+            self._expiry_heap = []
+            self._current_bytes = 0
             self._hits = 0
             self._misses = 0
-    
+            self._evictions = 0
+            self._expirations = 0
+            self._invalidations = 0
+
     def get_stats(self):
         """Get cache statistics"""
         with self._lock:
@@ -130,8 +317,130 @@ class CacheManager:
                 "total_requests": total_requests,
                 "hit_rate": hit_rate,
                 "cached_items": len(self._cache),
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+                "tags": len(self._tag_index),
+                "current_bytes": self._current_bytes,
+                "max_bytes": self._max_bytes,
+                "max_entries": self._max_entries,
                 "last_cleanup": self._last_cleanup
             }
 
+    def _remove(self, key):
+        entry = self._cache.pop(key)
+        self._current_bytes -= entry.size
+        for tag in entry.tags.union(key_prefixes(key)):
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def _enforce_bounds(self):
+        """Evict least recently used entries until both bounds are met"""
+        while self._cache and (len(self._cache) > self._max_entries or self._current_bytes > self._max_bytes):
+            key = next(iter(self._cache))
+            self._remove(key)
+            self._evictions += 1
+
+    def _compact_heap(self):
+        """Drop heap items for entries no longer cached once they dominate the heap"""
+        if len(self._expiry_heap) > 2 * len(self._cache) + 64:
+            self._expiry_heap = [item for item in self._expiry_heap if self._cache.get(item[2]) is item[3]]
+            heapq.heapify(self._expiry_heap)
+
 # Global access point
-global_cache = CacheManager() 
\ No newline at end of file
+global_cache = CacheManager()
+
+_instance_tokens = itertools.count(1)
+_event_hooks = set()
+_replica_hooks = weakref.WeakKeyDictionary()
+
+
+class uncached:
+    """Wraps a result a @cached function returns without storing it, e.g. an error fallback"""
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+def invalidate_on_events(namespace, signal_names):
+    """Invalidate a cache namespace whenever one of the global event system's signals fires"""
+    try:
+        from app.utils.event_system import global_event_system
+    except Exception as e:
+        logger.warning(f"Cache namespace {namespace} cannot listen for events: {e}")
+        return
+    for name in signal_names:
+        if (namespace, name) in _event_hooks:
+            continue
+        getattr(global_event_system, name).connect(
+            lambda data=None, namespace=namespace: global_cache.invalidate_tag(namespace)
+        )
+        _event_hooks.add((namespace, name))
+
+
+def invalidate_on_changes(namespace, replica):
+    """Invalidate a cache namespace whenever a record in a FirebaseReplica changes"""
+    namespaces = _replica_hooks.setdefault(replica, set())
+    if namespace in namespaces:
+        return
+    replica.add_listener(lambda key, old, new, namespace=namespace: global_cache.invalidate_tag(namespace))
+    namespaces.add(namespace)
+
+
+def cached(namespace, ttl=300, key=None, tags=(), invalidate_on=(), cache_if=None):
+    """
+    Memoize a function or method in global_cache.
+
+    Entries are stored as "<namespace>:<function>:<key>" and tagged with the
+    namespace (plus any extra tags), so global_cache.invalidate_tag(namespace)
+    or one of the invalidate_on event system signals clears them. key is an
+    optional callable taking the same arguments as the function; by default
+    the bound arguments are used, with methods keyed per instance.
+    Concurrent misses for the same key compute once. Results wrapped in
+    uncached(), and those cache_if rejects, are returned but not stored.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        is_method = next(iter(signature.parameters), None) in ('self', 'cls')
+        entry_tags = [namespace, *tags]
+        if invalidate_on:
+            invalidate_on_events(namespace, invalidate_on)
+
+        def make_key(args, kwargs):
+            if key is not None:
+                suffix = key(*args, **kwargs)
+            else:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                values = list(bound.arguments.values())
+                suffix = repr(tuple(values[1:] if is_method else values))
+            if is_method and args:
+                owner = args[0]
+                token = getattr(owner, '_cache_token', None)
+                if token is None:
+                    token = next(_instance_tokens)
+                    try:
+                        owner._cache_token = token
+                    except AttributeError:
+                        token = id(owner)
+                return f"{namespace}:{func.__name__}:{token}:{suffix}"
+            return f"{namespace}:{func.__name__}:{suffix}"
+
+        def keep(result):
+            return not isinstance(result, uncached) and (cache_if is None or cache_if(result))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            result = global_cache.get_or_set(
+                make_key(args, kwargs), lambda: func(*args, **kwargs),
+                ttl=ttl, tags=entry_tags, cache_if=keep
+            )
+            return result.value if isinstance(result, uncached) else result
+
+        wrapper.invalidate = lambda: global_cache.invalidate_tag(namespace)
+        return wrapper
+    return decorator
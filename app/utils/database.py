@@ -1,12 +1,220 @@
 import sqlite3
 import os
+import time
+import threading
+from collections import namedtuple
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
 from PyQt5.QtSql import QSqlDatabase, QSqlQuery
+from app.utils.logger import Logger
+
+logger = Logger()
+
+# Prepared statements kept per connection; reports and models use a few hundred distinct queries at most
+STATEMENT_CACHE_SIZE = 256
+# Rows fetched per round trip when streaming results
+FETCH_BATCH_SIZE = 500
+# Timed queries slower than this are logged as warnings
+SLOW_QUERY_SECONDS = 0.25
+
+# Applied once to every pooled connection when it is opened
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA cache_size = -16000",     # 16 MiB page cache
+    "PRAGMA mmap_size = 268435456",   # 256 MiB memory map
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+def dict_factory(cursor, row):
+    """Row factory returning plain dicts keyed by column name"""
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+_record_types = {}
+
+
+def namedtuple_factory(cursor, row):
+    """Row factory returning namedtuples, with one class per distinct column list"""
+    fields = tuple(column[0] for column in cursor.description)
+    record_type = _record_types.get(fields)
+    if record_type is None:
+        record_type = _record_types[fields] = namedtuple('Row', fields, rename=True)
+    return record_type(*row)
+
+
+ROW_FACTORIES = {
+    'row': sqlite3.Row,
+    'dict': dict_factory,
+    'namedtuple': namedtuple_factory,
+    'tuple': None,
+}
+
+
+def iter_rows(conn, query, params=None, row_factory='row', batch_size=FETCH_BATCH_SIZE):
+    """
+    Stream the rows of a read query on conn in fetchmany batches, so only
+    batch_size rows are held at a time. row_factory names an entry of
+    ROW_FACTORIES. The cursor is closed when the generator finishes or is
+    closed early.
+    """
+    cursor = conn.execute(query, params or ())
+    cursor.row_factory = ROW_FACTORIES[row_factory]
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cursor.close()
+
+
+def _is_read_only(query):
+    return query.lstrip().split(None, 1)[0].upper() in ('SELECT', 'WITH', 'PRAGMA', 'EXPLAIN', 'VALUES')
+
+
+def ensure_indexes(conn, indexes):
+    """
+    Create missing indexes given as (name, table, columns, where) tuples; where
+    may be None. Indexes on tables that do not exist or lack one of the columns
+    (older schemas) are skipped and logged. Returns the names created or
+    already present.
+    """
+    table_columns = {}
+    created = []
+    for name, table, columns, where in indexes:
+        if table not in table_columns:
+            table_columns[table] = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        missing = [column for column in columns if column not in table_columns[table]]
+        if not table_columns[table]:
+            logger.info(f"Skipped index {name}: table {table} does not exist")
+            continue
+        if missing:
+            logger.warning(f"Skipped index {name}: {table} has no column {', '.join(missing)}")
+            continue
+        sql = f"CREATE INDEX IF NOT EXISTS {name} ON {table}({', '.join(columns)})"
+        conn.execute(sql + (f" WHERE {where}" if where else ""))
+        created.append(name)
+    return created
+
+
+def keyset_filter(column, key_column, cursor):
+    """
+    WHERE fragment and params for the rows after cursor = (value, key) in
+    ORDER BY column DESC, key_column DESC order. The range on column stays
+    sargable. NULL values sort last, so a cursor with value None seeks
+    among them.
+    """
+    value, key = cursor
+    if value is None:
+        return f"({column} IS NULL AND {key_column} < ?)", [key]
+    return f"({column} <= ? AND ({column} < ? OR {key_column} < ?))", [value, value, key]
+
+
+def keyset_page(rows, page_size, column, key_column='id'):
+    """
+    Build a page from up to page_size + 1 fetched rows. next_cursor is the
+    (column, key_column) of the last row kept, or None on the last page.
+    """
+    rows = list(rows)
+    if len(rows) <= page_size:
+        return {'rows': rows, 'next_cursor': None}
+    rows = rows[:page_size]
+    last = rows[-1]
+    return {'rows': rows, 'next_cursor': (last[column], last[key_column])}
+
+
+@contextmanager
+def transaction(conn, immediate=False):
+    """
+    Run a block in a transaction on conn: commit on success, roll back on error.
+    immediate=True takes the write lock up front (BEGIN IMMEDIATE) so a writer
+    never fails half way on a lock upgrade. Nested use becomes a savepoint.
+    """
+    if conn.in_transaction:
+        name = f"sp_{threading.get_ident()}_{id(conn)}"
+        conn.execute(f"SAVEPOINT {name}")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute(f"ROLLBACK TO SAVEPOINT {name}")
+            conn.execute(f"RELEASE SAVEPOINT {name}")
+            raise
+        conn.execute(f"RELEASE SAVEPOINT {name}")
+        return
+    conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+class SQLiteConnectionPool:
+    """
+    One long-lived SQLite connection per thread for a database file, with WAL
+    and the other pragmas set when the connection is opened rather than per
+    query. Connections are reused until close_all().
+    """
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._generation = 0
+
+    def connection(self):
+        """The calling thread's connection, opened on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.generation == self._generation:
+            return conn
+        conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in SQLITE_PRAGMAS:
+            conn.execute(pragma)
+        with self._lock:
+            self._connections.append(conn)
+            self._local.conn = conn
+            self._local.generation = self._generation
+        return conn
+
+    @contextmanager
+    def transaction(self, immediate=False):
+        """Transaction on the calling thread's connection."""
+        with transaction(self.connection(), immediate=immediate) as conn:
+            yield conn
+
+    def close_all(self):
+        """Close every thread's connection; threads reopen on next use."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    @property
+    def size(self):
+        return len(self._connections)
+
 
 class DatabaseManager:
     """A utility class to manage database connections and operations"""
     _instance = None
     _qt_connection = None
+    _pool = None
+    _db_path = None
+    _query_stats = {}
+    _query_stats_lock = threading.Lock()
     
     def __new__(cls):
         if cls._instance is None:
@@ -16,6 +224,8 @@ class DatabaseManager:
     @staticmethod
     def get_db_path():
         """Returns the standardized database path"""
+        if DatabaseManager._db_path:
+            return DatabaseManager._db_path
         base_dir = Path(__file__).resolve().parent.parent.parent
         db_path = os.path.join(base_dir, "data", "shop.db")
         
@@ -24,15 +234,24 @@ class DatabaseManager:
         
         return db_path
     
+    @staticmethod
+    def get_pool():
+        """Get the SQLite connection pool for the current database path"""
+        pool = DatabaseManager._pool
+        if pool is None or pool.db_path != DatabaseManager.get_db_path():
+            if pool is not None:
+                pool.close_all()
+            pool = DatabaseManager._pool = SQLiteConnectionPool(DatabaseManager.get_db_path())
+        return pool
+
     @staticmethod
     def get_sqlite_connection():
-        """Get a raw SQLite connection for direct SQL operations"""
-        db_path = DatabaseManager.get_db_path()
+        """
+        Get the calling thread's pooled SQLite connection for direct SQL
+        operations. The connection is shared; do not close it.
+        """
         try:
-            conn = sqlite3.connect(db_path)
-            conn.row_factory = sqlite3.Row
-            conn.execute("PRAGMA foreign_keys = ON")
-            return conn
+            return DatabaseManager.get_pool().connection()
         except sqlite3.Error as e:
             print(f"SQLite connection error: {e}")
             return None
@@ -57,9 +276,18 @@ class DatabaseManager:
             
         return DatabaseManager._qt_connection
     
+    @staticmethod
+    def checkpoint():
+        """Fold the WAL into the main database file so it can be copied on its own"""
+        conn = DatabaseManager.get_sqlite_connection()
+        if conn is not None:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
     @staticmethod
     def close_connections():
         """Close all database connections"""
+        if DatabaseManager._pool:
+            DatabaseManager._pool.close_all()
         if DatabaseManager._qt_connection:
             DatabaseManager._qt_connection.close()
             DatabaseManager._qt_connection = None
@@ -67,11 +295,49 @@ class DatabaseManager:
                 QSqlDatabase.removeDatabase("qt_sql_default_connection")
     
     @staticmethod
-    def execute_query(query, params=None):
-        """Execute a query and return results"""
-        if query.strip().lower().startswith("select"):
-            return [(1,)]
-        return []
+    def execute_query(query, params=None, row_factory='row', timed=False):
+        """
+        Execute a query on the pooled connection and return all result rows.
+
+        row_factory is 'row' (sqlite3.Row, indexable by position or name),
+        'dict', 'namedtuple' or 'tuple'. Statements that modify data run in
+        their own transaction. With timed=True the duration is recorded (see
+        get_query_stats) and slow queries are logged. Raises sqlite3.Error.
+        """
+        conn = DatabaseManager.get_pool().connection()
+        started = time.perf_counter() if timed else None
+        with nullcontext() if _is_read_only(query) else transaction(conn):
+            cursor = conn.execute(query, params or ())
+            cursor.row_factory = ROW_FACTORIES[row_factory]
+            rows = cursor.fetchall() if cursor.description else []
+        if timed:
+            DatabaseManager._record_timing(query, time.perf_counter() - started)
+        return rows
+
+    @staticmethod
+    def iter_query(query, params=None, row_factory='row', batch_size=FETCH_BATCH_SIZE):
+        """Stream the rows of a read query in fetchmany batches instead of loading them all"""
+        return iter_rows(DatabaseManager.get_pool().connection(), query, params, row_factory, batch_size)
+
+    @staticmethod
+    def _record_timing(query, seconds):
+        sql = ' '.join(query.split())
+        with DatabaseManager._query_stats_lock:
+            stats = DatabaseManager._query_stats.setdefault(sql, {'count': 0, 'total': 0.0, 'max': 0.0})
+            stats['count'] += 1
+            stats['total'] += seconds
+            stats['max'] = max(stats['max'], seconds)
+        if seconds >= SLOW_QUERY_SECONDS:
+            logger.warning(f"Slow query ({seconds * 1000:.0f} ms): {sql[:200]}")
+
+    @staticmethod
+    def get_query_stats():
+        """Per-query timing totals for queries executed with timed=True"""
+        with DatabaseManager._query_stats_lock:
+            return {
+                sql: dict(stats, avg=stats['total'] / stats['count'])
+                for sql, stats in DatabaseManager._query_stats.items()
+            }
     
     @staticmethod
     def execute_insert(query, params=None):
@@ -81,33 +347,24 @@ class DatabaseManager:
             return None
             
         try:
-            cursor = conn.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-                
-            conn.commit()
-            last_id = cursor.lastrowid
-            cursor.close()
-            conn.close()
-            return last_id
+            with transaction(conn):
+                cursor = conn.execute(query, params or ())
+            return cursor.lastrowid
         except sqlite3.Error as e:
             print(f"Insert execution error: {e}")
-            if conn:
-                conn.close()
             return None
 
     def initialize(self, db_path=None):
-        pass
+        """Point the manager (and its connection pool) at another database file"""
+        if DatabaseManager._pool:
+            DatabaseManager._pool.close_all()
+            DatabaseManager._pool = None
+        DatabaseManager._db_path = db_path
+        DatabaseManager.get_pool()
 
-    def execute(self, *args, **kwargs):
-        class DummyCursor:
-            def execute(self, *a, **k): return self
-            def fetchone(self): return (1,)
-            def fetchall(self): return [(1,)]
-            def close(self): pass
-        return DummyCursor()
+    def execute(self, query, params=None):
+        """Execute a statement on the pooled connection and return its cursor"""
+        return DatabaseManager.get_pool().connection().execute(query, params or ())
 
     @property
     def engine(self):
@@ -115,19 +372,19 @@ class DatabaseManager:
             pass
         return DummyEngine()
 
-    def transaction(self):
-        class DummyContext:
-            def __enter__(self): return self
-            def __exit__(self, exc_type, exc_val, exc_tb): pass
-            def execute(self, *a, **k): return self
-            def fetchall(self): return [(1,)]
-        return DummyContext()
+    def transaction(self, immediate=False):
+        """Context manager running a block in a transaction on the pooled connection"""
+        return DatabaseManager.get_pool().transaction(immediate=immediate)
 
     def commit(self):
         pass
 
     def is_connected(self):
-        return True
+        try:
+            DatabaseManager.get_pool().connection().execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
 
 # --- db_manager stub for test compatibility ---
 db_manager = DatabaseManager()
@@ -1,12 +1,38 @@
-from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
 import logging
+import threading
+from contextlib import contextmanager
 from app.utils.logger import Logger
 logger = Logger()
 
+# Coalescing windows (ms) used once coalescing is enabled; 0 delivers immediately
+DEFAULT_COALESCE_WINDOWS = {
+    "inventory": 150,
+    "sales": 150,
+    "customer": 150,
+    "reports": 0,
+    "settings": 0
+}
+
+
+def merge_changes(changes):
+    """Merge queued notification payloads into the one delivered to listeners"""
+    changes = [change for change in changes if change]
+    if not changes:
+        return {}
+    if len(changes) == 1:
+        return changes[0]
+    return {"action": "batch", "changes": changes, "count": len(changes)}
+
+
 class EventSystem(QObject):
     """
     Central event system for broadcasting changes across the application.
     This enables real-time updates across different views when data changes.
+
+    Each signal can have a coalescing window: notifications arriving within
+    the window are delivered once, with the merged change set, when it ends.
+    batch() defers every delivery until the outermost scope exits.
     """
     # Define signals for different data updates
     inventory_updated = pyqtSignal(object)  # Emitted when inventory data changes
@@ -14,6 +40,9 @@ class EventSystem(QObject):
     customer_updated = pyqtSignal(object)   # Emitted when customer data changes
     reports_updated = pyqtSignal(object)    # Emitted when reports are generated
     settings_updated = pyqtSignal(object)   # Emitted when settings change
+
+    # Asks the event system's own thread to start a coalescing timer
+    _arm_requested = pyqtSignal(str)
     
     # Singleton instance
     _instance = None
@@ -29,7 +58,22 @@ class EventSystem(QObject):
                 "reports": 0,
                 "settings": 0
             }
+            cls._instance._delivery_counts = dict.fromkeys(cls._instance._signal_counts, 0)
+            cls._instance._windows = dict.fromkeys(cls._instance._signal_counts, 0)
+            cls._instance._pending = {}
+            cls._instance._timers = {}
+            cls._instance._batch_depth = 0
+            cls._instance._pending_lock = threading.RLock()
+            cls._instance._initialized = False
         return cls._instance
+
+    def __init__(self):
+        # EventSystem() returns the singleton; re-initializing the QObject would drop its connections
+        if self._initialized:
+            return
+        super().__init__()
+        self._initialized = True
+        self._arm_requested.connect(self._arm_timer)
     
     def set_debug_mode(self, enabled=True):
         """Enable or disable debug mode for event tracing"""
@@ -47,38 +91,106 @@ class EventSystem(QObject):
     
     def notify_inventory_update(self, data=None):
         """Notify all listeners about inventory changes"""
-        if self._debug_mode:
-            logger.debug(f"EVENT: Emitting inventory_updated signal")
-        self._signal_counts["inventory"] += 1
-        self.inventory_updated.emit(data or {})
+        self._notify("inventory", data)
         
     def notify_sales_update(self, data=None):
         """Notify all listeners about sales changes"""
-        if self._debug_mode:
-            logger.debug(f"EVENT: Emitting sales_updated signal")
-        self._signal_counts["sales"] += 1
-        self.sales_updated.emit(data or {})
+        self._notify("sales", data)
         
     def notify_customer_update(self, data=None):
         """Notify all listeners about customer changes"""
-        if self._debug_mode:
-            logger.debug(f"EVENT: Emitting customer_updated signal")
-        self._signal_counts["customer"] += 1
-        self.customer_updated.emit(data or {})
+        self._notify("customer", data)
         
     def notify_reports_update(self, data=None):
         """Notify all listeners about report generation"""
-        if self._debug_mode:
-            logger.debug(f"EVENT: Emitting reports_updated signal")
-        self._signal_counts["reports"] += 1
-        self.reports_updated.emit(data or {})
+        self._notify("reports", data)
         
     def notify_settings_update(self, data=None):
         """Notify all listeners about settings changes"""
+        self._notify("settings", data)
+        
+    def get_delivery_counts(self):
+        """Get the count of signals actually delivered to listeners by type"""
+        return self._delivery_counts.copy()
+
+    def set_coalescing_window(self, kind, window_ms):
+        """Set the coalescing window for one signal type (0 delivers immediately)"""
+        if kind not in self._windows:
+            raise ValueError(f"Unknown event type: {kind}")
+        self._windows[kind] = max(0, int(window_ms))
+        if not self._windows[kind]:
+            self.flush(kind)
+
+    def enable_coalescing(self, windows=None):
+        """Apply coalescing windows to every signal type; needs a running Qt event loop"""
+        for kind, window_ms in (windows or DEFAULT_COALESCE_WINDOWS).items():
+            self.set_coalescing_window(kind, window_ms)
+
+    def disable_coalescing(self):
+        """Deliver every notification immediately again"""
+        for kind in self._windows:
+            self.set_coalescing_window(kind, 0)
+
+    @contextmanager
+    def batch(self):
+        """Defer all deliveries until the outermost batch scope exits"""
+        with self._pending_lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._pending_lock:
+                self._batch_depth -= 1
+                done = self._batch_depth == 0
+            if done:
+                self.flush()
+
+    def flush(self, kind=None):
+        """Deliver queued notifications now, for one signal type or all of them"""
+        for name in ([kind] if kind else list(self._windows)):
+            self._deliver(name)
+
+    def _notify(self, kind, data):
         if self._debug_mode:
-            logger.debug(f"EVENT: Emitting settings_updated signal")
-        self._signal_counts["settings"] += 1
-        self.settings_updated.emit(data or {})
+            logger.debug(f"EVENT: Emitting {kind}_updated signal")
+        with self._pending_lock:
+            self._signal_counts[kind] += 1
+            if not self._batch_depth and not self._windows[kind] and kind not in self._pending:
+                immediate = True
+            else:
+                immediate = False
+                first = kind not in self._pending
+                self._pending.setdefault(kind, []).append(data or {})
+        if immediate:
+            self._emit(kind, data or {})
+        elif first and not self._batch_depth and self._windows[kind]:
+            # Timers must be started from the thread that owns the event system
+            self._arm_requested.emit(kind)
+
+    def _arm_timer(self, kind):
+        timer = self._timers.get(kind)
+        if timer is None:
+            timer = self._timers[kind] = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda kind=kind: self._deliver(kind))
+        if not timer.isActive():
+            timer.start(self._windows[kind])
+
+    def _deliver(self, kind):
+        with self._pending_lock:
+            if self._batch_depth:
+                # Delivered when the batch scope exits
+                return
+            changes = self._pending.pop(kind, None)
+        if changes is None:
+            return
+        if self._debug_mode:
+            logger.debug(f"EVENT: Delivering {len(changes)} coalesced {kind} notification(s)")
+        self._emit(kind, merge_changes(changes))
+
+    def _emit(self, kind, data):
+        self._delivery_counts[kind] += 1
+        getattr(self, f"{kind}_updated").emit(data)
 
 # Global access point
 global_event_system = EventSystem() 
\ No newline at end of file
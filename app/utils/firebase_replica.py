@@ -0,0 +1,237 @@
+import copy
+import threading
+import time
+from app.utils.logger import Logger
+
+logger = Logger()
+
+# Seconds a replica without a change stream serves its last download
+# before it tries to listen again (and re-downloads if it still cannot)
+LISTEN_RETRY_INTERVAL = 30.0
+
+
+def _split_path(path):
+    return [segment for segment in (path or '').split('/') if segment]
+
+
+class FirebaseReplica:
+    """
+    Local in-memory replica of one Realtime Database node.
+    The node is downloaded once, then kept current from the reference's
+    listen() change stream (or a LocalDatabase stand-in), so readers are
+    served from memory instead of re-downloading the whole tree.
+    Replicas are shared per database path through for_reference().
+    If listening fails, the last download is served and listening is
+    retried every retry_interval seconds.
+    """
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, ref, initial_timeout=10.0, retry_interval=LISTEN_RETRY_INTERVAL):
+        self._ref = ref
+        self._data = {}
+        self._lock = threading.RLock()
+        self._loaded = threading.Event()
+        self._live = False
+        self._registration = None
+        self._listeners = []
+        self._initial_timeout = initial_timeout
+        self.retry_interval = retry_interval
+        self._last_attempt = 0.0
+        self.version = 0
+        self.stats = {"full_loads": 0, "events": 0, "last_sync": None}
+
+    @classmethod
+    def for_reference(cls, ref, **kwargs):
+        """Return the shared replica for a reference, creating it on first use."""
+        key = (id(getattr(ref, '_client', None)), getattr(ref, 'path', None))
+        with cls._registry_lock:
+            replica = cls._registry.get(key)
+            if replica is None:
+                replica = cls(ref, **kwargs)
+                cls._registry[key] = replica
+            return replica
+
+    @classmethod
+    def reset_registry(cls):
+        """Close and forget every shared replica (used on logout and in tests)."""
+        with cls._registry_lock:
+            replicas = list(cls._registry.values())
+            cls._registry.clear()
+        for replica in replicas:
+            replica.close()
+
+    @property
+    def is_live(self):
+        return self._live
+
+    def start(self):
+        """Load the node and subscribe to its change stream."""
+        if self._registration is not None:
+            return
+        self._last_attempt = time.monotonic()
+        try:
+            self._registration = self._ref.listen(self._on_event)
+            self._live = True
+        except Exception as e:
+            logger.warning(f"Replica for {getattr(self._ref, 'path', '?')} could not listen for changes: {e}")
+            self._registration = None
+            self._live = False
+        if not self._live or not self._loaded.wait(self._initial_timeout):
+            self.reload()
+
+    def close(self):
+        """Stop listening for changes; the next read reloads from the server."""
+        if self._registration is not None:
+            try:
+                self._registration.close()
+            except Exception as e:
+                logger.warning(f"Error closing replica listener: {e}")
+        self._registration = None
+        self._live = False
+        self._loaded.clear()
+
+    def reload(self):
+        """Replace the replica with a fresh full download of the node."""
+        data = self._ref.get()
+        data = data.val() if hasattr(data, 'val') else data
+        with self._lock:
+            self._replace(data if isinstance(data, dict) else {})
+            self.stats["full_loads"] += 1
+        self._loaded.set()
+
+    def ensure_loaded(self):
+        """Make sure the replica holds current data before it is read."""
+        if self._live:
+            if not self._loaded.is_set():
+                self._loaded.wait(self._initial_timeout)
+        elif not self._loaded.is_set() or time.monotonic() - self._last_attempt >= self.retry_interval:
+            # Without a change stream, the last download is served until the next attempt
+            self.start()
+
+    def add_listener(self, callback, replay=False):
+        """
+        Register callback(key, old_record, new_record) for every record change.
+        It is called with the replica lock held, in change order. With replay,
+        records already loaded are first delivered as (key, None, record).
+        """
+        with self._lock:
+            self._listeners.append(callback)
+            if replay and self._loaded.is_set():
+                for key, record in self._data.items():
+                    callback(key, None, record)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    # --- Reads -----------------------------------------------------------
+
+    def get(self, key, default=None):
+        """Return a copy of one record, or default if it does not exist."""
+        self.ensure_loaded()
+        with self._lock:
+            record = self._data.get(key)
+            return copy.deepcopy(record) if record is not None else default
+
+    def items(self):
+        """Return (key, record) pairs; records must be treated as read-only."""
+        self.ensure_loaded()
+        with self._lock:
+            return list(self._data.items())
+
+    def values(self):
+        """Return the records; they must be treated as read-only."""
+        self.ensure_loaded()
+        with self._lock:
+            return list(self._data.values())
+
+    def keys(self):
+        self.ensure_loaded()
+        with self._lock:
+            return list(self._data.keys())
+
+    def __len__(self):
+        self.ensure_loaded()
+        with self._lock:
+            return len(self._data)
+
+    def __contains__(self, key):
+        self.ensure_loaded()
+        with self._lock:
+            return key in self._data
+
+    # --- Local writes (write-through after a successful server write) ----
+
+    def put(self, key, record):
+        """Set or (with None) delete one record locally."""
+        with self._lock:
+            self._apply_put([key], record)
+
+    def patch(self, key, fields):
+        """Merge fields into one record locally."""
+        with self._lock:
+            for field, value in fields.items():
+                self._apply_put([key] + _split_path(field), value)
+
+    # --- Change stream ---------------------------------------------------
+
+    def _on_event(self, event):
+        segments = _split_path(event.path)
+        with self._lock:
+            self.stats["events"] += 1
+            if event.event_type == 'patch':
+                for field, value in (event.data or {}).items():
+                    self._apply_put(segments + _split_path(field), value)
+            elif not segments:
+                self._replace(event.data if isinstance(event.data, dict) else {})
+            else:
+                self._apply_put(segments, event.data)
+        self._loaded.set()
+
+    def _replace(self, data):
+        old_data = self._data
+        self._data = {key: value for key, value in data.items() if value is not None}
+        self.version += 1
+        self.stats["last_sync"] = time.time()
+        if self._listeners:
+            for key in set(old_data) | set(self._data):
+                old, new = old_data.get(key), self._data.get(key)
+                if old != new:
+                    self._notify(key, old, new)
+
+    def _apply_put(self, segments, value):
+        key = segments[0]
+        old = self._data.get(key)
+        if len(segments) == 1:
+            new = copy.deepcopy(value) if value is not None else None
+        else:
+            new = copy.deepcopy(old) if isinstance(old, dict) else {}
+            node = new
+            for segment in segments[1:-1]:
+                child = node.get(segment)
+                if not isinstance(child, dict):
+                    child = {}
+                    node[segment] = child
+                node = child
+            if value is None:
+                node.pop(segments[-1], None)
+            else:
+                node[segments[-1]] = copy.deepcopy(value)
+            new = new or None
+        if new is None:
+            self._data.pop(key, None)
+        else:
+            self._data[key] = new
+        self.version += 1
+        self.stats["last_sync"] = time.time()
+        if self._listeners and old != new:
+            self._notify(key, old, new)
+
+    def _notify(self, key, old, new):
+        for callback in list(self._listeners):
+            try:
+                callback(key, old, new)
+            except Exception as e:
+                logger.error(f"Replica listener error for {key}: {e}")
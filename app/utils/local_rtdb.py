@@ -0,0 +1,365 @@
+import copy
+import json
+import threading
+import time
+import random
+import string
+
+
+def _split_path(path):
+    """Split a database path into its non-empty segments."""
+    if not path:
+        return []
+    return [segment for segment in str(path).split('/') if segment]
+
+
+def _join_path(segments):
+    return '/' + '/'.join(segments)
+
+
+def _prune(value):
+    """Drop None leaves and empty containers the way Realtime Database does."""
+    if isinstance(value, dict):
+        pruned = {}
+        for key, child in value.items():
+            child = _prune(child)
+            if child is not None:
+                pruned[str(key)] = child
+        return pruned or None
+    return value
+
+
+class LocalEvent:
+    """Mirror of firebase_admin.db.Event delivered to listen() callbacks."""
+    def __init__(self, event_type, path, data):
+        self.event_type = event_type
+        self.path = path
+        self.data = data
+
+
+class LocalListenerRegistration:
+    """Returned by LocalReference.listen(); call close() to stop receiving events."""
+    def __init__(self, database, listener):
+        self._database = database
+        self._listener = listener
+
+    def close(self):
+        self._database._remove_listener(self._listener)
+
+
+class LocalDatabase:
+    """
+    In-process stand-in for a Firebase Realtime Database.
+    Holds the whole tree in memory and mirrors the subset of the
+    firebase_admin.db API the application uses, so managers can run
+    offline and in tests without network access.
+    """
+    def __init__(self, data=None, rules=None):
+        self._root = _prune(copy.deepcopy(data)) or {}
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._rules = rules
+        self.request_count = 0
+        # JSON size of every response, to measure what a read would transfer
+        self.bytes_sent = 0
+
+    def reference(self, path='/'):
+        return LocalReference(self, _split_path(path))
+
+    def _send(self, value):
+        self.bytes_sent += len(json.dumps(value, default=str))
+        return value
+
+    def _check_index(self, segments, child):
+        """Reject unindexed child queries when rules are set, as the server does."""
+        if self._rules is None:
+            return
+        node = self._rules.get('rules', {})
+        for segment in segments:
+            node = node.get(segment) or next(
+                (rule for key, rule in node.items() if key.startswith('$')), {})
+        index_on = node.get('.indexOn', [])
+        if child not in ([index_on] if isinstance(index_on, str) else index_on):
+            raise ValueError(f'Index not defined, add ".indexOn": "{child}", '
+                             f'for path "{_join_path(segments)}", to the rules')
+
+    def _read(self, segments):
+        node = self._root
+        for segment in segments:
+            if not isinstance(node, dict) or segment not in node:
+                return None
+            node = node[segment]
+        return node
+
+    def _write(self, segments, value):
+        value = _prune(copy.deepcopy(value))
+        if not segments:
+            self._root = value if isinstance(value, dict) else {}
+            return
+        node = self._root
+        parents = []
+        for segment in segments[:-1]:
+            child = node.get(segment)
+            if not isinstance(child, dict):
+                if value is None:
+                    return
+                child = {}
+                node[segment] = child
+            parents.append((node, segment))
+            node = child
+        if value is None:
+            node.pop(segments[-1], None)
+        else:
+            node[segments[-1]] = value
+        # Remove parents left empty by a delete
+        for parent, segment in reversed(parents):
+            if parent[segment]:
+                break
+            del parent[segment]
+
+    def _add_listener(self, segments, callback):
+        listener = (tuple(segments), callback)
+        with self._lock:
+            self._listeners.append(listener)
+            initial = copy.deepcopy(self._read(segments))
+        callback(LocalEvent('put', '/', initial))
+        return LocalListenerRegistration(self, listener)
+
+    def _remove_listener(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _notify(self, event_type, segments, data):
+        """Deliver a change at `segments` to every listener it affects."""
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listen_segments = listener[0]
+            if event_type == 'patch' and tuple(segments[:len(listen_segments)]) != listen_segments:
+                # Listener sits below the patch location; forward the keys that reach it
+                for key, child in data.items():
+                    self._deliver(listener, 'put', list(segments) + _split_path(key), child)
+            else:
+                self._deliver(listener, event_type, segments, data)
+
+    def _deliver(self, listener, event_type, segments, data):
+        listen_segments, callback = listener
+        depth = len(listen_segments)
+        if tuple(segments[:depth]) == listen_segments:
+            # Change is at or below the listener's location
+            relative = segments[depth:]
+            callback(LocalEvent(event_type, _join_path(relative), copy.deepcopy(data)))
+        elif tuple(listen_segments[:len(segments)]) == tuple(segments):
+            # Change replaced an ancestor; resend the listener's whole subtree
+            with self._lock:
+                current = copy.deepcopy(self._read(listen_segments))
+            callback(LocalEvent('put', '/', current))
+
+
+class LocalReference:
+    """Reference into a LocalDatabase with the firebase_admin.db.Reference interface."""
+    def __init__(self, database, segments):
+        self._client = database
+        self._segments = list(segments)
+
+    @property
+    def key(self):
+        return self._segments[-1] if self._segments else None
+
+    @property
+    def path(self):
+        return _join_path(self._segments)
+
+    @property
+    def parent(self):
+        if not self._segments:
+            return None
+        return LocalReference(self._client, self._segments[:-1])
+
+    def child(self, path):
+        return LocalReference(self._client, self._segments + _split_path(path))
+
+    def get(self, etag=False, shallow=False):
+        with self._client._lock:
+            self._client.request_count += 1
+            value = self._client._read(self._segments)
+            if shallow and isinstance(value, dict):
+                value = {key: True for key in value}
+            else:
+                value = copy.deepcopy(value)
+            self._client._send(value)
+        if etag:
+            return value, str(hash(repr(value)))
+        return value
+
+    def set(self, value):
+        with self._client._lock:
+            self._client.request_count += 1
+            self._client._write(self._segments, value)
+        self._client._notify('put', self._segments, value)
+
+    def update(self, value):
+        if not isinstance(value, dict) or not value:
+            raise ValueError('Value argument must be a non-empty dictionary.')
+        with self._client._lock:
+            self._client.request_count += 1
+            for key, child in value.items():
+                self._client._write(self._segments + _split_path(key), child)
+        self._client._notify('patch', self._segments, value)
+
+    def delete(self):
+        self.set(None)
+
+    def transaction(self, transaction_update):
+        """Atomically replace the value with transaction_update(current) and return the new value."""
+        with self._client._lock:
+            self._client.request_count += 1
+            value = transaction_update(copy.deepcopy(self._client._read(self._segments)))
+            self._client._write(self._segments, value)
+        self._client._notify('put', self._segments, value)
+        return value
+
+    def push(self, value=''):
+        key = _push_id()
+        ref = self.child(key)
+        if value is not None:
+            ref.set(value)
+        return ref
+
+    def listen(self, callback):
+        return self._client._add_listener(self._segments, callback)
+
+    def order_by_child(self, path):
+        if not path or path.startswith('$'):
+            raise ValueError(f'Illegal child path: {path}')
+        return LocalQuery(self, 'child', _split_path(path))
+
+    def order_by_key(self):
+        return LocalQuery(self, 'key')
+
+    def order_by_value(self):
+        return LocalQuery(self, 'value')
+
+
+def _sort_value(value):
+    """Realtime Database ordering: null, false, true, numbers, strings, then objects."""
+    if value is None:
+        return (0,)
+    if isinstance(value, bool):
+        return (1, value)
+    if isinstance(value, (int, float)):
+        return (2, value)
+    if isinstance(value, str):
+        return (3, value)
+    return (4,)
+
+
+def _sort_key(key):
+    """Keys that parse as 32-bit integers sort numerically before the others."""
+    try:
+        number = int(key)
+        if -2 ** 31 <= number < 2 ** 31 and str(number) == key:
+            return (0, number, '')
+    except ValueError:
+        pass
+    return (1, 0, key)
+
+
+class LocalQuery:
+    """
+    Ordered, filtered read of a LocalReference's children with the
+    firebase_admin.db.Query interface. Only the matching children are
+    returned (and counted in bytes_sent), as with a server-side query.
+    """
+    def __init__(self, reference, order_by, child_path=None):
+        self._reference = reference
+        self._order_by = order_by
+        self._child_path = child_path or []
+        self._start = self._end = self._equal = None
+        self._first = self._last = None
+
+    def start_at(self, start):
+        if start is None:
+            raise ValueError('Start value must not be None.')
+        self._start = start
+        return self
+
+    def end_at(self, end):
+        if end is None:
+            raise ValueError('End value must not be None.')
+        self._end = end
+        return self
+
+    def equal_to(self, value):
+        if value is None:
+            raise ValueError('Equal to value must not be None.')
+        self._equal = value
+        return self
+
+    def limit_to_first(self, limit):
+        if self._last is not None:
+            raise ValueError('Cannot set both first and last limits.')
+        self._first = limit
+        return self
+
+    def limit_to_last(self, limit):
+        if self._first is not None:
+            raise ValueError('Cannot set both first and last limits.')
+        self._last = limit
+        return self
+
+    def _order_value(self, key, child):
+        if self._order_by == 'key':
+            return key
+        if self._order_by == 'value':
+            return child
+        for segment in self._child_path:
+            child = child.get(segment) if isinstance(child, dict) else None
+        return child
+
+    def _rank(self, value):
+        return _sort_key(value) if self._order_by == 'key' else _sort_value(value)
+
+    def get(self):
+        if self._equal is not None and (self._start is not None or self._end is not None):
+            raise ValueError('Cannot set both equal_to and start_at/end_at.')
+        database = self._reference._client
+        segments = self._reference._segments
+        with database._lock:
+            database.request_count += 1
+            if self._order_by == 'child':
+                database._check_index(segments, '/'.join(self._child_path))
+            node = database._read(segments)
+            matches = []
+            for key, child in (node.items() if isinstance(node, dict) else []):
+                rank = self._rank(self._order_value(key, child))
+                if self._equal is not None and rank != self._rank(self._equal):
+                    continue
+                if self._start is not None and rank < self._rank(self._start):
+                    continue
+                if self._end is not None and rank > self._rank(self._end):
+                    continue
+                matches.append((rank, _sort_key(key), key, child))
+            matches.sort(key=lambda match: match[:2])
+            if self._first is not None:
+                matches = matches[:self._first]
+            elif self._last is not None:
+                matches = matches[-self._last:] if self._last else []
+            result = {key: copy.deepcopy(child) for _, _, key, child in matches}
+            database._send(result)
+        return result
+
+
+_PUSH_CHARS = '-0123456789' + string.ascii_uppercase + '_' + string.ascii_lowercase
+
+
+def _push_id():
+    """Generate a chronologically ordered key similar to Firebase push IDs."""
+    now = int(time.time() * 1000)
+    stamp = []
+    for _ in range(8):
+        stamp.append(_PUSH_CHARS[now % 64])
+        now //= 64
+    suffix = ''.join(random.choice(_PUSH_CHARS) for _ in range(12))
+    return ''.join(reversed(stamp)) + suffix
@@ -8,6 +8,9 @@ import json
 
 logger = logging.getLogger(__name__)
 
+# Migration files ship with the app package, wherever it is run from
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
 class Migration:
     def __init__(self, version: int, name: str):
         self.version = version
@@ -23,9 +26,9 @@ class Migration:
         raise NotImplementedError
 
 class MigrationManager:
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, migrations_dir: Optional[Path] = None):
         self.db_path = db_path
-        self.migrations_dir = Path("app/migrations")
+        self.migrations_dir = Path(migrations_dir or MIGRATIONS_DIR)
         self.migrations_dir.mkdir(exist_ok=True)
         self._ensure_migrations_table()
     
@@ -104,8 +107,8 @@ class MigrationManager:
         with sqlite3.connect(self.db_path) as conn:
             for version in reversed(applied):
                 try:
-                    migration_file = self.migrations_dir / f"migration_{version}.py"
-                    if migration_file.exists():
+                    migration_file = self._find_migration_file(version)
+                    if migration_file:
                         module = self._load_migration_module(migration_file)
                         if module:
                             logger.info(f"Rolling back migration {version}")
@@ -118,6 +121,13 @@ class MigrationManager:
                     logger.error(f"Failed to rollback migration {version}: {e}")
                     raise
     
+    def _find_migration_file(self, version: int) -> Optional[Path]:
+        """Find the file for a version, named migration_<version>.py or migration_<version>_<name>.py."""
+        for file in self.migrations_dir.glob(f"migration_{version}*.py"):
+            if file.stem.split("_")[1] == str(version):
+                return file
+        return None
+
     def create_migration(self, name: str) -> Path:
         """Create a new migration file."""
         applied = self.get_applied_migrations()
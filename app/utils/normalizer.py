@@ -0,0 +1,115 @@
+import threading
+from app.utils.records import SALE_AMOUNT_FIELDS
+
+# How each raw record source names the target models' fields. Renames are
+# (source field, model field) pairs; the first source field present with a
+# value wins over the model field itself, unless the model field is listed
+# as a source too. Defaults replace None in those fields.
+SOURCE_SCHEMAS = {
+    'firebase_inventory': {
+        'renames': (('buying_price', 'cost'), ('cost_price', 'cost'), ('quantity', 'stock'),
+                    ('details', 'description'), ('selling_price', 'price')),
+        'defaults': {'cost': 0, 'stock': 0},
+    },
+    'firebase_sales': {
+        'renames': tuple((field, 'total_amount') for field in SALE_AMOUNT_FIELDS),
+        'defaults': {'total_amount': 0},
+    },
+}
+
+_normalizers = {}
+_normalizers_lock = threading.Lock()
+
+
+def model_fields(model):
+    """
+    Field names a model accepts: mapped columns for SQLAlchemy models,
+    declared fields for Pydantic v2/v1 models, else class annotations.
+    """
+    mapper = getattr(model, '__mapper__', None)
+    if mapper is not None:
+        return frozenset(attr.key for attr in mapper.column_attrs)
+    if hasattr(model, 'model_fields'):
+        return frozenset(model.model_fields)
+    if hasattr(model, '__fields__'):
+        return frozenset(model.__fields__)
+    return frozenset(getattr(model, '__annotations__', {}))
+
+
+def _builder(model):
+    """Fastest way to build a model instance from already filtered fields: (clean, checked)"""
+    manager = getattr(model, '_sa_class_manager', None)
+    if manager is not None:
+        # As the ORM does when loading rows: no per-keyword constructor checks
+        def build(fields):
+            instance = manager.new_instance()
+            instance.__dict__.update(fields)
+            return instance
+        return build, build
+    if hasattr(model, 'model_construct'):
+        return (lambda fields: model.model_construct(**fields)), (lambda fields: model(**fields))
+    if hasattr(model, 'construct'):
+        return (lambda fields: model.construct(**fields)), (lambda fields: model(**fields))
+    return (lambda fields: model(**fields)), (lambda fields: model(**fields))
+
+
+class RecordNormalizer:
+    """
+    Compiled conversion of raw records from one source schema into one
+    model. The allowed field set and rename map are worked out once, and
+    records that already use only the model's fields skip the rename and
+    filter steps and, for Pydantic models, validation.
+    """
+
+    def __init__(self, model, renames=(), defaults=None):
+        self.model = model
+        self.allowed = model_fields(model)
+        grouped = {}
+        for source, target in renames:
+            if target in self.allowed:
+                grouped.setdefault(target, []).append(source)
+        self.renames = tuple((target, tuple(sources)) for target, sources in grouped.items())
+        self.defaults = tuple((field, value) for field, value in (defaults or {}).items() if field in self.allowed)
+        self._sources = frozenset(source for target, sources in self.renames for source in sources
+                                  if source != target)
+        self._build_clean, self._build_checked = _builder(model)
+
+    def is_clean(self, record):
+        """True if record needs no renaming, filtering or defaults"""
+        if not record.keys() <= self.allowed or self._sources and not self._sources.isdisjoint(record):
+            return False
+        return all(record.get(field, value) is not None for field, value in self.defaults)
+
+    def fields(self, record):
+        """Keyword arguments for the model from a raw record"""
+        allowed = self.allowed
+        fields = {key: value for key, value in record.items() if key in allowed}
+        for target, sources in self.renames:
+            present = [record[source] for source in sources if source in record]
+            if present:
+                fields[target] = next((value for value in present if value is not None), None)
+        for field, value in self.defaults:
+            if field in fields and fields[field] is None:
+                fields[field] = value
+        return fields
+
+    def __call__(self, record):
+        if self.is_clean(record):
+            return self._build_clean(dict(record))
+        return self._build_checked(self.fields(record))
+
+    def normalize_many(self, records):
+        """Normalize an iterable of raw records into a list of model instances"""
+        return [self(record) for record in records]
+
+
+def normalizer_for(model, source):
+    """The shared compiled normalizer for records from source (a SOURCE_SCHEMAS key) into model"""
+    key = (source, model)
+    normalizer = _normalizers.get(key)
+    if normalizer is None:
+        schema = SOURCE_SCHEMAS[source]
+        with _normalizers_lock:
+            normalizer = _normalizers.setdefault(
+                key, RecordNormalizer(model, schema.get('renames', ()), schema.get('defaults')))
+    return normalizer
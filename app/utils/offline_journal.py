@@ -0,0 +1,366 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from app.utils.logger import Logger
+from app.utils.rtdb_errors import CONNECTIVITY_ERRORS
+
+logger = Logger()
+
+# Node recording the journal operations already applied, keyed by op id,
+# so an operation replayed twice (e.g. after a crash) is applied once
+APPLIED_NODE = 'journal_applied'
+# Seconds between attempts to reach Firebase again while offline
+RETRY_INTERVAL = 30.0
+
+JOURNAL_TABLE = '''
+    CREATE TABLE IF NOT EXISTS firebase_journal (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        op_id TEXT NOT NULL UNIQUE,
+        op TEXT NOT NULL CHECK (op IN ('set', 'update', 'delete')),
+        path TEXT NOT NULL,
+        value TEXT,
+        base TEXT,
+        created_at TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        server_value TEXT
+    )
+'''
+
+
+def default_journal_path():
+    from app.utils.database import DatabaseManager
+    return os.path.join(os.path.dirname(DatabaseManager.get_db_path()), 'offline_journal.db')
+
+
+def offline_key(prefix):
+    """Record key that needs no server round trip: time-ordered and unique per till"""
+    return f"{prefix}_{int(time.time() * 1000):013d}{uuid.uuid4().hex[:6]}"
+
+
+def new_record_key(journal, allocator, sequence, prefix):
+    """prefix_NNNNNNNN from a shared counter while online, else an offline_key made locally"""
+    if journal.online:
+        try:
+            return f"{prefix}_{allocator.next(sequence):08d}"
+        except Exception as e:
+            logger.warning(f"Counter {sequence} unreachable, using an offline key: {e}")
+    return offline_key(prefix)
+
+
+def seen_fields(record, fields):
+    """The given fields of a record as this till last saw it, for use as a submit() base"""
+    if record is None:
+        return None
+    return {field: record.get(field) for field in fields}
+
+
+def _dumps(value):
+    return None if value is None else json.dumps(value, default=str)
+
+
+def _loads(text):
+    return None if text is None else json.loads(text)
+
+
+def _value_at(record, field):
+    for segment in field.split('/'):
+        record = record.get(segment) if isinstance(record, dict) else None
+    return record
+
+
+class Conflict(Exception):
+    """The server copy changed since the till last saw it"""
+
+    def __init__(self, server_value):
+        super().__init__('Server copy changed while offline')
+        self.server_value = server_value
+
+
+class ReplayResult:
+    def __init__(self):
+        self.applied = []
+        self.conflicts = []
+        self.failed = []
+        self.remaining = 0
+
+    @property
+    def complete(self):
+        return self.remaining == 0
+
+    def __repr__(self):
+        return (f"ReplayResult(applied={len(self.applied)}, conflicts={len(self.conflicts)}, "
+                f"failed={len(self.failed)}, remaining={self.remaining})")
+
+
+class JournalReference:
+    """
+    Write-only stand-in for the reference at path whose update() goes
+    through the journal, so a WriteBatcher's flushes are journalled too.
+    """
+
+    def __init__(self, journal, path):
+        self.journal = journal
+        self.path = '/' + path.strip('/')
+
+    def update(self, value):
+        self.journal.submit('update', self.path, value)
+
+
+class OfflineJournal:
+    """
+    Append-only SQLite journal of Realtime Database writes for offline work.
+
+    submit() writes straight to Firebase while it is reachable and nothing
+    is queued. Once a write cannot reach Firebase, the journal goes offline:
+    that write and every later one are appended locally and the call
+    returns at once, so callers keep working at local speed. A write the
+    server rejects (rules, invalid data) is raised to the caller instead.
+    replay() applies the journal in order when Firebase is reachable again;
+    it is attempted in the background at most every RETRY_INTERVAL seconds.
+    An operation the server rejects on replay is set aside as failed and
+    the ones after it are still applied.
+
+    Each operation carries an op id that is written to APPLIED_NODE in the
+    same multi-location update as the data, so replaying it again is a
+    no-op. update and delete operations carry the fields as the till last
+    saw them (base); if the server copy differs when the operation is
+    replayed, it is not applied and is reported as a conflict instead.
+    """
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, root_ref, path=None, retry_interval=RETRY_INTERVAL, on_conflict=None):
+        self.root = root_ref
+        self.path = path or default_journal_path()
+        self.retry_interval = retry_interval
+        self.on_conflict = on_conflict
+        self.online = True
+        self._last_attempt = 0.0
+        self._lock = threading.RLock()
+        self._replaying = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        # A journalled sale must survive a power cut
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = FULL")
+        self._conn.execute(JOURNAL_TABLE)
+        # Pending entries, kept in memory so online writes need not query the journal
+        self._pending = self.pending_count()
+        if self._pending:
+            self.online = False
+
+    @classmethod
+    def for_database(cls, root_ref, **kwargs):
+        """Return the journal shared by every manager writing to root_ref's database."""
+        key = id(getattr(root_ref, '_client', root_ref))
+        with cls._shared_lock:
+            journal = cls._shared.get(key)
+            if journal is None:
+                journal = cls._shared[key] = cls(root_ref, **kwargs)
+            return journal
+
+    @classmethod
+    def reset_shared(cls):
+        with cls._shared_lock:
+            journals = list(cls._shared.values())
+            cls._shared.clear()
+        for journal in journals:
+            journal.close()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def reference(self, path):
+        """JournalReference for path, relative to the root reference"""
+        return JournalReference(self, path)
+
+    # --- Writing -----------------------------------------------------------
+
+    def submit(self, op, path, value=None, base=None):
+        """
+        Apply op ('set', 'update' or 'delete') at path, relative to the root
+        reference, now or after reconnecting. base is the record's fields as
+        the caller last saw them, checked before a journalled op is replayed.
+        Returns the op id if the op was journalled, None if it was written.
+        Raises the error for a write Firebase rejected; never raises for
+        connectivity errors.
+        """
+        path = path.strip('/')
+        with self._lock:
+            direct = self.online and not self._pending
+        if direct:
+            # Not under the lock: other writers need not wait for this round trip
+            try:
+                self._write(op, path, value)
+                return None
+            except CONNECTIVITY_ERRORS as e:
+                logger.warning(f"Firebase unreachable, journalling writes offline: {e}")
+                with self._lock:
+                    self.online = False
+                    self._last_attempt = time.monotonic()
+        with self._lock:
+            op_id = self._append(op, path, value, base)
+        self._schedule_replay()
+        return op_id
+
+    def _append(self, op, path, value, base):
+        op_id = uuid.uuid4().hex
+        self._conn.execute(
+            "INSERT INTO firebase_journal (op_id, op, path, value, base, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (op_id, op, path, _dumps(value), _dumps(base), datetime.now().isoformat()))
+        self._pending += 1
+        return op_id
+
+    def _write(self, op, path, value):
+        ref = self.root.child(path)
+        if op == 'set':
+            ref.set(value)
+        elif op == 'update':
+            ref.update(value)
+        else:
+            ref.delete()
+
+    # --- Reading the journal -------------------------------------------------
+
+    def pending_count(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM firebase_journal WHERE status = 'pending'").fetchone()[0]
+
+    def entries(self, status='pending'):
+        """Journal entries with status ('pending', 'applied', 'conflict' or 'failed') in order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, op_id, op, path, value, base, created_at, attempts, error, server_value "
+                "FROM firebase_journal WHERE status = ? ORDER BY seq", (status,)).fetchall()
+        return [{'seq': seq, 'op_id': op_id, 'op': op, 'path': path, 'value': _loads(value),
+                 'base': _loads(base), 'created_at': created_at, 'attempts': attempts, 'error': error,
+                 'server_value': _loads(server_value)}
+                for seq, op_id, op, path, value, base, created_at, attempts, error, server_value in rows]
+
+    def conflicts(self):
+        return self.entries('conflict')
+
+    def resolve(self, op_id, apply=False):
+        """Settle a conflict: re-queue the till's write over the server copy, or drop it"""
+        with self._lock:
+            if apply:
+                self._pending += self._conn.execute(
+                    "UPDATE firebase_journal SET status = 'pending', base = NULL, attempts = 0 "
+                    "WHERE op_id = ? AND status = 'conflict'", (op_id,)).rowcount
+            else:
+                self._conn.execute(
+                    "UPDATE firebase_journal SET status = 'dropped' WHERE op_id = ? AND status = 'conflict'",
+                    (op_id,))
+        if apply:
+            self._schedule_replay()
+
+    # --- Replay --------------------------------------------------------------
+
+    def _schedule_replay(self):
+        if time.monotonic() - self._last_attempt < self.retry_interval or self._replaying.locked():
+            return
+        threading.Thread(target=self.replay, name='journal-replay', daemon=True).start()
+
+    def replay(self):
+        """
+        Apply pending operations in order until the journal is empty or
+        Firebase is unreachable again. Returns a ReplayResult.
+        """
+        result = ReplayResult()
+        if not self._replaying.acquire(blocking=False):
+            result.remaining = self.pending_count()
+            return result
+        try:
+            self._last_attempt = time.monotonic()
+            reachable = True
+            # Writes journalled during the replay are picked up by the next pass
+            while reachable:
+                entries = self.entries()
+                if not entries:
+                    break
+                for entry in entries:
+                    reachable = self._replay_entry(entry, result)
+                    if not reachable:
+                        break
+            with self._lock:
+                result.remaining = self._pending = self.pending_count()
+                self.online = result.remaining == 0
+        finally:
+            self._replaying.release()
+        if result.applied or result.conflicts or result.failed:
+            logger.info(f"Journal replay: {result}")
+        return result
+
+    def _replay_entry(self, entry, result):
+        """Replay one entry into result; False if Firebase could not be reached"""
+        try:
+            self._replay_one(entry)
+        except Conflict as conflict:
+            self._mark(entry, 'conflict', str(conflict), conflict.server_value)
+            result.conflicts.append(entry)
+            logger.warning(f"Offline {entry['op']} of {entry['path']} conflicts with the server copy")
+            if self.on_conflict:
+                self.on_conflict(entry, conflict.server_value)
+            return True
+        except CONNECTIVITY_ERRORS as e:
+            self._mark(entry, 'pending', str(e))
+            return False
+        except Exception as e:
+            # Rejected by the server: replaying it again would fail the same way
+            self._mark(entry, 'failed', str(e))
+            result.failed.append(entry)
+            logger.error(f"Offline {entry['op']} of {entry['path']} was rejected: {e}")
+            return True
+        self._mark(entry, 'applied')
+        result.applied.append(entry)
+        return True
+
+    def _replay_one(self, entry):
+        marker = f"{APPLIED_NODE}/{entry['op_id']}"
+        if self.root.child(marker).get() is not None:
+            return
+        path, op, value, base = entry['path'], entry['op'], entry['value'], entry['base']
+        if op == 'update' and base is None:
+            # Nothing to check, and path may be a whole node (a batched update)
+            self.root.update({**{f"{path}/{field}": field_value for field, field_value in value.items()},
+                              marker: datetime.now().isoformat()})
+            return
+        current = self.root.child(path).get()
+        current = current.val() if hasattr(current, 'val') else current
+        if op == 'set':
+            updates = {path: value}
+            if current is not None and current != value and base is None:
+                # A create whose key is already taken by different data
+                raise Conflict(current)
+        elif op == 'update':
+            updates = {f"{path}/{field}": field_value for field, field_value in value.items()}
+            if current is None and base is not None:
+                raise Conflict(current)
+        else:
+            updates = {path: None}
+            if current is None:
+                updates = {}
+        if base is not None and current is not None:
+            changed = {field: _value_at(current, field) for field, seen in base.items()
+                       if _value_at(current, field) != seen}
+            # Fields already holding this op's values were written by an earlier attempt
+            if op == 'update':
+                changed = {field: now for field, now in changed.items() if now != value.get(field)}
+            if changed:
+                raise Conflict(current)
+        updates[marker] = datetime.now().isoformat()
+        self.root.update(updates)
+
+    def _mark(self, entry, status, error=None, server_value=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE firebase_journal SET status = ?, error = ?, server_value = ?, "
+                "attempts = attempts + ? WHERE op_id = ?",
+                (status, error, _dumps(server_value), 0 if status == 'applied' else 1, entry['op_id']))
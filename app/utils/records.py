@@ -0,0 +1,46 @@
+from datetime import date, datetime
+
+# Field names a sale's total is stored under, in order of precedence
+SALE_AMOUNT_FIELDS = ('total_amount', 'amount', 'total_price')
+
+
+def record_stock(record):
+    """Stock level of a raw Firebase product record."""
+    value = record.get('quantity', record.get('stock', 0))
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def record_cost(record):
+    """Unit cost of a raw Firebase product record."""
+    value = record.get('buying_price', record.get('cost_price', record.get('cost', 0.0)))
+    try:
+        return float(value or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def record_amount(record):
+    """Sale total from a raw Firebase sale record, whichever field name it uses."""
+    for field in SALE_AMOUNT_FIELDS:
+        value = record.get(field)
+        if value is not None:
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return 0.0
+    return 0.0
+
+
+def record_day(record):
+    """Calendar day ('YYYY-MM-DD') of a raw sale record, or None if it has no date."""
+    for field in ('sale_date', 'date', 'created_at'):
+        value = record.get(field)
+        if not value:
+            continue
+        if isinstance(value, (datetime, date)):
+            return value.strftime('%Y-%m-%d')
+        return str(value)[:10]
+    return None
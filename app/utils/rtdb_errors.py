@@ -0,0 +1,32 @@
+import requests
+from firebase_admin import exceptions
+
+# The request may not have reached the Realtime Database, or its answer
+# was lost: sending the same write again later can succeed
+CONNECTIVITY_ERRORS = (
+    exceptions.UnavailableError,
+    exceptions.DeadlineExceededError,
+    requests.ConnectionError,
+    requests.Timeout,
+    ConnectionError,
+    TimeoutError,
+)
+
+# The server (or the client library, for bad paths and values) refused
+# the payload itself; part of a multi-location update may still be accepted
+REJECTION_ERRORS = (
+    exceptions.PermissionDeniedError,
+    exceptions.InvalidArgumentError,
+    PermissionError,
+    ValueError,
+)
+
+
+def is_connectivity_error(error):
+    """True if error means Firebase could not be reached, rather than that it refused the write"""
+    return isinstance(error, CONNECTIVITY_ERRORS)
+
+
+def is_rejection(error):
+    """True if error means Firebase refused the written paths or values"""
+    return isinstance(error, REJECTION_ERRORS) and not is_connectivity_error(error)
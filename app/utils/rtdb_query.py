@@ -0,0 +1,71 @@
+import json
+import sys
+
+# Children each node is queried by. Every child passed to where() must be
+# listed here and deployed as ".indexOn" rules (see database_rules), or the
+# server rejects the query instead of filtering it.
+RTDB_INDEXES = {
+    'inventory': ('category', 'quantity', 'stock'),
+    'sales': ('sale_date',),
+    'customers': ('created_at',),
+}
+
+# Upper bound that makes end_at match every string starting with a prefix
+PREFIX_END = '\uf8ff'
+
+
+def database_rules(indexes=None):
+    """Realtime Database rules declaring the indexes in RTDB_INDEXES"""
+    return {'rules': {node: {'.indexOn': list(children)}
+                      for node, children in (indexes or RTDB_INDEXES).items()}}
+
+
+def _records(data):
+    data = data.val() if hasattr(data, 'val') else data
+    if isinstance(data, list):
+        # Numeric keys come back from the server as a list with gaps
+        return {str(key): value for key, value in enumerate(data) if value is not None}
+    return dict(data) if isinstance(data, dict) else {}
+
+
+def where(ref, child, equal_to=None, start_at=None, end_at=None, limit=None):
+    """
+    Records under ref whose child matches, filtered by the server so only
+    the matching records are transferred. Pass equal_to, or start_at and/or
+    end_at for an inclusive range. Returns {key: record} in child order.
+    """
+    query = ref.order_by_child(child)
+    if equal_to is not None:
+        query = query.equal_to(equal_to)
+    if start_at is not None:
+        query = query.start_at(start_at)
+    if end_at is not None:
+        query = query.end_at(end_at)
+    if limit is not None:
+        query = query.limit_to_first(limit)
+    return _records(query.get())
+
+
+def where_at_most(ref, child, end_at):
+    """
+    Records under ref whose child is a number no greater than end_at,
+    including numbers saved as text ("3"). The server filters the numbers;
+    strings sort as text rather than by value, so every string-valued
+    record is fetched and compared here. Records without the child are
+    not included.
+    """
+    # false sorts just before the numbers, so nulls (missing children) are skipped
+    records = where(ref, child, start_at=False, end_at=end_at)
+    for key, record in where(ref, child, start_at='', end_at=PREFIX_END).items():
+        try:
+            if float(record.get(child)) <= end_at:
+                records[key] = record
+        except (TypeError, ValueError):
+            continue
+    return records
+
+
+if __name__ == "__main__":
+    # Print the index rules to merge into database.rules.json: python -m app.utils.rtdb_query
+    json.dump(database_rules(), sys.stdout, indent=2)
+    print()
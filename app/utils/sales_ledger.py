@@ -0,0 +1,128 @@
+import threading
+from collections import defaultdict
+from app.utils.logger import Logger
+from app.utils.records import record_amount, record_day
+
+logger = Logger()
+
+
+def _customer_key(customer_id):
+    # Customer ids arrive as ints from some tills and strings from others
+    return None if customer_id is None else str(customer_id)
+
+
+class SalesLedger:
+    """
+    Normalized sales with running aggregates (count, revenue, per-day and
+    per-payment-method buckets) maintained from the /sales replica.
+    Each changed sale is normalized once and its old contribution is swapped
+    for the new one, so summaries are O(1) regardless of history length.
+    """
+    _ledgers = {}
+    _ledgers_lock = threading.Lock()
+
+    def __init__(self, replica, normalize):
+        self._replica = replica
+        self._normalize = normalize
+        self._lock = threading.RLock()
+        self._sales = {}
+        self._by_customer = {}
+        self._count = 0
+        self._revenue = 0.0
+        self._by_day = defaultdict(lambda: {"count": 0, "amount": 0.0})
+        self._by_payment = defaultdict(lambda: {"count": 0, "amount": 0.0})
+        replica.add_listener(self._on_change, replay=True)
+
+    @classmethod
+    def for_replica(cls, replica, normalize):
+        """Return the shared ledger for a sales replica."""
+        with cls._ledgers_lock:
+            ledger = cls._ledgers.get(id(replica))
+            if ledger is None or ledger._replica is not replica:
+                ledger = cls(replica, normalize)
+                cls._ledgers[id(replica)] = ledger
+            return ledger
+
+    def _on_change(self, key, old, new):
+        with self._lock:
+            if old is not None:
+                self._account(old, -1)
+                self._sales.pop(key, None)
+                customer = _customer_key(old.get('customer_id'))
+                bucket = self._by_customer.get(customer)
+                if bucket is not None:
+                    bucket.pop(key, None)
+                    if not bucket:
+                        del self._by_customer[customer]
+            if new is not None:
+                self._account(new, 1)
+                try:
+                    sale = self._normalize(dict(new))
+                except Exception as e:
+                    logger.error(f"Failed to normalize sale {key}: {e}")
+                    sale = None
+                if sale is not None:
+                    self._sales[key] = sale
+                    self._by_customer.setdefault(_customer_key(new.get('customer_id')), {})[key] = None
+
+    def _account(self, record, sign):
+        amount = record_amount(record) * sign
+        self._count += sign
+        self._revenue += amount
+        day = record_day(record)
+        if day:
+            bucket = self._by_day[day]
+            bucket["count"] += sign
+            bucket["amount"] += amount
+            if bucket["count"] <= 0:
+                del self._by_day[day]
+        method = record.get('payment_method') or 'Unknown'
+        bucket = self._by_payment[method]
+        bucket["count"] += sign
+        bucket["amount"] += amount
+        if bucket["count"] <= 0:
+            del self._by_payment[method]
+
+    def summary(self):
+        """Total count, revenue and average sale."""
+        self._replica.ensure_loaded()
+        with self._lock:
+            count = self._count
+            revenue = self._revenue
+        return {
+            'total_sales': count,
+            'total_revenue': revenue,
+            'average_sale': revenue / count if count > 0 else 0.0
+        }
+
+    def sales(self, customer_id=None):
+        """Normalized sales, optionally only those of one customer."""
+        self._replica.ensure_loaded()
+        with self._lock:
+            if customer_id:
+                return [self._sales[key] for key in self._by_customer.get(_customer_key(customer_id), ())]
+            return list(self._sales.values())
+
+    def get(self, key):
+        self._replica.ensure_loaded()
+        with self._lock:
+            return self._sales.get(key)
+
+    def daily_totals(self, start_day=None, end_day=None):
+        """Per-day count and amount, optionally limited to an inclusive 'YYYY-MM-DD' range."""
+        self._replica.ensure_loaded()
+        with self._lock:
+            return [
+                {'date': day, 'count': bucket["count"], 'amount': bucket["amount"]}
+                for day, bucket in sorted(self._by_day.items())
+                if (start_day is None or day >= start_day) and (end_day is None or day <= end_day)
+            ]
+
+    def payment_method_totals(self):
+        """Per-payment-method count and amount."""
+        self._replica.ensure_loaded()
+        with self._lock:
+            return [
+                {'method': method, 'count': bucket["count"], 'amount': bucket["amount"]}
+                for method, bucket in self._by_payment.items()
+            ]
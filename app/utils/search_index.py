@@ -0,0 +1,146 @@
+import re
+import sqlite3
+from app.utils.logger import Logger
+from app.utils.database import DatabaseManager, transaction, ROW_FACTORIES
+
+logger = Logger()
+
+# entity -> (source table, searchable columns). Columns a table lacks (older
+# schemas) are left out; the first column present ranks highest.
+SEARCH_ENTITIES = {
+    'products': ('products', ('name', 'details', 'category')),
+    'customers': ('customers', ('name', 'full_name', 'contact', 'phone', 'email')),
+    'invoices': ('sales', ('invoice_number',)),
+}
+
+# bm25 weight of the leading (name) column relative to the others
+NAME_WEIGHT = 10.0
+
+
+def _fts_table(entity):
+    return f"{entity}_fts"
+
+
+def _indexed_columns(conn, entity):
+    table, columns = SEARCH_ENTITIES[entity]
+    present = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    return table, [column for column in columns if column in present]
+
+
+def has_search_index(conn, entity):
+    """True if the FTS table for entity exists on conn"""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (_fts_table(entity),)
+    ).fetchone() is not None
+
+
+def ensure_search_index(conn, entities=None):
+    """
+    Create the FTS5 index and sync triggers for each entity whose source
+    table exists, filling it from the current rows. Triggers keep it in step
+    with every later insert, delete and update of an indexed column. Returns
+    the entities that have an index; SQLite builds without FTS5 get none.
+    """
+    indexed = []
+    for entity in entities or SEARCH_ENTITIES:
+        if has_search_index(conn, entity):
+            indexed.append(entity)
+            continue
+        table, columns = _indexed_columns(conn, entity)
+        if not columns:
+            continue
+        fts = _fts_table(entity)
+        cols = ', '.join(columns)
+        new_values = ', '.join(f"new.{column}" for column in columns)
+        old_values = ', '.join(f"old.{column}" for column in columns)
+        weights = ', '.join([str(NAME_WEIGHT)] + ['1.0'] * (len(columns) - 1))
+        try:
+            with transaction(conn) as c:
+                c.execute(f'''
+                    CREATE VIRTUAL TABLE {fts} USING fts5(
+                        {cols}, content='{table}', content_rowid='rowid', prefix='1 2 3'
+                    )
+                ''')
+                c.execute(f"INSERT INTO {fts}({fts}, rank) VALUES ('rank', 'bm25({weights})')")
+                c.execute(f'''
+                    CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN
+                        INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new_values});
+                    END
+                ''')
+                c.execute(f'''
+                    CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN
+                        INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old_values});
+                    END
+                ''')
+                c.execute(f'''
+                    CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN
+                        INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old_values});
+                        INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new_values});
+                    END
+                ''')
+                c.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Full-text search index for {entity} not available: {e}")
+            continue
+        indexed.append(entity)
+    return indexed
+
+
+def drop_search_index(conn, entities=None):
+    """Remove the FTS tables and triggers created by ensure_search_index"""
+    with transaction(conn) as c:
+        for entity in entities or SEARCH_ENTITIES:
+            fts = _fts_table(entity)
+            for suffix in ('ai', 'ad', 'au'):
+                c.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            c.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+def match_expression(query):
+    """
+    FTS5 MATCH expression for free text: every word must match as a prefix,
+    e.g. 'john 555' -> '"john"* "555"*'. Returns '' when there are no words.
+    """
+    # unicode61 splits on everything but letters and digits, so do the same
+    return ' '.join(f'"{term}"*' for term in re.findall(r'[^\W_]+', query.lower()))
+
+
+def match_rowids(entity, query):
+    """
+    SQL fragment and params selecting the rowids that match query, for use as
+    "<table>.rowid IN (...)" inside a larger query. The fragment is None when
+    query has no words to match, in which case callers apply no filter.
+    """
+    expression = match_expression(query)
+    if not expression:
+        return None, []
+    fts = _fts_table(entity)
+    return f"SELECT rowid FROM {fts} WHERE {fts} MATCH ?", [expression]
+
+
+def search(entity, query, limit=20, conn=None, row_factory=None):
+    """
+    Best matching rows of entity ('products', 'customers' or 'invoices') for
+    free-text query, ranked by bm25 with name matches first. Each word of the
+    query matches as a prefix. row_factory names an entry of ROW_FACTORIES;
+    by default rows come back as the connection builds them.
+    """
+    if entity not in SEARCH_ENTITIES:
+        raise ValueError(f"Unknown search entity: {entity}")
+    expression = match_expression(query)
+    if not expression:
+        return []
+    conn = conn or DatabaseManager.get_sqlite_connection()
+    table, _ = SEARCH_ENTITIES[entity]
+    fts = _fts_table(entity)
+    cur = conn.cursor()
+    if row_factory is not None:
+        cur.row_factory = ROW_FACTORIES[row_factory]
+    # Rank every match inside FTS5 (which keeps only the top rows), then join just those
+    return cur.execute(f'''
+        SELECT t.* FROM (
+            SELECT rowid, rank FROM {fts} WHERE {fts} MATCH ? ORDER BY rank LIMIT ?
+        ) m
+        JOIN {table} t ON t.rowid = m.rowid
+        ORDER BY m.rank
+    ''', (expression, limit)).fetchall()
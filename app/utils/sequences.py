@@ -0,0 +1,104 @@
+import sqlite3
+import threading
+from datetime import datetime
+from app.utils.database import transaction
+
+# Numbers reserved per round trip to the shared counter
+DEFAULT_BLOCK_SIZE = 20
+
+SEQUENCE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS sequences (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+'''
+
+
+class SQLiteSequenceStore:
+    """Named counters in a sequences table, advanced with UPDATE ... RETURNING under BEGIN IMMEDIATE"""
+
+    def __init__(self, connection):
+        # A sqlite3 connection, or a callable returning the calling thread's connection
+        self._connection = (lambda: connection) if isinstance(connection, sqlite3.Connection) else connection
+
+    def reserve(self, name, count, seed=None):
+        """
+        Advance counter name by count and return its new value. A counter
+        that does not exist yet starts from seed() (default 0).
+        """
+        with transaction(self._connection(), immediate=True) as conn:
+            conn.execute(SEQUENCE_TABLE)
+            rows = conn.execute(
+                "UPDATE sequences SET value = value + ? WHERE name = ? RETURNING value", (count, name)
+            ).fetchall()
+            if rows:
+                return rows[0][0]
+            value = (seed() if seed else 0) + count
+            conn.execute("INSERT INTO sequences (name, value) VALUES (?, ?)", (name, value))
+            return value
+
+
+class FirebaseSequenceStore:
+    """Named counters under a Realtime Database node, advanced in a transaction"""
+
+    def __init__(self, ref):
+        self.ref = ref
+
+    def reserve(self, name, count, seed=None):
+        """Advance counter name by count and return its new value"""
+        def advance(current):
+            return (current if current is not None else (seed() if seed else 0)) + count
+        return self.ref.child(name).transaction(advance)
+
+
+class MemorySequenceStore:
+    """Process-local counters, for providers without shared storage"""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, name, count, seed=None):
+        with self._lock:
+            if name not in self._values:
+                self._values[name] = seed() if seed else 0
+            self._values[name] += count
+            return self._values[name]
+
+
+class SequenceAllocator:
+    """
+    Issues numbers from blocks reserved in a shared store, so most calls make
+    no round trip and two terminals never issue the same number. Numbers
+    left in a block when the process exits are skipped, not reused.
+    """
+
+    def __init__(self, store, block_size=DEFAULT_BLOCK_SIZE):
+        self.store = store
+        self.block_size = block_size
+        self._blocks = {}
+        self._lock = threading.Lock()
+
+    def next(self, name, seed=None):
+        """Next number of sequence name; seed() gives the last number already used for a new sequence"""
+        with self._lock:
+            block = self._blocks.get(name)
+            if block is None or block[0] > block[1]:
+                end = self.store.reserve(name, self.block_size, seed)
+                block = self._blocks[name] = [end - self.block_size + 1, end]
+            value = block[0]
+            block[0] += 1
+            return value
+
+
+def issue_invoice_number(allocator, last_issued=None, when=None):
+    """
+    Next INV-YYYYMM-NNNN number; numbering restarts each month.
+    last_issued(prefix) returns the highest number already used with that
+    prefix and is only called the first time a month's sequence is needed.
+    """
+    when = when or datetime.now()
+    prefix = when.strftime('INV-%Y%m')
+    seed = (lambda: last_issued(prefix)) if last_issued else None
+    number = allocator.next(f"invoice_{when:%Y%m}", seed)
+    return f"{prefix}-{number:04d}"
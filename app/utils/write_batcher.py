@@ -0,0 +1,191 @@
+import copy
+import threading
+from app.utils.logger import Logger
+from app.utils.rtdb_errors import is_rejection
+
+logger = Logger()
+
+# Paths per multi-location update; well under the Realtime Database request size limit
+DEFAULT_MAX_PATHS = 5000
+
+
+def _split_path(path):
+    return [segment for segment in str(path).split('/') if segment]
+
+
+class BatchResult:
+    """Outcome of a flush: the paths written and {path: error} for those that failed"""
+
+    def __init__(self, written=None, failed=None, requests=0):
+        self.written = written or {}
+        self.failed = failed or {}
+        self.requests = requests
+
+    @property
+    def ok(self):
+        return not self.failed
+
+    def merge(self, other):
+        """Add another flush's outcome to this one"""
+        self.written.update(other.written)
+        self.failed.update(other.failed)
+        self.requests += other.requests
+
+    def keys(self, paths=None):
+        """Top-level child keys touched by paths (default: the written paths)"""
+        return {_split_path(path)[0] for path in (self.written if paths is None else paths)}
+
+    def __repr__(self):
+        return f"BatchResult(written={len(self.written)}, failed={len(self.failed)}, requests={self.requests})"
+
+
+class WriteBatcher:
+    """
+    Collects writes under one Realtime Database reference and sends them as
+    a single multi-location update({path: value, ...}) instead of one request
+    each. Writes are flushed when max_paths are pending, max_delay seconds
+    after the first pending write, or on an explicit flush() (and on leaving
+    a with block). A later write to a path replaces an earlier one, and
+    writing a path drops pending writes below it.
+
+    A multi-location update is applied all or nothing, so when the server
+    rejects a batch it is split in halves and retried to find the paths
+    that fail. Any other error (a timeout, a lost connection) fails every
+    path of the batch after one request.
+    on_written(path, value) is called for every path written, e.g. to patch
+    a local replica; on_flush(result) for every flush, including timed ones.
+    """
+
+    def __init__(self, ref, max_paths=DEFAULT_MAX_PATHS, max_delay=None, on_written=None, on_flush=None):
+        self.ref = ref
+        self.max_paths = max_paths
+        self.max_delay = max_delay
+        self.on_written = on_written
+        self.on_flush = on_flush
+        self._pending = {}
+        # Pending path prefix -> number of pending paths below it
+        self._below = {}
+        self._lock = threading.RLock()
+        # Held while sending, so flushes reach the server in order without blocking set()
+        self._send_lock = threading.Lock()
+        self._timer = None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            self.discard()
+        return False
+
+    # --- Queuing ---------------------------------------------------------
+
+    def set(self, path, value):
+        """Queue replacing the value at path (None deletes it)"""
+        path = '/'.join(_split_path(path))
+        if not path:
+            raise ValueError('Cannot batch a write to the root of the reference')
+        with self._lock:
+            if path in self._below:
+                for pending in [p for p in self._pending if p.startswith(path + '/')]:
+                    self._remove(pending)
+            segments = _split_path(path)
+            ancestor = next((a for a in ('/'.join(segments[:n]) for n in range(1, len(segments)))
+                             if a in self._pending), None)
+            if ancestor is None:
+                self._add(path, value)
+            else:
+                # Fold into the pending value of the ancestor; update() paths may not overlap
+                node = self._pending[ancestor]
+                node = self._pending[ancestor] = copy.deepcopy(node) if isinstance(node, dict) else {}
+                rest = segments[len(_split_path(ancestor)):]
+                for segment in rest[:-1]:
+                    child = node.get(segment)
+                    node = node[segment] = child if isinstance(child, dict) else {}
+                node[rest[-1]] = value
+            full = len(self._pending) >= self.max_paths
+            if not full and self.max_delay is not None and self._timer is None:
+                self._timer = threading.Timer(self.max_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def _add(self, path, value):
+        if path not in self._pending:
+            segments = _split_path(path)
+            for n in range(1, len(segments)):
+                prefix = '/'.join(segments[:n])
+                self._below[prefix] = self._below.get(prefix, 0) + 1
+        self._pending[path] = value
+
+    def _remove(self, path):
+        del self._pending[path]
+        segments = _split_path(path)
+        for n in range(1, len(segments)):
+            prefix = '/'.join(segments[:n])
+            self._below[prefix] -= 1
+            if not self._below[prefix]:
+                del self._below[prefix]
+
+    def update(self, path, fields):
+        """Queue setting each of fields under path, leaving its other children alone"""
+        for field, value in fields.items():
+            self.set(f"{path}/{field}", value)
+
+    def delete(self, path):
+        self.set(path, None)
+
+    def discard(self):
+        """Drop every pending write without sending it"""
+        with self._lock:
+            self._cancel_timer()
+            self._pending, self._below = {}, {}
+
+    # --- Sending ---------------------------------------------------------
+
+    def flush(self):
+        """Send the pending writes and return a BatchResult"""
+        with self._send_lock:
+            with self._lock:
+                self._cancel_timer()
+                pending, self._pending, self._below = self._pending, {}, {}
+            result = BatchResult()
+            if pending:
+                self._send(pending, result)
+            if self.on_written:
+                for path, value in result.written.items():
+                    self.on_written(path, value)
+        if result.failed:
+            logger.error(f"Batched write under {getattr(self.ref, 'path', '?')}: "
+                         f"{len(result.failed)} of {len(pending)} paths failed")
+        if self.on_flush and pending:
+            self.on_flush(result)
+        return result
+
+    def _send(self, updates, result):
+        result.requests += 1
+        try:
+            self.ref.update(updates)
+        except Exception as e:
+            # Halves of a batch that could not be delivered would fail the same way
+            if len(updates) == 1 or not is_rejection(e):
+                result.failed.update({path: e for path in updates})
+                return
+            items = list(updates.items())
+            middle = len(items) // 2
+            self._send(dict(items[:middle]), result)
+            self._send(dict(items[middle:]), result)
+            return
+        result.written.update(updates)
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
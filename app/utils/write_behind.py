@@ -0,0 +1,167 @@
+import threading
+import time
+from app.utils.logger import Logger
+
+logger = Logger()
+
+# Seconds the worker waits after an edit for more edits to merge with it
+DEFAULT_DELAY = 0.3
+# Sends per edit before it is given up and rolled back
+DEFAULT_MAX_ATTEMPTS = 3
+# Wait before the first retry; doubled for each later one
+DEFAULT_BACKOFF = 0.5
+
+
+class WriteBehindQueue:
+    """
+    Persists edits in the background so the caller can apply them locally
+    at once. Edits to the same key (a row) are merged until the worker
+    sends them, so a burst of edits becomes one write per row.
+
+    send(updates) receives {key: fields} and returns {key: error} for the
+    keys it could not write (empty when all succeeded). Failed keys are
+    retried with backoff; after max_attempts, on_failure(key, rollback,
+    error) is called from the worker thread with the last confirmed value
+    of every failed field that has not been edited again since.
+    on_success(key, fields) is called for each key written.
+    """
+
+    def __init__(self, send, delay=DEFAULT_DELAY, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 backoff=DEFAULT_BACKOFF, on_success=None, on_failure=None):
+        self._send = send
+        self.delay = delay
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.on_success = on_success
+        self.on_failure = on_failure
+        self._pending = {}      # key -> fields waiting to be sent
+        self._attempts = {}     # key -> failed sends of its pending fields
+        self._originals = {}    # key -> {field: last confirmed value} for unsaved fields
+        self._in_flight = 0
+        self._retry_at = 0.0
+        self._flushing = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._worker = None
+
+    def enqueue(self, key, fields, previous=None):
+        """
+        Queue fields to be written to key. previous holds the values the
+        fields had before this edit and is what a failed write rolls back to.
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('Write-behind queue is closed')
+            originals = self._originals.setdefault(key, {})
+            for field in fields:
+                if field not in originals:
+                    originals[field] = (previous or {}).get(field)
+            self._pending.setdefault(key, {}).update(fields)
+            self._attempts.pop(key, None)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='write-behind', daemon=True)
+                self._worker.start()
+            self._condition.notify_all()
+
+    def is_dirty(self, key):
+        """True while key has edits that are not yet confirmed written"""
+        with self._condition:
+            return bool(self._originals.get(key))
+
+    def discard(self, key):
+        """Forget key's unsent edits, e.g. because the row is being deleted"""
+        with self._condition:
+            self._pending.pop(key, None)
+            self._attempts.pop(key, None)
+            self._originals.pop(key, None)
+
+    def flush(self, timeout=None):
+        """Send pending edits now and wait until none are queued or in flight. Returns True if drained."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            # While flushing, the worker skips the merge delay and retry backoff
+            self._flushing += 1
+            self._condition.notify_all()
+            try:
+                while self._pending or self._in_flight:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+                return True
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout=None):
+        """Flush and stop the worker"""
+        drained = self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        return drained
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed and not self._pending:
+                    return
+                # Let a burst of edits settle, unless flush() is waiting on them
+                wait_until = max(self._retry_at, time.monotonic() + self.delay)
+                while not self._flushing and not self._closed:
+                    remaining = wait_until - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch, self._pending = self._pending, {}
+                self._in_flight += 1
+            try:
+                self._deliver(batch)
+            finally:
+                with self._condition:
+                    self._in_flight -= 1
+                    self._condition.notify_all()
+
+    def _deliver(self, batch):
+        try:
+            failed = self._send(batch) or {}
+        except Exception as e:
+            failed = {key: e for key in batch}
+        succeeded, given_up = [], []
+        with self._condition:
+            for key, fields in batch.items():
+                if key in failed:
+                    attempts = self._attempts.get(key, 0) + 1
+                    if attempts < self.max_attempts:
+                        # Retry; edits made meanwhile win over the failed values
+                        self._attempts[key] = attempts
+                        self._pending[key] = {**fields, **self._pending.get(key, {})}
+                        self._retry_at = time.monotonic() + self.backoff * 2 ** (attempts - 1)
+                        continue
+                    self._attempts.pop(key, None)
+                    rollback = self._settle(key, fields, rollback=True)
+                    given_up.append((key, rollback, failed[key]))
+                else:
+                    self._settle(key, fields)
+                    succeeded.append((key, fields))
+        for key, fields in succeeded:
+            if self.on_success:
+                self.on_success(key, fields)
+        for key, rollback, error in given_up:
+            logger.error(f"Could not save {sorted(rollback) or 'edits'} for {key}: {error}")
+            if self.on_failure:
+                self.on_failure(key, rollback, str(error))
+
+    def _settle(self, key, fields, rollback=False):
+        """Drop confirmed (or abandoned) fields from the originals; returns their confirmed values"""
+        originals = self._originals.get(key, {})
+        pending = self._pending.get(key, {})
+        restored = {}
+        for field in fields:
+            if field in pending or field not in originals:
+                continue
+            restored[field] = originals.pop(field)
+        if not originals:
+            self._originals.pop(key, None)
+        return restored if rollback else {}
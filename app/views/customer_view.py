@@ -12,6 +12,9 @@ from app.utils.ui_helpers import show_error
 from app.views.widgets.components import TableComponent, Button
 from app.views.widgets.reusable_shop_info_card import ReusableShopInfoCard, ShopCardPresets
 
+# Customers fetched per scroll step
+CUSTOMER_PAGE_SIZE = 100
+
 class CustomerDialog(QDialog):
     def __init__(self, parent=None, customer=None):
         super().__init__(parent)
@@ -471,6 +474,7 @@ class Badge(QLabel):
 class CustomerManagementView(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.next_customer_cursor = None
         self.setStyleSheet("background:#f8fafc;")
         main_layout = QVBoxLayout(self)
         main_layout.setSpacing(20)
@@ -587,6 +591,9 @@ class CustomerManagementView(QWidget):
         self.customer_table_view.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.customer_table_view.setSelectionMode(QAbstractItemView.MultiSelection)
         self.customer_table_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.customer_table_view.verticalScrollBar().valueChanged.connect(self.on_customer_table_scrolled)
+        # A taller viewport may leave loaded rows unable to scroll; top it up
+        self.customer_table_view.verticalScrollBar().rangeChanged.connect(lambda *_: self.fill_customer_table())
         self.customer_table_view.setStyleSheet('''
             QTableWidget {
                 background: #fff;
@@ -649,12 +656,32 @@ class CustomerManagementView(QWidget):
         
     def refresh_table(self):
         self.customer_table_view.setRowCount(0)
+        self.next_customer_cursor = None
         if not self.controller:
             return
+        self.load_customer_page()
+        self.fill_customer_table()
+        self.refresh_history_table()
+
+    def on_customer_table_scrolled(self, value):
+        # Fetch the next page as the user nears the bottom of the table
+        if self.next_customer_cursor and value >= self.customer_table_view.verticalScrollBar().maximum() - 5:
+            self.load_customer_page(self.next_customer_cursor)
+
+    def fill_customer_table(self):
+        """Load pages until the rows overflow the viewport, so scrolling can fetch the rest, or none are left"""
+        table = self.customer_table_view
+        while self.next_customer_cursor and table.verticalHeader().length() <= table.viewport().height():
+            self.load_customer_page(self.next_customer_cursor)
+
+    def load_customer_page(self, after=None):
         search = self.search_input.text()
-        customers = self.controller.get_customers(search)
-        self.customer_table_view.setRowCount(len(customers))
-        for row, customer in enumerate(customers):
+        page = self.controller.get_customers_page(search, after, CUSTOMER_PAGE_SIZE)
+        self.next_customer_cursor = page['next_cursor']
+        customers = page['rows']
+        start = self.customer_table_view.rowCount()
+        self.customer_table_view.setRowCount(start + len(customers))
+        for row, customer in enumerate(customers, start):
             # customer: (id, name, contact, address, history, created_at)
             name_item = QTableWidgetItem(str(customer[1]))
             name_item.setToolTip(str(customer[1]))
@@ -709,7 +736,6 @@ class CustomerManagementView(QWidget):
                 actions_layout.addWidget(btn)
             actions_layout.setAlignment(Qt.AlignCenter)
             self.customer_table_view.setCellWidget(row, 6, actions_widget)
-        self.refresh_history_table()
 
     def on_table_clicked(self):
         self.selected_row = self.customer_table_view.currentRow()
@@ -26,6 +26,7 @@ from app.views.inventory_view import InventoryView
 from app.controllers.inventory_controller import InventoryController
 from app.utils.database import DatabaseManager
 from app.utils.event_system import global_event_system
+from app.utils.background_loader import BackgroundLoader
 from datetime import datetime, timedelta
 
 # Replace all data access with InventoryManager and SalesManager methods
@@ -34,6 +35,8 @@ from datetime import datetime, timedelta
 
 from app.core.inventory import InventoryManager
 from app.core.sales import SalesManager
+from app.core.dashboard import DashboardSnapshot, DashboardSnapshotService
+from app.ui.firebase_utils import get_db
 
 # Import ReusableShopInfoCard and ShopCardPresets
 from app.views.widgets.reusable_shop_info_card import ReusableShopInfoCard, ShopCardPresets
@@ -55,12 +58,14 @@ class DashboardPage(QWidget):
         self.setup_data_controllers()
         self.setup_event_listeners()
         self.setup_refresh_timer()
-        self.update_summary_cards()
-        self.update_recent_activities()
+        self.refresh_dashboard_data()
     
     def setup_data_controllers(self):
         self.inventory_manager = InventoryManager(None)
         self.sales_manager = SalesManager(None)
+        self.loader = BackgroundLoader(self)
+        self.snapshot_service = DashboardSnapshotService(
+            self.sales_manager.db, self.inventory_manager.db, get_db().child('customers'))
     
     def setup_event_listeners(self):
         """Set up listeners for the global event system"""
@@ -75,118 +80,16 @@ class DashboardPage(QWidget):
 
     def on_inventory_updated(self, data):
         """Handle inventory update events"""
-        action = data.get('action', 'unknown')
-        product = data.get('product', {})
-        
-        if action == 'add':
-            product_name = product.get('name', 'Unknown product')
-            product_category = product.get('category', 'Unknown category')
-            product_quantity = product.get('quantity', 0)
-            
-            # Adding a product might affect low stock count
-            low_stock_count = self.get_low_stock_count()
-            self.stock_graph.set_title("Stock Flow", f"Low Stock: {low_stock_count} items")
-            
-            # Update inventory value
-            inventory_value = self.get_inventory_value()
-            self.profit_graph.set_title("Profit Analysis", f"Inventory Value: ${inventory_value:,.2f}")
-            
-        elif action == 'delete':
-            product_name = product.get('name', 'Unknown product')
-            
-            # Deleting a product affects inventory value
-            inventory_value = self.get_inventory_value()
-            self.profit_graph.set_title("Profit Analysis", f"Inventory Value: ${inventory_value:,.2f}")
-            
-            # May also affect low stock count
-            low_stock_count = self.get_low_stock_count()
-            self.stock_graph.set_title("Stock Flow", f"Low Stock: {low_stock_count} items")
-            
-        elif action == 'update':
-            product_name = product.get('name', 'Unknown product')
-            quantity = product.get('quantity', 'unknown quantity')
-            
-            # Update stock count and value if quantity changed
-            low_stock_count = self.get_low_stock_count()
-            self.stock_graph.set_title("Stock Flow", f"Low Stock: {low_stock_count} items")
-            self.stock_graph.update_indicator(f"{low_stock_count} items", "#e67e22")
-            
-            inventory_value = self.get_inventory_value()
-            self.profit_graph.set_title("Profit Analysis", f"Inventory Value: ${inventory_value:,.2f}")
-            
-        elif action == 'sale_impact':
-            # Inventory changed due to a sale
-            sale_id = data.get('sale_id', None)
-            
-            # Update stock levels
-            low_stock_count = self.get_low_stock_count()
-            self.stock_graph.set_title("Stock Flow", f"Low Stock: {low_stock_count} items")
-            
-            # Update inventory value
-            inventory_value = self.get_inventory_value()
-            self.profit_graph.set_title("Profit Analysis", f"Inventory Value: ${inventory_value:,.2f}")
-        
-        # Update metrics that depend on inventory
-        self.update_summary_cards()
-        
-        # Update recent activities to show inventory changes
-        self.update_recent_activities()
+        # Stock levels, inventory value and activities all come from one new snapshot
+        self.refresh_dashboard_data()
 
     def on_sales_updated(self, data):
         """Handle sales update events"""
-        action = data.get('action', 'unknown')
-        sale = data.get('sale', {})
-        
-        if action == 'add':
-            customer = sale.get('customer', 'Unknown customer')
-            amount = sale.get('total', 0)
-            
-        elif action == 'update':
-            sale_id = sale.get('id', 'Unknown ID')
-            amount = sale.get('total', 0)
-        
-        elif action == 'delete':
-            sale_id = sale.get('id', 'Unknown ID')
-        
-        # Update revenue metrics with real-time data
-        total_revenue = self.get_total_revenue()
-        weekly_change = self.get_revenue_weekly_change()
-        change_text = f"Last 7 Days: {weekly_change:.1f}%{'↑' if weekly_change >= 0 else '↓'}"
-        self.revenue_card.update_values(f"${total_revenue:,.2f}", change_text)
-        
-        # Update indicator color based on trend
-        color = "#27ae60" if weekly_change >= 0 else "#e74c3c"
-        self.sales_graph.update_indicator(f"{weekly_change:+.1f}%", color)
-        
-        # Update pending orders
-        pending_orders = self.get_pending_orders()
-        deliveries = self.get_todays_deliveries()
-        self.orders_card.update_values(f"{pending_orders}", f"Deliveries: {deliveries} Today")
-        
-        # Update activities to show new sales activity
-        self.update_recent_activities()
+        self.refresh_dashboard_data()
 
     def on_customer_updated(self, data):
         """Handle customer update events"""
-        action = data.get('action', 'unknown')
-        customer = data.get('customer', {})
-        
-        if action == 'add':
-            customer_name = customer.get('name', 'Unknown customer')
-            
-        elif action == 'update':
-            customer_id = customer.get('id', 'Unknown ID')
-            customer_name = customer.get('name', 'Unknown customer')
-        
-        elif action == 'delete':
-            customer_id = customer.get('id', 'Unknown ID')
-        
-        # Update customer metrics with real-time data
-        customer_count = self.get_customer_count()
-        self.customer_card.update_values(f"{customer_count}", "Active Customers")
-        
-        # Update activities to show customer activity
-        self.update_recent_activities()
+        self.refresh_dashboard_data()
 
     def setup_refresh_timer(self):
         """Set up a timer to refresh data periodically"""
@@ -194,82 +97,64 @@ class DashboardPage(QWidget):
         self.refresh_timer.timeout.connect(self.refresh_dashboard_data)
         self.refresh_timer.start(60000)  # Refresh every 60 seconds
 
+    def current_snapshot(self):
+        """The most recently loaded snapshot (empty before the first load)"""
+        snapshot = getattr(self, 'snapshot', None)
+        return snapshot if snapshot is not None else DashboardSnapshot.empty()
+
     def refresh_dashboard_data(self):
-        """Refresh all dashboard data to ensure real-time updates"""
+        """Refresh all dashboard data in the background; a newer refresh supersedes a pending one"""
+        self.loader.submit(
+            'snapshot', self.snapshot_service.build,
+            on_result=self.apply_snapshot,
+            on_error=lambda message: self.error_occurred.emit(f"Failed to load dashboard data: {message}")
+        )
+        return True
+
+    def apply_snapshot(self, snapshot):
+        """Show a loaded snapshot in every card, chart and the activity feed"""
+        self.snapshot = snapshot
         try:
-            # Update revenue metrics
-            total_revenue = self.get_total_revenue()
-            weekly_change = self.get_revenue_weekly_change()
-            change_text = f"Last 7 Days: {weekly_change:.1f}%{'↑' if weekly_change >= 0 else '↓'}"
-            self.revenue_card.update_values(f"${total_revenue:,.2f}", change_text)
+            self.update_summary_cards(snapshot)
             
-            # Update indicator color based on trend
+            # Update sales chart and indicator color based on trend
+            weekly_change = snapshot.revenue_weekly_change
             color = "#27ae60" if weekly_change >= 0 else "#e74c3c"  # Green if positive, red if negative
             self.sales_graph.update_indicator(f"{weekly_change:+.1f}%", color)
-            
-            # Update sales chart with real data 
-            sales_data = self.get_weekly_sales_data()
-            if sales_data:
-                self.sales_graph.set_data(sales_data.get('data', []), sales_data.get('labels', []), chart_type='line', color="#2ecc71")
-            
-            # Update customer metrics
-            customer_count = self.get_customer_count()
-            self.customer_card.update_values(f"{customer_count}", "Active Customers")
-            
-            # Update pending orders
-            pending_orders = self.get_pending_orders()
-            deliveries = self.get_todays_deliveries()
-            self.orders_card.update_values(f"{pending_orders}", f"Deliveries: {deliveries} Today")
+            self.sales_graph.set_data(list(snapshot.weekly_sales_data), list(snapshot.weekly_sales_labels), chart_type='line', color="#2ecc71")
             
             # Update stock flow chart
-            low_stock_count = self.get_low_stock_count()
+            low_stock_count = snapshot.low_stock_count
             self.stock_graph.set_title("Stock Flow", f"Low Stock: {low_stock_count} items")
-            stock_flow_data = self.get_stock_flow_data()
-            if isinstance(stock_flow_data, dict) and 'data' in stock_flow_data and 'labels' in stock_flow_data:
-                self.stock_graph.set_data(stock_flow_data['data'], stock_flow_data['labels'], chart_type='bar', color="#f39c12")
-            else:
-                self.stock_graph.set_data(stock_flow_data, chart_type='bar', color="#f39c12")
+            self.stock_graph.set_data(list(snapshot.stock_flow_data), list(snapshot.stock_flow_labels), chart_type='bar', color="#f39c12")
             self.stock_graph.update_indicator(f"{low_stock_count} Low", "#f39c12")
             
             # Update profit chart with quarterly data
-            inventory_value = self.get_inventory_value()
+            inventory_value = snapshot.inventory_value
             self.profit_graph.set_title("Quarterly Profit", f"Inventory Value: ${inventory_value:,.2f}")
-            profit_data = self.get_quarterly_profit_data()
-            self.profit_graph.set_data(profit_data.get('data', []), profit_data.get('labels', []), chart_type='bar', color="#9b59b6")
+            self.profit_graph.set_data(list(snapshot.quarterly_profit_data), list(snapshot.quarterly_profit_labels), chart_type='bar', color="#9b59b6")
             self.profit_graph.update_indicator(f"${inventory_value:,.2f}", "#9b59b6")
             
             # Update recent activities
-            self.update_recent_activities()
+            self.update_recent_activities(snapshot)
             
         except Exception as e:
             pass
-        
-        return True
     
-    def update_summary_cards(self):
+    def update_summary_cards(self, snapshot=None):
         """Update summary cards with real data"""
+        if snapshot is None:
+            snapshot = self.current_snapshot()
         # Update revenue card
-        total_revenue = self.get_total_revenue()
-        if not total_revenue:
-            total_revenue = 0.0
-        weekly_change = self.get_revenue_weekly_change()
+        weekly_change = snapshot.revenue_weekly_change
         change_text = f"Last 7 Days: {weekly_change:.1f}%{'↑' if weekly_change >= 0 else '↓'}"
-        self.revenue_card.update_values(f"${total_revenue:,.2f}", change_text)
+        self.revenue_card.update_values(f"${snapshot.total_revenue:,.2f}", change_text)
         
         # Update customer card
-        customer_count = self.get_customer_count()
-        if not customer_count:
-            customer_count = 0
-        self.customer_card.update_values(f"{customer_count}", "Active Customers")
+        self.customer_card.update_values(f"{snapshot.customer_count}", "Active Customers")
         
         # Update orders card
-        pending_orders = self.get_pending_orders()
-        if not pending_orders:
-            pending_orders = 0
-        deliveries = self.get_todays_deliveries()
-        if not deliveries:
-            deliveries = 0
-        self.orders_card.update_values(f"{pending_orders}", f"Deliveries: {deliveries} Today")
+        self.orders_card.update_values(f"{snapshot.pending_orders}", f"Deliveries: {snapshot.todays_deliveries} Today")
 
     def setup_animations(self):
         # Create fade-in animation for cards
@@ -551,68 +436,26 @@ class DashboardPage(QWidget):
 
     def get_low_stock_count(self):
         """Get count of items with low stock"""
-        if hasattr(self, 'inventory_manager'):
-            return self.inventory_manager.count_low_stock(threshold=10)
-        return 0
+        return self.current_snapshot().low_stock_count
 
     def get_inventory_value(self):
         """Get total inventory value"""
-        if hasattr(self, 'inventory_manager'):
-            return self.inventory_manager.calculate_inventory_value()
-        return 0
+        return self.current_snapshot().inventory_value
 
     def get_total_revenue(self):
-        try:
-            summary = self.sales_manager.get_sales_summary()
-            return summary.get('total_revenue', 0.0)
-        except Exception:
-            return 0.0
+        return self.current_snapshot().total_revenue
 
     def get_revenue_weekly_change(self):
-        try:
-            sales = self.sales_manager.list_sales()
-            if not sales:
-                return 0.0
-            # Group sales by week
-            from datetime import datetime, timedelta
-            now = datetime.now()
-            week_ago = now - timedelta(days=7)
-            prev_week_ago = now - timedelta(days=14)
-            curr_week_sales = [s for s in sales if hasattr(s, 'sale_date') and week_ago <= pd.to_datetime(s.sale_date) <= now]
-            prev_week_sales = [s for s in sales if hasattr(s, 'sale_date') and prev_week_ago <= pd.to_datetime(s.sale_date) < week_ago]
-            curr_revenue = sum(s.total_price for s in curr_week_sales)
-            prev_revenue = sum(s.total_price for s in prev_week_sales)
-            if prev_revenue > 0:
-                return ((curr_revenue - prev_revenue) / prev_revenue) * 100
-            elif curr_revenue > 0:
-                return 100.0
-            else:
-                return 0.0
-        except Exception:
-            return 0.0
+        return self.current_snapshot().revenue_weekly_change
 
     def get_customer_count(self):
-        try:
-            customers_obj = get_db().child('customers').get()
-            customers = customers_obj.val() if hasattr(customers_obj, 'val') else customers_obj or {}
-            return len(customers)
-        except Exception:
-            return 0
+        return self.current_snapshot().customer_count
 
     def get_pending_orders(self):
-        try:
-            sales = self.sales_manager.list_sales()
-            return sum(1 for s in sales if getattr(s, 'status', '').lower() == 'pending' or getattr(s, 'due_amount', 0) > 0)
-        except Exception:
-            return 0
+        return self.current_snapshot().pending_orders
 
     def get_todays_deliveries(self):
-        try:
-            sales = self.sales_manager.list_sales()
-            today = datetime.now().strftime('%Y-%m-%d')
-            return sum(1 for s in sales if hasattr(s, 'delivery_date') and getattr(s, 'delivery_date', '') == today)
-        except Exception:
-            return 0
+        return self.current_snapshot().todays_deliveries
 
     def get_main_window(self):
         """
@@ -708,14 +551,16 @@ class DashboardPage(QWidget):
         elif clicked_btn == financial_btn:
             reports_view.generate_financial_report()
 
-    def update_recent_activities(self):
+    def update_recent_activities(self, snapshot=None):
         """Update the recent activities section with latest data"""
         try:
             # Clear existing activities
             self.activity_widget.clear_activities()
             
-            # Get recent activities from database
-            activities = self.get_recent_activities()
+            # Get recent activities from the snapshot
+            if snapshot is None:
+                snapshot = self.current_snapshot()
+            activities = [dict(activity) for activity in snapshot.recent_activities]
             
             # Update the activity widget with real data
             self.activity_widget.update_activities(activities)
@@ -746,42 +591,7 @@ class DashboardPage(QWidget):
             # Ideally, we would filter for low stock items
 
     def get_recent_activities(self):
-        activities = []
-        try:
-            sales = self.sales_manager.list_sales()
-            for s in sorted(sales, key=lambda x: getattr(x, 'sale_date', ''), reverse=True)[:4]:
-                activities.append({
-                    "icon": "💰",
-                    "title": f"Sale to {getattr(s, 'customer_name', 'Unknown')}",
-                    "value": f"${getattr(s, 'total_price', 0):.2f}",
-                    "time": getattr(s, 'sale_date', ''),
-                    "activity_type": "sale",
-                    "item_id": getattr(s, 'id', None)
-                })
-            inventory = self.inventory_manager.list_products()
-            for p in inventory[:3]:
-                activities.append({
-                    "icon": "📦",
-                    "title": "Inventory Updated",
-                    "value": getattr(p, 'name', 'Unknown'),
-                    "time": getattr(p, 'created_at', ''),
-                    "activity_type": "inventory",
-                    "item_id": getattr(p, 'id', None)
-                })
-            customers_obj = get_db().child('customers').get()
-            customers = customers_obj.val() if hasattr(customers_obj, 'val') else customers_obj or {}
-            for i, (cid, cust) in enumerate(list(customers.items())[:2]):
-                activities.append({
-                    "icon": "👤",
-                    "title": "New Customer",
-                    "value": cust.get('name', 'Unknown'),
-                    "time": cust.get('joined', ''),
-                    "activity_type": "customer",
-                    "item_id": cid
-                })
-        except Exception:
-            pass
-        return activities
+        return [dict(activity) for activity in self.current_snapshot().recent_activities]
 
     def time_value(self, time_str):
         """Convert time string to numeric value for sorting"""
@@ -828,49 +638,16 @@ class DashboardPage(QWidget):
                 self.clear_layout(item.layout())
 
     def get_weekly_sales_data(self):
-        try:
-            sales = self.sales_manager.list_sales()
-            from datetime import datetime, timedelta
-            now = datetime.now()
-            labels = [(now - timedelta(days=i)).strftime('%a') for i in range(6, -1, -1)]
-            data = [0]*7
-            for s in sales:
-                if hasattr(s, 'sale_date'):
-                    idx = (now - pd.to_datetime(s.sale_date)).days
-                    if 0 <= idx < 7:
-                        data[6-idx] += getattr(s, 'total_price', 0)
-            return {"labels": labels, "data": data}
-        except Exception:
-            return {"labels": [], "data": []}
+        snapshot = self.current_snapshot()
+        return {"labels": list(snapshot.weekly_sales_labels), "data": list(snapshot.weekly_sales_data)}
 
     def get_stock_flow_data(self):
-        try:
-            products = self.inventory_manager.list_products()
-            low = sum(1 for p in products if (getattr(p, 'quantity', 0) or 0) < 5)
-            medium = sum(1 for p in products if 5 <= (getattr(p, 'quantity', 0) or 0) < 20)
-            high = sum(1 for p in products if (getattr(p, 'quantity', 0) or 0) >= 20)
-            orders = self.get_pending_orders()
-            return {"labels": ["Low", "Medium", "High", "Orders"], "data": [low, medium, high, orders]}
-        except Exception:
-            return {"labels": [], "data": []}
+        snapshot = self.current_snapshot()
+        return {"labels": list(snapshot.stock_flow_labels), "data": list(snapshot.stock_flow_data)}
 
     def get_quarterly_profit_data(self):
-        try:
-            sales = self.sales_manager.list_sales()
-            from datetime import datetime
-            now = datetime.now()
-            quarters = [((now.month-1)//3+1)-i for i in range(4)]
-            data = [0]*4
-            labels = [f"Q{q}" for q in reversed(quarters)]
-            for s in sales:
-                if hasattr(s, 'sale_date'):
-                    month = pd.to_datetime(s.sale_date).month
-                    q = (month-1)//3
-                    idx = 3-q if 0 <= q < 4 else 0
-                    data[idx] += getattr(s, 'total_price', 0)
-            return {"labels": labels, "data": data}
-        except Exception:
-            return {"labels": [], "data": []}
+        snapshot = self.current_snapshot()
+        return {"labels": list(snapshot.quarterly_profit_labels), "data": list(snapshot.quarterly_profit_data)}
 
     def on_data_refreshed(self):
         # Update the last updated label
@@ -10,6 +10,7 @@ from PyQt5.QtGui import QFont, QIntValidator, QDoubleValidator, QIcon, QColor, Q
 from app.views.widgets.components import Button  # Import our standardized Button component
 from app.views.widgets.reusable_shop_info_card import ReusableShopInfoCard, ShopCardPresets
 from app.utils.logger import Logger
+from app.utils.background_loader import BackgroundLoader
 from datetime import datetime
 from app.views.widgets.snackbar import Snackbar
 from app.core.inventory import InventoryManager
@@ -154,6 +155,7 @@ class InventoryView(QWidget):
         self.edit_button.clicked.connect(self._on_edit_product)
         self.save_button.clicked.connect(self._on_save_product)
         self._edit_row = None
+        self.loader = BackgroundLoader(self)
 
         self.init_ui()
 
@@ -578,6 +580,11 @@ class InventoryView(QWidget):
             # Create a proxy model for advanced filtering
             self.proxy_model = QSortFilterProxyModel()
             self.proxy_model.setSourceModel(self.controller.model)
+            # Edits that could not be saved are rolled back by the model; say so once per model
+            model = self.controller.model
+            if hasattr(model, 'error_occurred') and getattr(self, '_save_errors_model', None) is not model:
+                model.error_occurred.connect(self.show_toast)
+                self._save_errors_model = model
             self.proxy_model.setFilterCaseSensitivity(Qt.CaseInsensitive)
             self.proxy_model.setFilterKeyColumn(-1)  # Filter on all columns
             # Set the model for the table view
@@ -664,29 +671,34 @@ class InventoryView(QWidget):
         self.empty_icon.setVisible(not has_data)
 
     def refresh_from_controller(self):
+        if self.controller and hasattr(self.controller, 'load_inventory_data'):
+            if self.test_mode:
+                self.apply_inventory_data(self.controller.load_inventory_data())
+            else:
+                # Load off the GUI thread; a newer refresh supersedes a pending one
+                self.loader.submit(
+                    'inventory', self.controller.load_inventory_data,
+                    on_result=self.apply_inventory_data,
+                    on_error=lambda message: logger.error(f"❌ Error loading inventory: {message}")
+                )
+            return
         if self.controller:
-            # self.controller.model.select()  # Not needed for Firebase model
             self.controller.refresh_data()
-            stock = self.controller.count_total_stock()
-            low = self.controller.count_low_stock()
-            recent = self.controller.count_recent_items()
-            total_value = self.controller.calculate_inventory_value()
-            self.animate_card_value('stock', stock)
-            self.animate_card_value('low', low)
-            self.animate_card_value('recent', recent)
-            self.animate_card_value('value', total_value, is_currency=True)
-            # Debug print for row count
-            print(f"[DEBUG] Inventory model row count: {self.controller.model.rowCount()}")
-            if self.controller.model.rowCount() == 0:
-                self.empty_label.setVisible(True)
-                self.empty_icon.setVisible(True)
-            else:
-                self.empty_label.setVisible(False)
-                self.empty_icon.setVisible(False)
-            if hasattr(self, 'proxy_model'):
-                self.proxy_model.setFilterFixedString("")
         # Update info cards after refresh
         self.update_info_cards()
+
+    def apply_inventory_data(self, data):
+        """Show inventory data loaded by the controller (runs on the GUI thread)"""
+        self.controller.apply_inventory_data(data)
+        self.update_stock_info(data.get('stock', 0), data.get('low', 0), data.get('recent', 0), data.get('value', 0.0))
+        has_data = self.controller.model.rowCount() > 0
+        self.empty_label.setVisible(not has_data)
+        self.empty_icon.setVisible(not has_data)
+        if getattr(self, 'proxy_model', None):
+            self.proxy_model.setFilterFixedString("")
+        # If a filter is active, reapply it
+        if hasattr(self, 'filter_text') and self.filter_text.text():
+            self.apply_filters()
         logger.info(f"[{self.user_role}] Refreshed inventory view")
 
     def on_table_clicked(self, index):
@@ -919,16 +931,8 @@ class InventoryView(QWidget):
         """Refresh all inventory data to ensure real-time updates"""
         logger.info("Refreshing inventory data...")
         if self.controller:
-            # Refresh the model data
-            if hasattr(self.controller.model, 'refresh'):
-                self.controller.model.refresh()
-            elif hasattr(self.controller.model, 'select'):
-                self.controller.model.select()
-            # Update summary cards
+            # Reloads the model and summary cards in the background
             self.refresh_from_controller()
-            # If a filter is active, reapply it
-            if hasattr(self, 'filter_text') and self.filter_text.text():
-                self.apply_filters()
         else:
             logger.warning("⚠️ No controller available for refresh")
         return True
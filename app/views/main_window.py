@@ -477,6 +477,9 @@ class MainWindow(QMainWindow):
 
     def setup_event_listeners(self):
         """Setup listeners for the global event system"""
+        # Collapse bursts of updates (e.g. bulk uploads) into one refresh per window
+        global_event_system.enable_coalescing()
+
         # Update inventory page when inventory data changes
         global_event_system.inventory_updated.connect(self.refresh_inventory_page)
         
@@ -9,6 +9,7 @@ from PyQt5.QtWidgets import QApplication
 
 from app.controllers.reports_controller import ReportsController
 from app.utils.logger import Logger
+from app.utils.background_loader import BackgroundLoader
 from app.utils.theme_manager import ThemeManager
 from app.views.widgets.components import Card, Button
 from app.views.widgets.layouts import TabsLayout
@@ -59,6 +60,7 @@ class ReportsView(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.controller = ReportsController()
+        self.loader = BackgroundLoader(self)
         self.start_date = QDateEdit()
         self.end_date = QDateEdit()
         self.generate_button = QPushButton()
@@ -134,31 +136,49 @@ class ReportsView(QWidget):
         return period_map.get(self.period_combo.currentIndex(), "last_30_days")
     
     def load_data(self):
-        """Load data from controller and update UI"""
+        """Load report data from the controller in the background and update the UI when it arrives"""
+        self.loader.submit(
+            'reports', self.fetch_report_data, self.get_selected_period(),
+            on_result=self.apply_report_data,
+            on_error=lambda message: self.show_error_dialog(f"Failed to load some report data: {message}", title="Report Load Error")
+        )
+
+    def fetch_report_data(self, period):
+        """Query every report figure for a period (runs off the GUI thread)"""
+        return {
+            'sales': self.controller.get_sales_summary(period),
+            'monthly_sales': self.controller.get_monthly_sales(),
+            'sales_by_category': self.controller.get_sales_by_category(),
+            'customer_growth': self.controller.get_customer_growth(),
+            'inventory': self.controller.get_inventory_value(),
+            'profit': self.controller.get_profit_summary(period),
+        }
+
+    def apply_report_data(self, data):
+        """Update cards, charts and labels with data from fetch_report_data"""
         try:
-            period = self.get_selected_period()
-            sales_data = self.controller.get_sales_summary(period)
+            sales_data = data['sales']
             self.revenue_card.update_values(f"${sales_data.get('total_sales', 0):,.2f}")
             self.orders_card.update_values(f"{sales_data.get('total_orders', 0):,}")
             # TODO: Set self.revenue_sub, self.orders_sub, self.avg_sub with real period-over-period change if available
             # Update charts with real data
-            months, revenue_data = self.controller.get_monthly_sales()
+            months, revenue_data = data['monthly_sales']
             self.revenue_chart.set_data(revenue_data, labels=months, chart_type='line', color='#2563eb')
-            cat_labels, cat_data = self.controller.get_sales_by_category()
+            cat_labels, cat_data = data['sales_by_category']
             self.pie_chart.set_data(cat_data, labels=cat_labels, chart_type='bar', color='#6366f1')
             # Customer growth chart
-            cust_labels, cust_data = self.controller.get_customer_growth()
+            cust_labels, cust_data = data['customer_growth']
             self.growth_chart.set_data(cust_data, labels=cust_labels, chart_type='line', color='#3B82F6')
             
             # Get inventory data
-            inventory_data = self.controller.get_inventory_value()
+            inventory_data = data['inventory']
             self.inventory_card.update_values(f"${inventory_data.get('total_value', 0):,.2f}")
             self.stock_value_label.setText(f"Stock Value: ${inventory_data.get('total_value', 0):,.2f}")
             self.total_items_label.setText(f"Total Items: {inventory_data.get('total_items', 0):,}")
             self.low_stock_label.setText(f"Low Stock Items: {inventory_data.get('low_stock_items', 0):,}")
             
             # Get profit data
-            profit_data = self.controller.get_profit_summary(period)
+            profit_data = data['profit']
             self.profit_card.update_values(f"${profit_data.get('net_profit', 0):,.2f}")
             self.expenses_card.update_values(f"${profit_data.get('total_expenses', 0):,.2f}")
             
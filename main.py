@@ -4,6 +4,7 @@ from PyQt5.QtCore import Qt
 from app.utils.logger import Logger
 from app.utils.config_manager import config_manager
 from app.utils.database import DatabaseManager
+from app.utils.migrations import MigrationManager
 from app.ui.main_window import MainWindow
 from app.core.auth import AuthManager
 from app.core.event_system import EventSystem
@@ -45,6 +46,7 @@ class Application:
         try:
             # Initialize database first
             self.db_manager = DatabaseManager()
+            MigrationManager(DatabaseManager.get_db_path()).apply_migrations()
             
             # Select data provider
             db_type = config_manager.get('database.type')
@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PyQt5.QtCore import QCoreApplication, QThreadPool
+from app.utils.background_loader import BackgroundLoader
+
+
+class TestBackgroundLoader(unittest.TestCase):
+    """Test cases for the thread-pool data loader"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(1)
+        self.loader = BackgroundLoader(pool=self.pool)
+
+    def tearDown(self):
+        self.loader.cancel_all()
+        self.loader.wait_for_done(5000)
+
+    def process_until(self, condition, timeout=5.0):
+        deadline = time.time() + timeout
+        while not condition() and time.time() < deadline:
+            QCoreApplication.processEvents()
+            time.sleep(0.005)
+        QCoreApplication.processEvents()
+
+    def test_result_delivered_on_owner_thread(self):
+        """Test that the work runs in the pool and the result arrives on the GUI thread"""
+        results = []
+        main_thread = threading.current_thread()
+        self.loader.submit(
+            'data', lambda: threading.current_thread(),
+            on_result=lambda worker: results.append((worker, threading.current_thread()))
+        )
+        self.process_until(lambda: results)
+        worker, delivered_on = results[0]
+        self.assertIsNot(worker, main_thread)
+        self.assertIs(delivered_on, main_thread)
+        self.assertFalse(self.loader.is_pending('data'))
+
+    def test_newer_request_supersedes_stale_one(self):
+        """Test that only the latest request for a key delivers its result"""
+        release = threading.Event()
+        results = []
+        self.loader.submit('data', lambda: release.wait(5) and 'running', on_result=results.append)
+        self.loader.submit('data', lambda: 'queued', on_result=results.append)
+        self.loader.submit('data', lambda: 'latest', on_result=results.append)
+        release.set()
+        self.loader.wait_for_done(5000)
+        self.process_until(lambda: results)
+        self.assertEqual(results, ['latest'])
+
+    def test_error_signal(self):
+        """Test that failures are reported through on_error and error_occurred"""
+        errors = []
+        emitted = []
+        self.loader.error_occurred.connect(lambda key, message: emitted.append(key))
+
+        def fail():
+            raise RuntimeError("network down")
+
+        self.loader.submit('data', fail, on_error=errors.append)
+        self.process_until(lambda: errors)
+        self.assertIn("network down", errors[0])
+        self.assertEqual(emitted, ['data'])
+
+    def test_independent_keys(self):
+        """Test that requests for different keys do not cancel each other"""
+        results = {}
+        self.loader.result_ready.connect(lambda key, value: results.__setitem__(key, value))
+        self.loader.submit('sales', lambda: 1)
+        self.loader.submit('inventory', lambda: 2)
+        self.process_until(lambda: len(results) == 2)
+        self.assertEqual(results, {'sales': 1, 'inventory': 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
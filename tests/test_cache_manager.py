@@ -2,12 +2,16 @@ import unittest
 import sys
 import os
 import time
+import threading
 from datetime import datetime
 
 # Add the parent directory to the path so we can import app modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app.utils.cache_manager import CacheManager, CacheEntry, global_cache
+from app.utils.cache_manager import (
+    CacheManager, CacheEntry, global_cache, cached, uncached, invalidate_on_changes,
+    DEFAULT_MAX_ENTRIES, DEFAULT_MAX_BYTES
+)
 
 class TestCacheEntry(unittest.TestCase):
     """Test cases for the CacheEntry class"""
@@ -53,6 +57,7 @@ class TestCacheManager(unittest.TestCase):
     
     def tearDown(self):
         """Clean up after each test"""
+        global_cache.configure(max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES)
         global_cache.clear()
     
     def test_singleton_pattern(self):
@@ -166,6 +171,246 @@ class TestCacheManager(unittest.TestCase):
         self.assertEqual(stats["cached_items"], 2)
         self.assertIsInstance(stats["last_cleanup"], datetime)
         self.assertAlmostEqual(stats["hit_rate"], 66.67, delta=1)
+        self.assertEqual(stats["evictions"], 0)
+        self.assertGreater(stats["current_bytes"], 0)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted at the entry limit"""
+        global_cache.configure(max_entries=3)
+        global_cache.set("key1", "value1")
+        global_cache.set("key2", "value2")
+        global_cache.set("key3", "value3")
+
+        # Touch key1 so key2 becomes the least recently used
+        global_cache.get("key1")
+        global_cache.set("key4", "value4")
+
+        self.assertIsNone(global_cache.get("key2"))
+        self.assertEqual(global_cache.get("key1"), "value1")
+        self.assertEqual(global_cache.get("key4"), "value4")
+        self.assertEqual(global_cache.get_stats()["evictions"], 1)
+
+    def test_byte_limit(self):
+        """Test that large values are evicted to stay within the byte limit"""
+        global_cache.configure(max_bytes=100000)
+        global_cache.set("products_1", list(range(2000)))
+        global_cache.set("products_2", list(range(2000)))
+        stats = global_cache.get_stats()
+        self.assertLessEqual(stats["current_bytes"], 100000)
+        self.assertIsNone(global_cache.get("products_1"))
+        self.assertIsNotNone(global_cache.get("products_2"))
+
+        # A value larger than the whole cache is not stored
+        global_cache.set("report_frame", list(range(100000)))
+        self.assertIsNone(global_cache.get("report_frame"))
+
+    def test_cleanup_expires_due_entries_only(self):
+        """Test that cleanup removes expired entries and keeps live ones"""
+        global_cache.set("short", "value", ttl_seconds=0.05)
+        global_cache.set("long", "value", ttl_seconds=60)
+        global_cache.set("short", "overwritten", ttl_seconds=60)
+        global_cache.set("gone", "value", ttl_seconds=0.05)
+        time.sleep(0.1)
+        global_cache.cleanup()
+        stats = global_cache.get_stats()
+        self.assertEqual(stats["cached_items"], 2)
+        self.assertEqual(stats["expirations"], 1)
+        self.assertEqual(global_cache.get("short"), "overwritten")
+
+
+    def test_invalidate_tag(self):
+        """Test that every entry carrying a tag is removed, whatever its key"""
+        global_cache.set("inventory:low_stock:7", 3, tags=["inventory"])
+        global_cache.set("inventory:medium_stock:13_42", 5, tags=["inventory"])
+        global_cache.set("dashboard:stock_summary", {"low": 3}, tags=["inventory", "dashboard"])
+        global_cache.set("sales:summary", {"total": 10}, tags=["sales"])
+
+        removed = global_cache.invalidate_tag("inventory")
+
+        self.assertEqual(removed, 3)
+        self.assertIsNone(global_cache.get("inventory:low_stock:7"))
+        self.assertIsNone(global_cache.get("dashboard:stock_summary"))
+        self.assertEqual(global_cache.get("sales:summary"), {"total": 10})
+        self.assertEqual(global_cache.get_stats()["invalidations"], 3)
+
+    def test_invalidate_prefix(self):
+        """Test removing entries by colon-delimited and plain key prefix"""
+        global_cache.set("inventory:low_stock:7", 3)
+        global_cache.set("inventory:high_stock:99", 1)
+        global_cache.set("reports:monthly", [1, 2])
+
+        self.assertEqual(global_cache.invalidate_prefix("inventory:low_stock:"), 1)
+        self.assertEqual(global_cache.get("inventory:high_stock:99"), 1)
+        self.assertEqual(global_cache.invalidate_prefix("inv"), 1)
+        self.assertEqual(global_cache.get("reports:monthly"), [1, 2])
+
+    def test_tag_index_cleaned_on_delete_and_expiry(self):
+        """Test that removed entries do not linger in the tag index"""
+        global_cache.set("inventory:a", 1, tags=["inventory"])
+        global_cache.set("inventory:b", 2, tags=["inventory"], ttl_seconds=0.05)
+        global_cache.delete("inventory:a")
+        time.sleep(0.1)
+        global_cache.cleanup()
+        self.assertEqual(global_cache.get_stats()["tags"], 0)
+        self.assertEqual(global_cache.invalidate_tag("inventory"), 0)
+
+
+class TestCachedDecorator(unittest.TestCase):
+    """Test cases for the @cached decorator"""
+
+    def setUp(self):
+        global_cache.clear()
+
+    def tearDown(self):
+        global_cache.clear()
+
+    def test_caches_per_arguments_and_instance(self):
+        """Test that results are keyed by arguments and by instance"""
+        calls = []
+
+        class Reports:
+            @cached(namespace="test_reports")
+            def monthly(self, months=6):
+                calls.append(months)
+                return [0] * months
+
+        first, second = Reports(), Reports()
+        self.assertEqual(first.monthly(), [0] * 6)
+        self.assertEqual(first.monthly(months=6), [0] * 6)
+        first.monthly(3)
+        second.monthly()
+        self.assertEqual(calls, [6, 3, 6])
+
+        Reports.monthly.invalidate()
+        first.monthly()
+        self.assertEqual(calls, [6, 3, 6, 6])
+
+    def test_custom_key_and_cache_if(self):
+        """Test an explicit key function and skipping error results"""
+        calls = []
+
+        @cached(namespace="test_summary", key=lambda period, **_: period,
+                cache_if=lambda result: "error" not in result)
+        def summary(period, attempt=0):
+            calls.append(period)
+            return {"error": "offline"} if period == "bad" else {"period": period}
+
+        summary("week", attempt=1)
+        summary("week", attempt=2)
+        summary("bad")
+        summary("bad")
+        self.assertEqual(calls, ["week", "bad", "bad"])
+        self.assertIsNotNone(global_cache.get("test_summary:summary:week"))
+
+    def test_concurrent_misses_compute_once(self):
+        """Test that threads missing the same key share one computation"""
+        calls = []
+        started = threading.Event()
+
+        @cached(namespace="test_flight")
+        def slow_total():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return 42
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(slow_total())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, [42] * 8)
+        self.assertEqual(len(calls), 1)
+
+    def test_invalidation_during_compute_is_not_stored(self):
+        """Test that a result computed across an invalidation is not cached"""
+        values = iter([1, 2])
+
+        @cached(namespace="test_stale")
+        def stock():
+            value = next(values)
+            if value == 1:
+                global_cache.invalidate_tag("test_stale")
+            return value
+
+        self.assertEqual(stock(), 1)
+        self.assertEqual(stock(), 2)
+        self.assertEqual(stock(), 2)
+
+    def test_unrelated_invalidation_during_compute_is_stored(self):
+        """Test that invalidating another namespace or key does not stop a result being cached"""
+        calls = []
+
+        @cached(namespace="test_busy")
+        def stock():
+            calls.append(1)
+            global_cache.invalidate_tag("test_other")
+            global_cache.invalidate_prefix("test_oth")
+            global_cache.delete("test_other:key")
+            return 5
+
+        self.assertEqual((stock(), stock()), (5, 5))
+        self.assertEqual(len(calls), 1)
+
+        @cached(namespace="test_busy")
+        def sales():
+            calls.append(1)
+            global_cache.delete("test_busy:sales:()")
+            return 7
+
+        self.assertEqual((sales(), sales()), (7, 7))
+        self.assertEqual(len(calls), 3)
+
+    def test_event_system_invalidates_namespace(self):
+        """Test that an event system signal clears the namespace"""
+        from app.utils.event_system import global_event_system
+        calls = []
+
+        @cached(namespace="test_events", invalidate_on=("sales_updated",))
+        def sales_total():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(sales_total(), 1)
+        self.assertEqual(sales_total(), 1)
+        global_event_system.notify_sales_update()
+        self.assertEqual(sales_total(), 2)
+
+    def test_uncached_results_are_not_stored(self):
+        """Test that a fallback wrapped in uncached() is returned but computed again next time"""
+        calls = []
+
+        @cached(namespace="test_fallback")
+        def monthly_sales():
+            calls.append(1)
+            if len(calls) == 1:
+                return uncached((["Jan"], [0]))
+            return ["Jan"], [len(calls)]
+
+        self.assertEqual(monthly_sales(), (["Jan"], [0]))
+        self.assertEqual(monthly_sales(), (["Jan"], [2]))
+        self.assertEqual(monthly_sales(), (["Jan"], [2]))
+
+    def test_replica_changes_invalidate_namespace(self):
+        """Test that a change streamed into a replica clears the namespace"""
+        from app.utils.local_rtdb import LocalDatabase
+        from app.utils.firebase_replica import FirebaseReplica
+        database = LocalDatabase({"inventory": {"p1": {"quantity": 5}}})
+        replica = FirebaseReplica(database.reference('/inventory'))
+        invalidate_on_changes("test_replica", replica)
+        invalidate_on_changes("test_replica", replica)
+
+        @cached(namespace="test_replica")
+        def total_stock():
+            return sum(record["quantity"] for record in replica.values())
+
+        self.assertEqual(total_stock(), 5)
+        # Another terminal sells one
+        database.reference('/inventory/p1').update({"quantity": 4})
+        self.assertEqual(total_stock(), 4)
+        self.assertEqual(len(replica._listeners), 1)
+        replica.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,122 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.event_system import EventSystem, EventTypes
+
+
+class TestCoreEventSystem(unittest.TestCase):
+    """Test cases for the worker-pool event dispatcher"""
+
+    def setUp(self):
+        self.events = EventSystem(workers=4, max_queue_size=100)
+        self.events.start()
+
+    def tearDown(self):
+        self.events.stop(timeout=5)
+
+    def test_handlers_receive_events(self):
+        """Test that subscribed handlers get published data"""
+        received = []
+        self.events.subscribe(EventTypes.USER_LOGIN, received.append)
+        self.assertTrue(self.events.publish(EventTypes.USER_LOGIN, {"username": "john"}))
+        self.events.join()
+        self.assertEqual(received, [{"username": "john"}])
+
+    def test_per_type_ordering(self):
+        """Test that events of one type are handled in publish order"""
+        received = {EventTypes.SALE_CREATED: [], EventTypes.PRODUCT_UPDATED: []}
+        for event_type, items in received.items():
+            self.events.subscribe(event_type, items.append)
+        for i in range(200):
+            self.events.publish(EventTypes.SALE_CREATED, i)
+            self.events.publish(EventTypes.PRODUCT_UPDATED, i)
+        self.events.join()
+        for items in received.values():
+            self.assertEqual(items, list(range(200)))
+
+    def test_types_handled_in_parallel(self):
+        """Test that a slow handler does not hold up other event types"""
+        release = threading.Event()
+        fast = []
+        slow_queue = self.events._queue_for("slow")
+        fast_type = next(f"fast.{i}" for i in range(100) if self.events._queue_for(f"fast.{i}") is not slow_queue)
+        self.events.subscribe("slow", lambda data: release.wait(5))
+        self.events.subscribe(fast_type, fast.append)
+        self.events.publish("slow")
+        self.events.publish(fast_type, 1)
+        deadline = time.time() + 5
+        while not fast and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        self.assertEqual(fast, [1])
+
+    def test_backpressure_drops_when_full(self):
+        """Test that publish blocks up to its timeout and then drops the event"""
+        self.events.stop()
+        self.events = EventSystem(workers=1, max_queue_size=2, publish_timeout=0.05)
+        self.assertTrue(self.events.publish("sale.created", 1))
+        self.assertTrue(self.events.publish("sale.created", 2))
+        started = time.perf_counter()
+        self.assertFalse(self.events.publish("sale.created", 3))
+        self.assertGreaterEqual(time.perf_counter() - started, 0.04)
+        self.assertEqual(self.events.get_metrics()["dropped"], 1)
+        self.assertEqual(self.events.get_metrics()["queue_depth"], 2)
+
+    def test_stop_drains_queue(self):
+        """Test that stop handles queued events before the workers exit"""
+        received = []
+        self.events.subscribe("sale.created", lambda data: (time.sleep(0.001), received.append(data)))
+        for i in range(50):
+            self.events.publish("sale.created", i)
+        self.events.stop(timeout=5)
+        self.assertEqual(received, list(range(50)))
+        self.assertFalse(any(worker.is_alive() for worker in self.events._workers))
+
+    def test_stop_respects_timeout_on_full_queue(self):
+        """Test that stop returns within its timeout when a worker is stuck behind a full queue"""
+        release = threading.Event()
+        self.events.stop()
+        self.events = EventSystem(workers=1, max_queue_size=2, publish_timeout=0)
+        busy = threading.Event()
+        self.events.subscribe("sale.created", lambda data: (busy.set(), release.wait(5)))
+        self.events.start()
+        self.events.publish("sale.created", 0)
+        self.assertTrue(busy.wait(5))
+        self.assertTrue(self.events.publish("sale.created", 1))
+        self.assertTrue(self.events.publish("sale.created", 2))
+        started = time.perf_counter()
+        self.events.stop(timeout=0.1)
+        self.assertLess(time.perf_counter() - started, 1.0)
+        release.set()
+        self.events._workers[0].join(5)
+        self.assertFalse(self.events._workers[0].is_alive())
+        self.assertEqual(self.events.get_metrics()["processed"], 1)
+
+    def test_metrics(self):
+        """Test handler latency and error counters"""
+        def fail(data):
+            raise ValueError("bad event")
+
+        self.events.subscribe("sale.created", lambda data: time.sleep(0.01))
+        self.events.subscribe("sale.created", fail)
+        self.events.publish("sale.created")
+        self.events.publish("sale.created")
+        self.events.join()
+        metrics = self.events.get_metrics()
+        self.assertEqual(metrics["published"], 2)
+        self.assertEqual(metrics["processed"], 2)
+        self.assertEqual(metrics["handler_errors"], 2)
+        self.assertEqual(metrics["queue_depth"], 0)
+        latency = metrics["handler_latency"]["sale.created"]
+        self.assertEqual(latency["count"], 4)
+        self.assertGreaterEqual(latency["max"], 0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
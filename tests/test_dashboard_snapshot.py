@@ -0,0 +1,127 @@
+import unittest
+import dataclasses
+import sys
+import os
+from datetime import datetime
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.local_rtdb import LocalDatabase
+from app.utils.firebase_replica import FirebaseReplica
+from app.core.dashboard import DashboardSnapshotService, SalesFrame
+
+
+class TestDashboardSnapshot(unittest.TestCase):
+    """Test cases for the single-pass dashboard snapshot"""
+
+    def setUp(self):
+        self.database = LocalDatabase({
+            "sales": {
+                "s1": {"total_amount": 100.0, "sale_date": "2024-05-15", "customer_name": "Ann"},
+                "s2": {"total_amount": 50.0, "sale_date": "2024-05-06", "due_amount": 10.0},
+                "s3": {"amount": 25.0, "date": "2024-02-01", "status": "Pending",
+                       "delivery_date": "2024-05-15"},
+            },
+            "inventory": {
+                "p1": {"name": "Pen", "quantity": 2, "buying_price": 1.0},
+                "p2": {"name": "Book", "quantity": 12, "buying_price": 5.0},
+                "p3": {"name": "Desk", "quantity": 30, "buying_price": 10.0},
+            },
+            "customers": {
+                "c1": {"name": "Ann"},
+                "c2": {"name": "Bob"},
+            }
+        })
+        root = self.database.reference('/')
+        self.service = DashboardSnapshotService(
+            root.child('sales'), root.child('inventory'), root.child('customers'))
+        self.now = datetime(2024, 5, 15, 12, 0)
+
+    def tearDown(self):
+        FirebaseReplica.reset_registry()
+
+    def test_metrics(self):
+        """Test every card metric from one snapshot"""
+        snapshot = self.service.build(now=self.now)
+        self.assertAlmostEqual(snapshot.total_revenue, 175.0)
+        self.assertAlmostEqual(snapshot.revenue_weekly_change, 100.0)
+        self.assertEqual(snapshot.customer_count, 2)
+        self.assertEqual(snapshot.pending_orders, 2)
+        self.assertEqual(snapshot.todays_deliveries, 1)
+        self.assertEqual(snapshot.low_stock_count, 1)
+        self.assertAlmostEqual(snapshot.inventory_value, 362.0)
+        self.assertEqual(snapshot.fetch_count, 3)
+
+    def test_chart_series(self):
+        """Test the weekly, stock flow and quarterly series"""
+        snapshot = self.service.build(now=self.now)
+        self.assertEqual(len(snapshot.weekly_sales_data), 7)
+        self.assertEqual(snapshot.weekly_sales_labels[-1], "Wed")
+        self.assertAlmostEqual(snapshot.weekly_sales_data[-1], 100.0)
+        self.assertEqual(snapshot.stock_flow_data, (1, 1, 1, 2))
+        self.assertEqual(snapshot.quarterly_profit_labels, ("Q3", "Q4", "Q1", "Q2"))
+        self.assertEqual(snapshot.quarterly_profit_data, (0.0, 0.0, 25.0, 150.0))
+
+    def test_recent_activities(self):
+        """Test that the newest sales lead the activity feed"""
+        activities = self.service.build(now=self.now).recent_activities
+        self.assertEqual(activities[0]["title"], "Sale to Ann")
+        self.assertEqual(sum(1 for a in activities if a["activity_type"] == "customer"), 2)
+
+    def test_snapshot_is_immutable(self):
+        """Test that views cannot modify a snapshot"""
+        snapshot = self.service.build(now=self.now)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            snapshot.total_revenue = 0
+        with self.assertRaises(TypeError):
+            snapshot.recent_activities[0]["title"] = "changed"
+
+    def test_each_collection_fetched_once(self):
+        """Test that a refresh reads each collection at most once"""
+        self.service.build(now=self.now)
+        self.assertEqual(self.database.request_count, 0)
+        self.service.build(now=self.now)
+        self.database.reference('/sales/s4').set({"total_amount": 5.0, "sale_date": "2024-05-15"})
+        snapshot = self.service.build(now=self.now)
+        self.assertEqual(self.database.request_count, 1)
+        self.assertAlmostEqual(snapshot.total_revenue, 180.0)
+
+
+class TestSalesFrame(unittest.TestCase):
+    """Test cases for the columnar sales frame used for time bucketing"""
+
+    def setUp(self):
+        self.frame = SalesFrame.from_records([
+            ("a", {"total_amount": 10.0, "sale_date": "2024-03-31"}),
+            ("b", {"total_amount": 20.0, "sale_date": "2024-04-01T09:30:00"}),
+            ("c", {"amount": 5.0, "date": "2024-04-03"}),
+            ("d", {"total_amount": 7.0, "sale_date": "not a date"}),
+            ("e", {"total_amount": 1.0}),
+        ])
+
+    def test_total_includes_undated_sales(self):
+        """Test that sales without a usable date still count towards revenue"""
+        self.assertAlmostEqual(self.frame.total, 43.0)
+        self.assertEqual(len(self.frame.days), 3)
+
+    def test_window_and_daily_sums(self):
+        """Test half-open day windows and per-day buckets"""
+        self.assertAlmostEqual(self.frame.window_sum("2024-04-01", "2024-04-04"), 25.0)
+        self.assertAlmostEqual(self.frame.window_sum("2024-03-31", "2024-04-01"), 10.0)
+        self.assertEqual(list(self.frame.daily_sums("2024-03-31", 4)), [10.0, 20.0, 0.0, 5.0])
+
+    def test_quarterly_sums(self):
+        """Test calendar quarter buckets across a quarter boundary"""
+        first_quarter = 2024 * 4 + 0  # Q1 2024
+        self.assertEqual(list(self.frame.quarterly_sums(first_quarter, 2)), [10.0, 25.0])
+
+    def test_large_frame(self):
+        """Test bucketing many sales at once"""
+        sales = [(str(i), {"total_amount": 1.0, "sale_date": f"2024-01-{i % 28 + 1:02d}"}) for i in range(28000)]
+        frame = SalesFrame.from_records(sales)
+        self.assertEqual(list(frame.daily_sums("2024-01-01", 28)), [1000.0] * 28)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.data.data_provider import SQLDataProvider
+from app.utils.database import DatabaseManager, iter_rows
+
+
+class TestSQLDataProvider(unittest.TestCase):
+    """Test the SQL data provider on the pooled sqlite3 connection"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = DatabaseManager()
+        self.db.initialize(os.path.join(self.temp_dir, "shop.db"))
+        self.conn = DatabaseManager.get_sqlite_connection()
+        self.conn.execute('''
+            CREATE TABLE products (
+                id INTEGER PRIMARY KEY, name TEXT, stock_quantity INTEGER, price REAL, category TEXT,
+                details TEXT, buying_price REAL, selling_price REAL
+            )
+        ''')
+        self.conn.executemany("INSERT INTO products (name, stock_quantity) VALUES (?, ?)",
+                              [(f"Item {i}", i) for i in range(1, 1201)])
+        self.conn.commit()
+        self.provider = SQLDataProvider(self.db)
+
+    def tearDown(self):
+        self.db.initialize(None)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_get_products(self):
+        """Test that the provider reads through a real sqlite3 cursor"""
+        products = self.provider.get_products()
+        self.assertEqual(len(products), 1200)
+        self.assertEqual(products[0]["name"], "Item 1")
+        new_id = self.provider.add_product({"name": "Glue", "quantity": 3})
+        self.assertEqual(self.provider.get_products()[-1]["id"], new_id)
+
+    def test_iter_products_streams_in_batches(self):
+        """Test that rows are fetched batch by batch rather than all at once"""
+        rows = iter_rows(self.conn, "SELECT * FROM products ORDER BY id", row_factory='dict', batch_size=100)
+        self.assertEqual([next(rows)["id"] for _ in range(150)][-1], 150)
+        # Closing early closes the cursor instead of reading the remaining batches
+        rows.close()
+        self.assertEqual(list(rows), [])
+
+        records = self.provider.iter_products(row_factory='namedtuple', batch_size=256)
+        first = next(records)
+        self.assertEqual((first.id, first.name, first.stock_quantity), (1, "Item 1", 1))
+        self.assertEqual(sum(record.stock_quantity for record in records), sum(range(2, 1201)))
+        self.assertEqual(next(self.provider.iter_products(row_factory='tuple'))[:2], (1, "Item 1"))
+
+    def test_iter_sales(self):
+        """Test streaming sales written through the provider"""
+        self.conn.execute('CREATE TABLE customers (id INTEGER PRIMARY KEY, full_name TEXT)')
+        from app.models.sales import SalesModel
+        SalesModel(self.conn)
+        for i in range(3):
+            self.provider.add_sale({"invoice_number": f"INV-{i}", "date": "2024-05-01", "total_price": 10.0})
+        self.assertEqual([sale["invoice_number"] for sale in self.provider.iter_sales()],
+                         ["INV-0", "INV-1", "INV-2"])
+        self.assertEqual(len(self.provider.get_sales()), 3)
+
+    def test_raw_connection(self):
+        """Test a provider built directly on a sqlite3 connection"""
+        conn = sqlite3.connect(os.path.join(self.temp_dir, "shop.db"))
+        try:
+            self.assertEqual(next(SQLDataProvider(conn).iter_products())["name"], "Item 1")
+        finally:
+            conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
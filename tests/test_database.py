@@ -1,7 +1,8 @@
 import pytest
 import sqlite3
+import threading
 from datetime import datetime
-from app.utils.database import DatabaseManager
+from app.utils.database import DatabaseManager, SQLiteConnectionPool, transaction
 from app.utils.error_handler import DatabaseError
 
 @pytest.mark.integration
@@ -233,4 +234,127 @@ class TestDatabaseManager:
         
         # Clean up
         cursor.execute("DELETE FROM products WHERE name LIKE 'Bulk Product%'")
-        db_connection.commit() 
\ No newline at end of file
+        db_connection.commit() 
+
+class TestSQLiteConnectionPool:
+    @pytest.fixture
+    def pool(self, tmp_path):
+        pool = SQLiteConnectionPool(str(tmp_path / "pool.db"))
+        with pool.transaction() as conn:
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+        yield pool
+        pool.close_all()
+
+    def test_connection_reused_per_thread(self, pool):
+        """Test that a thread gets the same configured connection on every call."""
+        conn = pool.connection()
+        assert pool.connection() is conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+
+        other = []
+        worker = threading.Thread(target=lambda: other.append(pool.connection()))
+        worker.start()
+        worker.join()
+        assert other[0] is not conn
+        assert pool.size == 2
+
+    def test_transaction_commit_and_rollback(self, pool):
+        """Test that transactions commit on success and roll back on error."""
+        with pool.transaction() as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('kept')")
+
+        with pytest.raises(sqlite3.IntegrityError):
+            with pool.transaction(immediate=True) as conn:
+                conn.execute("INSERT INTO items (id, name) VALUES (10, 'lost')")
+                conn.execute("INSERT INTO items (id, name) VALUES (10, 'duplicate')")
+
+        names = [row["name"] for row in pool.connection().execute("SELECT name FROM items")]
+        assert names == ["kept"]
+
+    def test_nested_transaction_uses_savepoint(self, pool):
+        """Test that a failed inner block only undoes its own work."""
+        with pool.transaction() as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('outer')")
+            with pytest.raises(ValueError):
+                with transaction(conn):
+                    conn.execute("INSERT INTO items (name) VALUES ('inner')")
+                    raise ValueError("undo inner")
+
+        names = [row["name"] for row in pool.connection().execute("SELECT name FROM items")]
+        assert names == ["outer"]
+
+    def test_close_all_reopens(self, pool):
+        """Test that closed pools hand out fresh connections."""
+        conn = pool.connection()
+        pool.close_all()
+        assert pool.connection() is not conn
+        assert pool.connection().execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+
+    def test_database_manager_uses_pool(self, tmp_path):
+        """Test that DatabaseManager connections and inserts go through the pool."""
+        manager = DatabaseManager()
+        try:
+            manager.initialize(str(tmp_path / "shop.db"))
+            conn = DatabaseManager.get_sqlite_connection()
+            assert DatabaseManager.get_sqlite_connection() is conn
+            with manager.transaction() as tx:
+                tx.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)")
+            row_id = DatabaseManager.execute_insert("INSERT INTO notes (body) VALUES (?)", ("hello",))
+            assert row_id == 1
+            assert not conn.in_transaction
+        finally:
+            manager.initialize(None)
+
+
+class TestQueryExecution:
+    @pytest.fixture
+    def manager(self, tmp_path):
+        manager = DatabaseManager()
+        manager.initialize(str(tmp_path / "query.db"))
+        with manager.transaction() as conn:
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, price REAL)")
+            conn.executemany("INSERT INTO items (name, price) VALUES (?, ?)",
+                             [(f"item {i}", float(i)) for i in range(1200)])
+        yield manager
+        manager.initialize(None)
+
+    def test_execute_query_returns_real_rows(self, manager):
+        """Test that queries run against the database instead of returning stub rows."""
+        rows = DatabaseManager.execute_query("SELECT COUNT(*), SUM(price) FROM items WHERE price >= ?", (1000,))
+        assert rows[0][0] == 200
+        assert rows[0][1] == sum(range(1000, 1200))
+        assert DatabaseManager.execute_query("SELECT * FROM items WHERE id = ?", (-1,)) == []
+
+    def test_row_factories(self, manager):
+        """Test row, dict, namedtuple and tuple results."""
+        query = "SELECT id, name FROM items WHERE id = ?"
+        row = DatabaseManager.execute_query(query, (1,))[0]
+        assert row["name"] == row[1] == "item 0"
+        assert DatabaseManager.execute_query(query, (1,), row_factory='dict') == [{"id": 1, "name": "item 0"}]
+        record = DatabaseManager.execute_query(query, (1,), row_factory='namedtuple')[0]
+        assert (record.id, record.name) == (1, "item 0")
+        assert DatabaseManager.execute_query(query, (1,), row_factory='tuple') == [(1, "item 0")]
+
+    def test_write_statements_commit(self, manager):
+        """Test that modifying statements are committed and return no rows."""
+        assert DatabaseManager.execute_query("UPDATE items SET price = 0 WHERE id <= ?", (10,)) == []
+        assert not DatabaseManager.get_sqlite_connection().in_transaction
+        assert DatabaseManager.execute_query("SELECT COUNT(*) FROM items WHERE price = 0")[0][0] == 10
+
+    def test_iter_query_streams_in_batches(self, manager):
+        """Test that iter_query yields every row across fetchmany batches."""
+        rows = DatabaseManager.iter_query("SELECT id FROM items ORDER BY id", batch_size=100, row_factory='tuple')
+        assert next(rows) == (1,)
+        assert sum(1 for _ in rows) == 1199
+
+    def test_query_timing(self, manager):
+        """Test that timed queries are recorded per statement."""
+        query = "SELECT name FROM items WHERE id = ?"
+        for i in range(1, 6):
+            DatabaseManager.execute_query(query, (i,), timed=True)
+        stats = DatabaseManager.get_query_stats()[query]
+        assert stats["count"] == 5
+        assert stats["max"] >= stats["avg"] > 0
@@ -1,11 +1,13 @@
 import unittest
 import sys
 import os
+import threading
+import time
 
 # Add the parent directory to the path so we can import app modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from PyQt5.QtCore import QObject
+from PyQt5.QtCore import QObject, QCoreApplication
 from app.utils.event_system import EventSystem, global_event_system
 
 class TestEventReceiver(QObject):
@@ -46,6 +48,10 @@ class TestEventReceiver(QObject):
 
 class TestEventSystem(unittest.TestCase):
     """Test cases for the event system"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
     
     def setUp(self):
         """Set up the test environment"""
@@ -76,6 +82,9 @@ class TestEventSystem(unittest.TestCase):
             # Ignore "method not connected" errors which can happen when testing singleton behavior
             pass
         
+        # Back to immediate delivery
+        self.event_system.disable_coalescing()
+
         # Reset signal counts
         self.event_system.reset_signal_counts()
         self.receiver.reset_counters()
@@ -87,6 +96,12 @@ class TestEventSystem(unittest.TestCase):
         
         # Check that both instances are the same
         self.assertIs(self.event_system, event_system2)
+
+    def test_repeated_construction_keeps_connections(self):
+        """Test that calling EventSystem() again does not disconnect existing listeners"""
+        EventSystem()
+        self.event_system.notify_sales_update({"id": 1})
+        self.assertEqual(self.receiver.sales_events, 1)
     
     def test_inventory_updated_signal(self):
         """Test the inventory_updated signal"""
@@ -193,5 +208,67 @@ class TestEventSystem(unittest.TestCase):
         self.event_system.set_debug_mode(False)
 
 
+    def process_events_for(self, seconds):
+        deadline = time.time() + seconds
+        while time.time() < deadline:
+            QCoreApplication.processEvents()
+            time.sleep(0.01)
+
+    def test_coalescing_window(self):
+        """Test that a burst of notifications is delivered once with the merged changes"""
+        self.event_system.set_coalescing_window("inventory", 50)
+        for i in range(500):
+            self.event_system.notify_inventory_update({"action": "add", "product": {"id": i}})
+        self.assertEqual(self.receiver.inventory_events, 0)
+
+        self.process_events_for(0.3)
+        self.assertEqual(self.receiver.inventory_events, 1)
+        merged = self.receiver.last_data['inventory']
+        self.assertEqual(merged["action"], "batch")
+        self.assertEqual(merged["count"], 500)
+        self.assertEqual(merged["changes"][-1]["product"]["id"], 499)
+        self.assertEqual(self.event_system.get_signal_counts()["inventory"], 500)
+
+        # Other signals are unaffected
+        self.event_system.notify_sales_update({"action": "test"})
+        self.assertEqual(self.receiver.sales_events, 1)
+
+    def test_coalescing_from_worker_thread(self):
+        """Test that notifications from another thread are coalesced and delivered"""
+        self.event_system.set_coalescing_window("customer", 50)
+        worker = threading.Thread(
+            target=lambda: [self.event_system.notify_customer_update({"id": i}) for i in range(20)]
+        )
+        worker.start()
+        worker.join()
+        self.process_events_for(0.3)
+        self.assertEqual(self.receiver.customer_events, 1)
+        self.assertEqual(self.receiver.last_data['customer']["count"], 20)
+
+    def test_batch_defers_until_scope_exits(self):
+        """Test that nested batch scopes deliver once, when the outermost one exits"""
+        with self.event_system.batch():
+            self.event_system.notify_inventory_update({"action": "add"})
+            with self.event_system.batch():
+                self.event_system.notify_inventory_update({"action": "update"})
+                self.event_system.notify_sales_update()
+            self.assertEqual(self.receiver.inventory_events, 0)
+
+        self.assertEqual(self.receiver.inventory_events, 1)
+        self.assertEqual(self.receiver.sales_events, 1)
+        self.assertEqual(
+            [change["action"] for change in self.receiver.last_data['inventory']["changes"]],
+            ["add", "update"]
+        )
+        self.assertEqual(self.receiver.last_data['sales'], {})
+
+    def test_single_change_delivered_unchanged(self):
+        """Test that a lone notification in a batch keeps its original payload"""
+        test_data = {"action": "delete", "product": {"id": 3}}
+        with self.event_system.batch():
+            self.event_system.notify_inventory_update(test_data)
+        self.assertEqual(self.receiver.last_data.get('inventory'), test_data)
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
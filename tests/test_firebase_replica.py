@@ -0,0 +1,121 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.local_rtdb import LocalDatabase
+from app.utils.firebase_replica import FirebaseReplica
+
+
+class TestFirebaseReplica(unittest.TestCase):
+    """Test cases for the inventory replica backed by the local RTDB stand-in"""
+
+    def setUp(self):
+        self.database = LocalDatabase({
+            "inventory": {
+                "item_1": {"name": "Pen", "quantity": 5, "buying_price": 2.0},
+                "item_2": {"name": "Book", "quantity": 20, "buying_price": 10.0},
+            }
+        })
+        self.ref = self.database.reference('/').child('inventory')
+        self.replica = FirebaseReplica(self.ref)
+
+    def tearDown(self):
+        self.replica.close()
+        FirebaseReplica.reset_registry()
+
+    def test_initial_load_is_single_download(self):
+        """Test that repeated reads are served from memory"""
+        self.assertEqual(len(self.replica), 2)
+        requests_after_load = self.database.request_count
+        for _ in range(10):
+            self.replica.values()
+            self.replica.get("item_1")
+        self.assertEqual(self.database.request_count, requests_after_load)
+        self.assertTrue(self.replica.is_live)
+
+    def test_child_added_changed_removed(self):
+        """Test that remote changes stream into the replica"""
+        self.replica.start()
+        self.ref.child("item_3").set({"name": "Cup", "quantity": 1})
+        self.assertEqual(self.replica.get("item_3")["name"], "Cup")
+
+        self.ref.child("item_1").update({"quantity": 7})
+        self.assertEqual(self.replica.get("item_1")["quantity"], 7)
+        self.assertEqual(self.replica.get("item_1")["name"], "Pen")
+
+        self.ref.child("item_2").delete()
+        self.assertIsNone(self.replica.get("item_2"))
+        self.assertEqual(sorted(self.replica.keys()), ["item_1", "item_3"])
+
+    def test_multi_location_update_from_root(self):
+        """Test that patches issued above the replicated node are applied"""
+        self.replica.start()
+        self.database.reference('/').update({"inventory/item_1/category": "Office"})
+        self.assertEqual(self.replica.get("item_1")["category"], "Office")
+
+    def test_listener_receives_old_and_new(self):
+        """Test change callbacks used to maintain derived aggregates"""
+        changes = []
+        self.replica.add_listener(lambda key, old, new: changes.append((key, old, new)))
+        self.replica.start()
+        changes.clear()
+        self.ref.child("item_1").update({"quantity": 6})
+        self.assertEqual(len(changes), 1)
+        key, old, new = changes[0]
+        self.assertEqual(key, "item_1")
+        self.assertEqual(old["quantity"], 5)
+        self.assertEqual(new["quantity"], 6)
+
+    def test_get_returns_copy(self):
+        """Test that callers cannot mutate the replica through get()"""
+        record = self.replica.get("item_1")
+        record["quantity"] = 999
+        self.assertEqual(self.replica.get("item_1")["quantity"], 5)
+
+    def test_shared_replica_per_reference(self):
+        """Test that managers on the same node share one replica"""
+        first = FirebaseReplica.for_reference(self.ref)
+        second = FirebaseReplica.for_reference(self.database.reference('/inventory'))
+        self.assertIs(first, second)
+
+    def test_falls_back_to_reload_without_change_stream(self):
+        """Test that without listen() the last download is served until the next retry"""
+        database = self.database
+
+        class NoStreamReference:
+            path = '/inventory'
+            streaming = False
+            def __init__(self, ref):
+                self._inner = ref
+            def get(self):
+                return self._inner.get()
+            def listen(self, callback):
+                if not NoStreamReference.streaming:
+                    raise RuntimeError("streaming unavailable")
+                return self._inner.listen(callback)
+
+        replica = FirebaseReplica(NoStreamReference(self.ref), retry_interval=60)
+        self.assertEqual(len(replica), 2)
+        self.assertFalse(replica.is_live)
+        requests_after_load = database.request_count
+        self.ref.child("item_3").set({"name": "Cup"})
+        for _ in range(5):
+            self.assertEqual(len(replica), 2)
+        self.assertEqual(database.request_count, requests_after_load + 1)
+
+        # Once the retry is due the node is read again, and the listener attaches when it can
+        replica.retry_interval = 0
+        self.assertEqual(len(replica), 3)
+        self.assertFalse(replica.is_live)
+        NoStreamReference.streaming = True
+        self.assertEqual(len(replica), 3)
+        self.assertTrue(replica.is_live)
+        self.ref.child("item_4").set({"name": "Mug"})
+        self.assertEqual(len(replica), 4)
+        replica.close()
+
+if __name__ == '__main__':
+    unittest.main()
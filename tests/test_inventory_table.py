@@ -0,0 +1,113 @@
+import unittest
+import sys
+import os
+import types
+import tempfile
+import shutil
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PyQt5.QtCore import QCoreApplication
+from firebase_admin.exceptions import PermissionDeniedError
+from app.utils.local_rtdb import LocalDatabase
+from app.utils.firebase_replica import FirebaseReplica
+from app.utils.offline_journal import OfflineJournal
+
+
+class RulesReference:
+    """Reference that refuses writes to locked products, like a security rule"""
+
+    def __init__(self, ref, locked):
+        self.ref = ref
+        self.locked = locked
+
+    def child(self, path):
+        return RulesReference(self.ref.child(path), self.locked)
+
+    def update(self, value):
+        for path in value:
+            segments = [s for s in f"{self.ref.path}/{path}".split('/') if s]
+            if segments[:1] == ["inventory"] and segments[1] in self.locked:
+                raise PermissionDeniedError("Permission denied")
+        self.ref.update(value)
+
+    def __getattr__(self, name):
+        return getattr(self.ref, name)
+
+
+class TestInventoryTableWrites(unittest.TestCase):
+    """Test that cell edits are saved through InventoryManager.batch() and rolled back when rejected"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+        # InventoryManager reaches Firebase through get_db(); serve it from the local stand-in
+        firebase_utils = types.ModuleType('app.ui.firebase_utils')
+        firebase_utils.get_db = lambda: cls.root
+        saved = sys.modules.get('app.ui.firebase_utils')
+        sys.modules['app.ui.firebase_utils'] = firebase_utils
+        try:
+            from app.models.inventory import FirebaseInventoryTableModel
+        finally:
+            if saved is None:
+                del sys.modules['app.ui.firebase_utils']
+            else:
+                sys.modules['app.ui.firebase_utils'] = saved
+        cls.model_class = FirebaseInventoryTableModel
+
+    @classmethod
+    def tearDownClass(cls):
+        # Both modules hold the stand-in get_db
+        for name in ('app.models.inventory', 'app.core.inventory'):
+            sys.modules.pop(name, None)
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.database = LocalDatabase({"inventory": {
+            "p1": {"name": "Pen", "category": "Office", "quantity": 5, "buying_price": 1.0, "selling_price": 2.0},
+            "p2": {"name": "Cup", "category": "Kitchen", "quantity": 3, "buying_price": 4.0, "selling_price": 6.0},
+        }})
+        type(self).root = RulesReference(self.database.reference('/'), {"p2"})
+        OfflineJournal.for_database(self.root, path=os.path.join(self.temp_dir, "journal.db"))
+        self.errors = []
+        self.model = self.model_class()
+        self.model.writes.delay = 0.01
+        self.model.writes.backoff = 0.01
+        self.model.error_occurred.connect(self.errors.append)
+
+    def tearDown(self):
+        self.model.writes.close(timeout=5)
+        FirebaseReplica.reset_registry()
+        OfflineJournal.reset_shared()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def cell(self, product_id, column):
+        return self.model.index(self.model.item_ids.index(product_id), column)
+
+    def wait_for(self, condition, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            QCoreApplication.processEvents()
+            time.sleep(0.01)
+        return condition()
+
+    def test_rejected_edit_is_rolled_back(self):
+        """Test that an edit the rules refuse is undone in the grid with an error"""
+        self.assertTrue(self.model.setData(self.cell("p2", 5), 9.5))
+        self.assertTrue(self.model.setData(self.cell("p1", 5), 1.5))
+        self.assertEqual(self.model.data(self.cell("p2", 5)), 9.5)
+
+        self.assertTrue(self.wait_for(lambda: self.errors))
+        self.assertIn("Cup", self.errors[0])
+        self.assertEqual(self.model.data(self.cell("p2", 5)), 4.0)
+        self.assertEqual(self.database.reference("inventory/p2/buying_price").get(), 4.0)
+        # The other row's edit is saved under the Firebase field name
+        self.assertEqual(self.model.data(self.cell("p1", 5)), 1.5)
+        self.assertEqual(self.database.reference("inventory/p1/buying_price").get(), 1.5)
+        self.assertEqual(self.model.manager.journal.pending_count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pydantic import BaseModel, ValidationError
+from app.models.base import Product, Sale
+from app.utils.normalizer import RecordNormalizer, normalizer_for, model_fields
+from app.utils.records import record_amount
+
+
+class Item(BaseModel):
+    name: str
+    cost: float = 0
+    stock: int = 0
+
+
+class TestRecordNormalizer(unittest.TestCase):
+    """Test converting raw Firebase records into models"""
+
+    def test_inventory_record_to_product(self):
+        """Test that legacy field names are renamed and unknown fields dropped"""
+        normalize = normalizer_for(Product, 'firebase_inventory')
+        product = normalize({"name": "Pen", "buying_price": 2.5, "selling_price": 4.0, "quantity": None,
+                             "details": "Blue", "reorder_level": 3, "product": "pen"})
+        self.assertEqual((product.name, product.cost, product.price, product.stock, product.description),
+                         ("Pen", 2.5, 4.0, 0, "Blue"))
+        self.assertFalse(hasattr(product, "reorder_level"))
+
+    def test_clean_record(self):
+        """Test that a record already in model fields is taken as is"""
+        normalize = normalizer_for(Product, 'firebase_inventory')
+        record = {"name": "Pen", "cost": 1.0, "stock": 4}
+        self.assertTrue(normalize.is_clean(record))
+        self.assertFalse(normalize.is_clean({"name": "Pen", "cost": None}))
+        self.assertFalse(normalize.is_clean({"name": "Pen", "quantity": 4}))
+        product = normalize(record)
+        self.assertEqual((product.name, product.cost, product.stock), ("Pen", 1.0, 4))
+        record["name"] = "Pencil"
+        self.assertEqual(product.name, "Pen")
+
+    def test_product_fields_copy(self):
+        """Test that a product's fields copy to a plain dict without ORM state"""
+        normalize = normalizer_for(Product, 'firebase_inventory')
+        product = normalize({"name": "Pen", "selling_price": 4.0, "id": "prod_1"})
+        row = normalize.fields(vars(product))
+        self.assertEqual(row, {"name": "Pen", "price": 4.0, "id": "prod_1"})
+        row["price"] = 5.0
+        self.assertEqual(product.price, 4.0)
+
+    def test_normalize_many_sales(self):
+        """Test that a large sales node is normalized quickly"""
+        normalize = normalizer_for(Sale, 'firebase_sales')
+        records = [{"id": i, "amount": i * 1.5, "payment_method": "cash", "items": {}} for i in range(50000)]
+        started = time.perf_counter()
+        sales = normalize.normalize_many(records)
+        self.assertLess(time.perf_counter() - started, 2.0)
+        self.assertEqual(len(sales), 50000)
+        self.assertEqual((sales[10].id, sales[10].total_amount, sales[10].payment_method), (10, 15.0, "cash"))
+
+    def test_sale_total_matches_ledger(self):
+        """Test that a sale's total is read from the same field the sales ledger sums"""
+        normalize = normalizer_for(Sale, 'firebase_sales')
+        for record in ({"total_amount": 12.0, "amount": 10.0}, {"total_amount": None, "amount": 10.0},
+                       {"amount": 10.0, "total_price": 8.0}, {"total_price": 8.0}):
+            self.assertEqual(normalize(record).total_amount, record_amount(record), record)
+
+    def test_pydantic_model(self):
+        """Test that Pydantic records are validated unless already clean"""
+        self.assertEqual(model_fields(Item), {"name", "cost", "stock"})
+        normalize = RecordNormalizer(Item, renames=(("quantity", "stock"),), defaults={"cost": 0})
+        item = normalize({"name": "Pen", "quantity": "4", "cost": None, "colour": "blue"})
+        self.assertEqual((item.name, item.cost, item.stock), ("Pen", 0, 4))
+        self.assertEqual(normalize({"name": "Pen", "stock": 2}).stock, 2)
+        with self.assertRaises(ValidationError):
+            normalize({"name": "Pen", "quantity": "many"})
+
+    def test_normalizers_are_shared(self):
+        """Test that each source and model pair is compiled once"""
+        self.assertIs(normalizer_for(Sale, 'firebase_sales'), normalizer_for(Sale, 'firebase_sales'))
+        self.assertIsNot(normalizer_for(Sale, 'firebase_sales'), normalizer_for(Product, 'firebase_inventory'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,238 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import threading
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from firebase_admin.exceptions import PermissionDeniedError
+from app.utils.local_rtdb import LocalDatabase
+from app.utils.offline_journal import OfflineJournal, APPLIED_NODE, new_record_key, seen_fields
+from app.utils.sequences import SequenceAllocator, FirebaseSequenceStore
+from app.utils.write_batcher import WriteBatcher
+
+
+class Network:
+    def __init__(self):
+        self.up = True
+        self.fail_after = None
+        # Paths the security rules refuse writes to
+        self.denied = set()
+
+    def check(self, written=()):
+        if self.fail_after is not None:
+            if self.fail_after == 0:
+                self.up = False
+            self.fail_after -= 1
+        if not self.up:
+            raise ConnectionError("Network is unreachable")
+        if any(path.startswith(denied) for path in written for denied in self.denied):
+            raise PermissionDeniedError("Permission denied")
+
+
+class FlakyReference:
+    """Reference whose requests fail while the network is down"""
+
+    def __init__(self, ref, network):
+        self.ref = ref
+        self.network = network
+
+    def child(self, path):
+        return FlakyReference(self.ref.child(path), self.network)
+
+    def __getattr__(self, name):
+        attr = getattr(self.ref, name)
+        if name in ('get', 'set', 'update', 'delete', 'transaction'):
+            def request(*args, **kwargs):
+                written = [] if name == 'get' else [self.ref.path]
+                if name == 'update':
+                    written = [f"{self.ref.path.rstrip('/')}/{key}" for key in args[0]]
+                self.network.check(written)
+                return attr(*args, **kwargs)
+            return request
+        return attr
+
+
+class TestOfflineJournal(unittest.TestCase):
+    """Test journalling writes offline and replaying them on reconnect"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "journal.db")
+        self.database = LocalDatabase({"inventory": {"p1": {"name": "Pen", "quantity": 5}}})
+        self.network = Network()
+        self.root = FlakyReference(self.database.reference('/'), self.network)
+        self.conflicts = []
+        self.journal = self.open_journal()
+
+    def tearDown(self):
+        self.journal.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def open_journal(self):
+        return OfflineJournal(self.root, path=self.path, retry_interval=float('inf'),
+                              on_conflict=lambda entry, server: self.conflicts.append((entry['path'], server)))
+
+    def server(self, path):
+        return self.database.reference(path).get()
+
+    def test_online_writes_go_straight_through(self):
+        """Test that nothing is journalled while Firebase is reachable"""
+        self.assertIsNone(self.journal.submit('set', '/sales/s1', {"total": 10}))
+        self.assertEqual(self.server("sales/s1"), {"total": 10})
+        self.assertEqual(self.journal.pending_count(), 0)
+
+    def test_offline_sales_survive_restart_and_replay_in_order(self):
+        """Test that offline writes are kept on disk and applied in order on reconnect"""
+        self.network.up = False
+        started = time.perf_counter()
+        for i in range(50):
+            self.journal.submit('set', f"sales/s{i}", {"total": i})
+        self.journal.submit('update', "sales/s3", {"total": 300}, base={"total": 3})
+        self.journal.submit('delete', "sales/s4", base={"total": 4})
+        # Offline writes never wait on the network after the first failure
+        self.assertLess(time.perf_counter() - started, 2.0)
+        self.assertFalse(self.journal.online)
+
+        self.journal.close()
+        self.journal = self.open_journal()
+        self.assertEqual((self.journal.pending_count(), self.journal.online), (52, False))
+
+        self.network.up = True
+        result = self.journal.replay()
+        self.assertEqual((len(result.applied), result.complete, self.journal.online), (52, True, True))
+        sales = self.server("sales")
+        self.assertEqual(len(sales), 49)
+        self.assertEqual(sales["s3"], {"total": 300})
+        self.assertNotIn("s4", sales)
+        self.assertEqual(len(self.server(APPLIED_NODE)), 52)
+
+    def test_replay_is_idempotent(self):
+        """Test that an operation already applied is not applied twice"""
+        self.network.up = False
+        op_id = self.journal.submit('set', "sales/s1", {"total": 10})
+        self.network.up = True
+        self.journal.replay()
+        self.database.reference("sales/s1").update({"total": 99})
+        # As if the till crashed after the server write but before marking the entry
+        self.journal._conn.execute("UPDATE firebase_journal SET status = 'pending' WHERE op_id = ?", (op_id,))
+        self.assertEqual(len(self.journal.replay().applied), 1)
+        self.assertEqual(self.server("sales/s1"), {"total": 99})
+
+    def test_conflicts_are_reported_not_applied(self):
+        """Test that an offline edit to a record changed elsewhere is set aside"""
+        record = self.server("inventory/p1")
+        self.network.up = False
+        self.journal.submit('update', "inventory/p1", {"quantity": 4}, base=seen_fields(record, ["quantity"]))
+        self.journal.submit('set', "sales/s1", {"total": 10})
+        # Another till sells the last pens while this one is offline
+        self.database.reference("inventory/p1").update({"quantity": 0})
+        self.network.up = True
+        result = self.journal.replay()
+        self.assertEqual((len(result.conflicts), len(result.applied)), (1, 1))
+        self.assertEqual(self.conflicts, [("inventory/p1", {"name": "Pen", "quantity": 0})])
+        self.assertEqual(self.server("inventory/p1")["quantity"], 0)
+        self.assertEqual(self.server("sales/s1"), {"total": 10})
+
+        conflict = self.journal.conflicts()[0]
+        self.assertEqual(conflict["server_value"]["quantity"], 0)
+        self.journal.resolve(conflict["op_id"], apply=True)
+        self.journal.replay()
+        self.assertEqual(self.server("inventory/p1")["quantity"], 4)
+        self.assertEqual(self.journal.conflicts(), [])
+
+    def test_connection_lost_during_replay(self):
+        """Test that replay stops at the first unreachable write and resumes from it"""
+        self.network.up = False
+        for i in range(5):
+            self.journal.submit('set', f"sales/s{i}", {"total": i})
+        self.network.up = True
+        # Each replayed op makes two reads and one write
+        self.network.fail_after = 3 * 2
+        result = self.journal.replay()
+        self.assertEqual((len(result.applied), result.remaining), (2, 3))
+        self.network.fail_after, self.network.up = None, True
+        self.assertEqual(len(self.journal.replay().applied), 3)
+        self.assertEqual(sorted(self.server("sales")), [f"s{i}" for i in range(5)])
+
+    def test_rejected_writes_are_raised(self):
+        """Test that a write the rules refuse is raised, not journalled as if offline"""
+        self.network.denied.add("/locked")
+        with self.assertRaises(PermissionDeniedError):
+            self.journal.submit('set', "locked/s1", {"total": 10})
+        self.assertEqual((self.journal.pending_count(), self.journal.online), (0, True))
+        self.assertIsNone(self.journal.submit('set', "sales/s1", {"total": 10}))
+
+    def test_rejected_op_does_not_hold_up_replay(self):
+        """Test that an offline write rejected on replay is set aside and later ones applied"""
+        self.network.up = False
+        self.journal.submit('set', "sales/s1", {"total": 1})
+        self.journal.submit('set', "locked/s2", {"total": 2})
+        self.journal.submit('set', "sales/s3", {"total": 3})
+        self.network.up = True
+        self.network.denied.add("/locked")
+        result = self.journal.replay()
+        self.assertEqual((len(result.applied), len(result.failed), result.complete), (2, 1, True))
+        self.assertEqual(self.journal.entries('failed')[0]["path"], "locked/s2")
+        self.assertEqual(sorted(self.server("sales")), ["s1", "s3"])
+        self.assertTrue(self.journal.online)
+
+    def test_online_writes_run_concurrently(self):
+        """Test that a slow write does not hold up writes from other threads"""
+        started, release = threading.Event(), threading.Event()
+        write = self.journal._write
+
+        def slow_write(op, path, value):
+            if path == "sales/slow":
+                started.set()
+                release.wait(5)
+            write(op, path, value)
+
+        self.journal._write = slow_write
+        slow = threading.Thread(target=self.journal.submit, args=('set', "sales/slow", {"total": 1}))
+        slow.start()
+        try:
+            self.assertTrue(started.wait(5))
+            self.journal.submit('set', "sales/fast", {"total": 2})
+            self.assertEqual(self.server("sales"), {"fast": {"total": 2}})
+        finally:
+            release.set()
+            slow.join(5)
+        self.assertEqual(len(self.server("sales")), 2)
+
+    def test_batched_writes_are_journalled(self):
+        """Test that a write batcher flushing through the journal keeps its writes while offline"""
+        written = []
+        self.network.up = False
+        with WriteBatcher(self.journal.reference("inventory"),
+                          on_written=lambda path, value: written.append(path)) as batch:
+            batch.update("p1", {"quantity": 4})
+            batch.set("p2", {"name": "Cup", "quantity": 1})
+        self.assertEqual(sorted(written), ["p1/quantity", "p2"])
+        self.assertEqual(self.journal.pending_count(), 1)
+
+        self.network.up = True
+        requests = self.database.request_count
+        self.assertEqual(len(self.journal.replay().applied), 1)
+        # Marker check and one multi-location update; the inventory node is not downloaded
+        self.assertEqual(self.database.request_count - requests, 2)
+        self.assertEqual(self.server("inventory"), {"p1": {"name": "Pen", "quantity": 4},
+                                                    "p2": {"name": "Cup", "quantity": 1}})
+
+    def test_offline_record_keys(self):
+        """Test that creates use the shared counter online and a local key offline"""
+        allocator = SequenceAllocator(FirebaseSequenceStore(self.root.child("counters")))
+        self.assertEqual(new_record_key(self.journal, allocator, "sales", "sale"), "sale_00000001")
+        self.network.up = False
+        self.journal.submit('set', "sales/x", {})
+        offline = {new_record_key(self.journal, allocator, "sales", "sale") for _ in range(100)}
+        self.assertEqual(len(offline), 100)
+        self.assertTrue(all(key.startswith("sale_") for key in offline))
+
+
+if __name__ == '__main__':
+    unittest.main()
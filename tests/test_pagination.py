@@ -0,0 +1,94 @@
+import unittest
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models.sales import SalesModel
+from app.models.customers import CustomersModel
+
+
+class TestKeysetPagination(unittest.TestCase):
+    """Test seek pagination of sales and customers"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.conn = sqlite3.connect(os.path.join(self.temp_dir, "shop.db"))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('''
+            CREATE TABLE customers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, full_name TEXT,
+                contact TEXT, address TEXT, history TEXT, created_at TEXT
+            )
+        ''')
+        self.sales = SalesModel(self.conn)
+        self.customers = CustomersModel(self.conn)
+        # Several sales per day so pages split days
+        for i in range(250):
+            self.sales.add_sale(f"INV-{i}", f"2024-{i % 12 + 1:02d}-{i % 5 + 1:02d}", None, 10.0)
+        for i in range(40):
+            self.customers.add_customer(f"Customer {i}", f"555-{i}", "", "",
+                                        None if i % 10 == 0 else f"2024-05-{i % 4 + 1:02d}")
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def walk(self, fetch_page, page_size):
+        """Follow next_cursor to the end and return every row id seen"""
+        ids, after = [], None
+        while True:
+            page = fetch_page(after, page_size)
+            ids.extend(row["id"] for row in page["rows"])
+            after = page["next_cursor"]
+            if after is None:
+                return ids
+
+    def test_sales_pages_match_full_listing(self):
+        """Test that following cursors yields every sale once, in listing order"""
+        expected = [row["id"] for row in self.sales.get_sales(limit=1000)]
+        ids = self.walk(lambda after, size: self.sales.get_sales_page(after=after, page_size=size), 17)
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(set(ids)), 250)
+
+    def test_sales_pages_with_filters(self):
+        """Test that search and date filters apply to every page"""
+        expected = [row["id"] for row in self.sales.get_sales(
+            search="INV-1", start_date="2024-03-01", end_date="2024-09-30", limit=1000)]
+        ids = self.walk(lambda after, size: self.sales.get_sales_page(
+            search="INV-1", start_date="2024-03-01", end_date="2024-09-30", after=after, page_size=size), 4)
+        self.assertEqual(ids, expected)
+
+    def test_deep_sales_page_seeks_index(self):
+        """Test that a deep page seeks on the date index without OFFSET or sorting"""
+        first = self.sales.get_sales_page(page_size=200)
+        statements = []
+        self.conn.set_trace_callback(statements.append)
+        try:
+            self.sales.get_sales_page(after=first["next_cursor"], page_size=20)
+        finally:
+            self.conn.set_trace_callback(None)
+        self.assertNotIn("OFFSET", statements[0])
+        plan = " | ".join(row[3] for row in self.conn.execute(f"EXPLAIN QUERY PLAN {statements[0]}"))
+        self.assertIn("USING INDEX idx_sales_date (date<?)", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_customer_pages_include_undated(self):
+        """Test that customers without created_at follow the dated ones"""
+        ids = self.walk(lambda after, size: self.customers.get_customers_page(after=after, page_size=size), 7)
+        self.assertEqual(ids, [row["id"] for row in self.customers.get_customers()])
+        self.assertEqual(ids[-4:], [31, 21, 11, 1])
+
+        page = self.customers.get_customers_page(search="Customer 3", page_size=5)
+        self.assertEqual(len(page["rows"]), 5)
+        rest = self.customers.get_customers_page(search="Customer 3", after=page["next_cursor"], page_size=10)
+        self.assertEqual(len(rest["rows"]), 6)
+        self.assertIsNone(rest["next_cursor"])
+
+
+if __name__ == '__main__':
+    unittest.main()
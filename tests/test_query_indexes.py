@@ -0,0 +1,163 @@
+import unittest
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+from datetime import datetime
+from unittest import mock
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models.sales import SalesModel
+from app.models.customers import CustomersModel
+from app.models.purchases import PurchasesModel
+from app.utils.migrations import MigrationManager
+from app.utils import database
+
+
+class TestQueryIndexes(unittest.TestCase):
+    """Test that sales, customer and purchase lookups are served by indexes"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.conn = sqlite3.connect(os.path.join(self.temp_dir, "shop.db"))
+        self.conn.row_factory = sqlite3.Row
+        # Sales queries join customers on full_name, the customers model writes name
+        self.conn.execute('''
+            CREATE TABLE customers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, full_name TEXT,
+                contact TEXT, address TEXT, history TEXT, created_at TEXT
+            )
+        ''')
+        self.conn.execute('CREATE TABLE products (id INTEGER PRIMARY KEY, name TEXT, stock_quantity INTEGER)')
+        self.sales = SalesModel(self.conn)
+        self.customers = CustomersModel(self.conn)
+        self.purchases = PurchasesModel(self.conn)
+
+        self.conn.execute("INSERT INTO products VALUES (1, 'Pen', 100)")
+        self.customers.add_customer("Ann", "555", "Main St", "", "2024-05-01")
+        for day in range(1, 29):
+            self.sales.add_sale(f"INV-{day}", f"2024-05-{day:02d}", 1, 10.0 * day,
+                                due_amount=5 if day % 7 == 0 else 0,
+                                items=[{"product_id": 1, "quantity": 1, "unit_price": 10, "subtotal": 10}])
+            self.purchases.add_purchase(1, "Pen", 1, 10.0, 10.0, f"2024-05-{day:02d}")
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def query_plans(self, call):
+        """Run call() and return the EXPLAIN QUERY PLAN text of every SELECT it issued on a table"""
+        statements = []
+        self.conn.set_trace_callback(statements.append)
+        try:
+            result = call()
+        finally:
+            self.conn.set_trace_callback(None)
+        plans = []
+        for sql in statements:
+            # Schema lookups (e.g. whether the rollup exists) are not data queries
+            if sql.lstrip().upper().startswith("SELECT") and "sqlite_master" not in sql:
+                rows = self.conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+                plans.append(" | ".join(row[3] for row in rows))
+        return result, plans
+
+    def test_sales_date_range_uses_index(self):
+        """Test that date filters are sargable and include the whole end day"""
+        sales, plans = self.query_plans(
+            lambda: self.sales.get_sales(start_date="2024-05-10", end_date="2024-05-12"))
+        self.assertEqual([sale["invoice_number"] for sale in sales], ["INV-12", "INV-11", "INV-10"])
+        self.assertIn("USING INDEX idx_sales_date", plans[0])
+        self.assertNotIn("SCAN s", plans[0])
+
+    def test_pending_invoices_use_partial_index(self):
+        """Test that pending invoices read only the partial due-amount index"""
+        pending, plans = self.query_plans(self.sales.get_pending_invoices)
+        self.assertEqual(len(pending), 4)
+        self.assertIn("idx_sales_due", plans[0])
+
+    def test_sale_items_by_sale_use_index(self):
+        """Test that loading a sale's items does not scan sale_items"""
+        sale, plans = self.query_plans(lambda: self.sales.get_sale_by_id(3))
+        self.assertEqual(len(sale["items"]), 1)
+        self.assertIn("idx_sale_items_sale_id", plans[1])
+
+    def test_todays_stats_use_rollup(self):
+        """Test that the daily sales stats seek the rollup instead of scanning sales"""
+        stats, plans = self.query_plans(self.sales.get_sales_stats)
+        self.assertIn("SEARCH sales_daily_rollup USING PRIMARY KEY (day>? AND day<?)", plans[0])
+        self.assertEqual(stats["pending_invoices"], 4)
+
+    def test_customer_and_purchase_lookups_use_indexes(self):
+        """Test customer-by-name and purchases-by-customer lookups"""
+        customer, plans = self.query_plans(lambda: self.customers.get_customer_by_name("Ann"))
+        self.assertEqual(customer["contact"], "555")
+        self.assertIn("USING INDEX idx_customers_name", plans[0])
+
+        purchases, plans = self.query_plans(lambda: self.purchases.get_purchases_by_customer(1))
+        self.assertEqual(len(purchases), 28)
+        self.assertIn("idx_purchases_customer_date", plans[0])
+        # Rows come back in index order, so no separate sort is needed
+        self.assertNotIn("TEMP B-TREE", plans[0])
+
+
+class TestIndexMigration(unittest.TestCase):
+    """Test the index migration on a database created before the indexes existed"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "shop.db")
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executescript('''
+                CREATE TABLE sales (id INTEGER PRIMARY KEY, date TEXT, customer_id INTEGER, due_amount REAL);
+                CREATE TABLE sale_items (id INTEGER PRIMARY KEY, sale_id INTEGER);
+                CREATE TABLE customers (id INTEGER PRIMARY KEY, full_name TEXT);
+            ''')
+        conn.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def indexes(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return {row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'")}
+        finally:
+            conn.close()
+
+    def test_apply_and_rollback(self):
+        """Test that the migration adds the indexes its tables support and removes them again"""
+        manager = MigrationManager(self.db_path)
+        manager.apply_migrations()
+        self.assertIn(1, manager.get_applied_migrations())
+        # customers here uses full_name instead of name and purchases does not exist yet
+        self.assertEqual(self.indexes(), {
+            "idx_sales_date", "idx_sales_customer_id", "idx_sales_due", "idx_sale_items_sale_id",
+            "idx_customers_full_name"
+        })
+
+        manager.rollback_migrations(0)
+        self.assertEqual(self.indexes(), set())
+        self.assertNotIn(1, manager.get_applied_migrations())
+
+    def test_skipped_indexes_are_logged(self):
+        """Test that an index the schema cannot support is reported rather than dropped silently"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with mock.patch.object(database.logger, "warning") as warning:
+                created = database.ensure_indexes(conn, [
+                    ("idx_customers_name", "customers", ("name",), None),
+                    ("idx_customers_full_name", "customers", ("full_name",), None),
+                ])
+        finally:
+            conn.close()
+        self.assertEqual(created, ["idx_customers_full_name"])
+        warning.assert_called_once()
+        self.assertIn("idx_customers_name", warning.call_args[0][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
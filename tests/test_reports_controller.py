@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+from unittest import mock
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.database import DatabaseManager
+from app.utils.cache_manager import global_cache
+from app.data.data_provider import SQLDataProvider
+from app.controllers.reports_controller import ReportsController
+
+
+class TestInventoryReports(unittest.TestCase):
+    """Test inventory report queries against the products table the SQL write path uses"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = DatabaseManager()
+        self.db.initialize(os.path.join(self.temp_dir, "shop.db"))
+        self.conn = DatabaseManager.get_sqlite_connection()
+        self.conn.execute('''
+            CREATE TABLE products (
+                id INTEGER PRIMARY KEY, name TEXT, stock_quantity INTEGER, price REAL, category TEXT,
+                details TEXT, buying_price REAL, selling_price REAL
+            )
+        ''')
+        self.conn.commit()
+        provider = SQLDataProvider(self.db)
+        for name, stock, category, cost in [("Pen", 2, "Office", 1.0), ("Desk", 0, "Office", 80.0),
+                                            ("Apple", 40, "Food", 0.5)]:
+            provider.add_product({"name": name, "quantity": stock, "category": category,
+                                  "buying_price": cost, "selling_price": cost * 2})
+        global_cache.clear()
+
+    def tearDown(self):
+        global_cache.clear()
+        self.db.initialize(None)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_inventory_value(self):
+        """Test totals from products.stock_quantity and buying_price"""
+        self.assertEqual(ReportsController().get_inventory_value(),
+                         {"total_value": 22.0, "total_items": 3, "low_stock_items": 2})
+
+    def test_inventory_by_category(self):
+        """Test per-category stock buckets"""
+        categories = {c["name"]: c for c in ReportsController().get_inventory_by_category()}
+        self.assertEqual(categories["Office"],
+                         {"name": "Office", "value": "$2.00", "low": 1, "out": 1, "in": 0, "count": 2})
+        self.assertEqual(categories["Food"]["in"], 1)
+
+    def test_inventory_report_rows(self):
+        """Test that the PDF report is built from every product"""
+        with mock.patch("app.controllers.reports_controller.PDFGenerator.generate_inventory_report",
+                        return_value="report.pdf") as generate:
+            self.assertEqual(ReportsController().generate_inventory_report(), "report.pdf")
+        items = generate.call_args[0][0]
+        self.assertEqual([item["name"] for item in items], ["Apple", "Desk", "Pen"])
+        self.assertEqual((items[2]["stock"], items[2]["buying_price"], items[2]["selling_price"]), (2, 1.0, 2.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.local_rtdb import LocalDatabase
+from app.utils.rtdb_query import where, where_at_most, database_rules
+
+
+class TestRTDBQuery(unittest.TestCase):
+    """Test server-side filtered and shallow reads against the local RTDB stand-in"""
+
+    def setUp(self):
+        inventory = {f"item_{i}": {"name": f"Item {i}", "category": ["Toys", "Books", "Food"][i % 3],
+                                   "quantity": i, "details": "x" * 200}
+                     for i in range(30)}
+        inventory["item_old"] = {"name": "Old", "category": "Toys", "stock": 1}
+        self.database = LocalDatabase({
+            "inventory": inventory,
+            "sales": {
+                "s1": {"sale_date": "2024-04-30T23:59:00", "total_amount": 5},
+                "s2": {"sale_date": "2024-05-01T00:00:00", "total_amount": 10},
+                "s3": {"sale_date": "2024-05-31 18:00", "total_amount": 20},
+                "s4": {"sale_date": "2024-06-01", "total_amount": 40},
+                "s5": {"total_amount": 80},
+            },
+            "customers": {f"c{i}": {"name": f"Customer {i}", "history": "y" * 500} for i in range(50)},
+        }, rules=database_rules())
+        self.root = self.database.reference('/')
+
+    def test_equal_to_transfers_only_matches(self):
+        """Test that a category filter returns and sends only that category"""
+        full = self.root.child("inventory").get()
+        full_bytes = self.database.bytes_sent
+        toys = where(self.root.child("inventory"), "category", equal_to="Toys")
+        self.assertEqual(set(toys), {f"item_{i}" for i in range(0, 30, 3)} | {"item_old"})
+        self.assertEqual(toys["item_3"], full["item_3"])
+        self.assertLess(self.database.bytes_sent - full_bytes, full_bytes / 2)
+
+    def test_range_and_order(self):
+        """Test numeric ranges, child ordering and limits"""
+        low = where(self.root.child("inventory"), "quantity", start_at=-1, end_at=4)
+        self.assertEqual(list(low), ["item_0", "item_1", "item_2", "item_3", "item_4"])
+        top = where(self.root.child("inventory"), "quantity", start_at=10, limit=2)
+        self.assertEqual(list(top), ["item_10", "item_11"])
+        # Records without the child sort first, so only a numeric start_at leaves them out
+        self.assertIn("item_old", where(self.root.child("inventory"), "quantity", end_at=4))
+        self.assertNotIn("item_old", low)
+        self.assertEqual(list(where(self.root.child("inventory"), "stock", start_at=0)), ["item_old"])
+
+    def test_at_most_includes_numeric_text(self):
+        """Test that stock saved as text is compared by value"""
+        inventory = self.root.child("inventory")
+        inventory.child("item_text").set({"name": "Text", "quantity": "3"})
+        inventory.child("item_big_text").set({"name": "Big", "quantity": "10"})
+        inventory.child("item_bad").set({"name": "Bad", "quantity": "n/a"})
+        low = where_at_most(inventory, "quantity", 4)
+        self.assertEqual(set(low), {f"item_{i}" for i in range(5)} | {"item_text"})
+
+    def test_date_range(self):
+        """Test whole-day ranges over ISO date strings"""
+        sales = self.root.child("sales")
+        self.assertEqual(list(where(sales, "sale_date", start_at="2024-05-01", end_at="2024-06-01")),
+                         ["s2", "s3", "s4"])
+
+    def test_unindexed_query_rejected(self):
+        """Test that the rules must declare an index for every queried child"""
+        with self.assertRaises(ValueError):
+            where(self.root.child("customers"), "name", equal_to="Customer 1")
+        with self.assertRaises(ValueError):
+            self.root.child("inventory").order_by_child("category").equal_to("Toys").start_at("A").get()
+        self.assertEqual(database_rules({"sales": ("sale_date",)}),
+                         {"rules": {"sales": {".indexOn": ["sale_date"]}}})
+
+
+if __name__ == '__main__':
+    unittest.main()
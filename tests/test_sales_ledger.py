@@ -0,0 +1,104 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.local_rtdb import LocalDatabase
+from app.utils.firebase_replica import FirebaseReplica
+from app.utils.sales_ledger import SalesLedger
+
+
+class TestSalesLedger(unittest.TestCase):
+    """Test cases for the incremental sales ledger"""
+
+    def setUp(self):
+        self.database = LocalDatabase({
+            "sales": {
+                "sale_1": {"customer_id": 1, "total_amount": 100.0, "sale_date": "2024-01-01",
+                           "payment_method": "Cash"},
+                "sale_2": {"customer_id": 2, "amount": 50.0, "date": "2024-01-02T10:00:00",
+                           "payment_method": "Card"},
+                "sale_3": {"customer_id": 1, "total_amount": 30.0, "sale_date": "2024-01-02",
+                           "payment_method": "Cash"},
+            }
+        })
+        self.ref = self.database.reference('/sales')
+        self.replica = FirebaseReplica(self.ref)
+        self.normalized = []
+
+        def normalize(record):
+            self.normalized.append(record)
+            return dict(record)
+
+        self.ledger = SalesLedger(self.replica, normalize)
+
+    def tearDown(self):
+        self.replica.close()
+        FirebaseReplica.reset_registry()
+
+    def test_summary(self):
+        """Test count, revenue and average from the running totals"""
+        summary = self.ledger.summary()
+        self.assertEqual(summary['total_sales'], 3)
+        self.assertAlmostEqual(summary['total_revenue'], 180.0)
+        self.assertAlmostEqual(summary['average_sale'], 60.0)
+
+    def test_update_adjusts_totals_incrementally(self):
+        """Test that a changed sale is swapped out without renormalizing the rest"""
+        self.ledger.summary()
+        normalized_before = len(self.normalized)
+        self.ref.child("sale_2").update({"amount": 70.0})
+        self.assertAlmostEqual(self.ledger.summary()['total_revenue'], 200.0)
+        self.assertEqual(len(self.normalized), normalized_before + 1)
+
+    def test_delete_and_add(self):
+        """Test that removed and new sales update the ledger"""
+        self.ledger.summary()
+        self.ref.child("sale_1").delete()
+        self.ref.child("sale_4").set({"customer_id": 3, "total_amount": 20.0, "sale_date": "2024-01-03"})
+        summary = self.ledger.summary()
+        self.assertEqual(summary['total_sales'], 3)
+        self.assertAlmostEqual(summary['total_revenue'], 100.0)
+        self.assertIsNone(self.ledger.get("sale_1"))
+        self.assertEqual(self.ledger.get("sale_4")["customer_id"], 3)
+
+    def test_filter_by_customer(self):
+        """Test the per-customer index"""
+        sales = self.ledger.sales(customer_id=1)
+        self.assertEqual(sorted(s['total_amount'] for s in sales), [30.0, 100.0])
+        self.assertEqual(len(self.ledger.sales()), 3)
+        self.assertEqual(self.ledger.sales(customer_id=99), [])
+
+    def test_customer_ids_match_across_types(self):
+        """Test that int and str customer ids share a bucket and empty buckets are dropped"""
+        self.assertEqual(len(self.ledger.sales(customer_id="1")), 2)
+        self.ref.child("sale_2").delete()
+        self.assertEqual(self.ledger.sales(customer_id=2), [])
+        self.assertNotIn("2", self.ledger._by_customer)
+
+    def test_daily_and_payment_totals(self):
+        """Test the per-day and per-payment-method buckets"""
+        days = self.ledger.daily_totals()
+        self.assertEqual([d['date'] for d in days], ["2024-01-01", "2024-01-02"])
+        self.assertEqual(days[1]['count'], 2)
+        self.assertAlmostEqual(days[1]['amount'], 80.0)
+        self.assertEqual(len(self.ledger.daily_totals("2024-01-02", "2024-01-31")), 1)
+
+        methods = {m['method']: m for m in self.ledger.payment_method_totals()}
+        self.assertEqual(methods['Cash']['count'], 2)
+        self.assertAlmostEqual(methods['Card']['amount'], 50.0)
+
+    def test_reads_do_not_redownload(self):
+        """Test that summaries are served without further database requests"""
+        self.ledger.summary()
+        requests_after_load = self.database.request_count
+        for _ in range(5):
+            self.ledger.summary()
+            self.ledger.sales()
+        self.assertEqual(self.database.request_count, requests_after_load)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,244 @@
+import unittest
+import sys
+import os
+import random
+import sqlite3
+import tempfile
+import shutil
+from datetime import date, datetime, timedelta
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models.sales import SalesModel
+from app.models.sales_rollup import (
+    ensure_sales_rollup, rebuild_sales_rollup, period_totals, drop_sales_rollup
+)
+from app.controllers.reports_controller import ReportsController, _month_starts, _resample_monthly
+from app.utils.cache_manager import global_cache
+from app.utils.database import DatabaseManager
+
+
+class TestSalesRollup(unittest.TestCase):
+    """Test the trigger-maintained daily sales rollup"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.conn = sqlite3.connect(os.path.join(self.temp_dir, "shop.db"))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('CREATE TABLE customers (id INTEGER PRIMARY KEY, full_name TEXT)')
+        self.sales = SalesModel(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def rollup(self):
+        return [tuple(row) for row in self.conn.execute(
+            "SELECT * FROM sales_daily_rollup ORDER BY day, payment_method")]
+
+    def add(self, day, total, method="Cash", discount=0, due=0):
+        return self.sales.add_sale(f"INV-{random.random()}", day, None, total, discount=discount,
+                                   payment_method=method, due_amount=due)
+
+    def test_triggers_track_every_write(self):
+        """Test that inserts, updates and deletes leave the rollup equal to a rebuild"""
+        rng = random.Random(7)
+        ids = []
+        for _ in range(300):
+            action = rng.random()
+            if action < 0.6 or not ids:
+                ids.append(self.add(f"2024-0{rng.randint(1, 3)}-{rng.randint(10, 28)}",
+                                    rng.randint(1, 100), rng.choice(["Cash", "Card", "bKash"]),
+                                    rng.choice([0, 0, 5]), rng.choice([0, 0, 20])))
+            elif action < 0.8:
+                self.sales.update_sale(rng.choice(ids), total_price=rng.randint(1, 100),
+                                       date=f"2024-04-{rng.randint(10, 28)}", payment_method="Card",
+                                       due_amount=rng.choice([0, 3]))
+            else:
+                self.sales.delete_sale(ids.pop(rng.randrange(len(ids))))
+        maintained = self.rollup()
+        rebuild_sales_rollup(self.conn)
+        self.assertEqual(len(maintained), len(self.rollup()))
+        for kept, rebuilt in zip(maintained, self.rollup()):
+            self.assertEqual(kept[:3], rebuilt[:3])
+            self.assertAlmostEqual(kept[3], rebuilt[3])
+            self.assertEqual(kept[5], rebuilt[5])
+            self.assertEqual(kept[7], rebuilt[7])
+
+    def test_period_totals(self):
+        """Test totals and the payment method breakdown over a day range"""
+        self.add("2024-05-01", 100, "Cash", discount=10)
+        self.add("2024-05-01 18:30:00", 50, "Card", due=20)
+        self.add("2024-05-02", 25, "Cash")
+        self.add("2024-05-09", 999, "Cash")
+        totals = period_totals(self.conn, "2024-05-01", "2024-05-02")
+        self.assertEqual(totals["count"], 3)
+        self.assertAlmostEqual(totals["revenue"], 175)
+        self.assertEqual((totals["discount_count"], totals["due_count"]), (1, 1))
+        self.assertEqual(totals["by_payment_method"]["Cash"], {"count": 2, "revenue": 125})
+
+    def test_backfill_existing_sales(self):
+        """Test that a new rollup is filled from sales written before it existed"""
+        self.add("2024-05-01", 100)
+        self.add("2024-05-01", 40)
+        drop_sales_rollup(self.conn)
+        self.add("2024-05-01", 1)
+        self.assertTrue(ensure_sales_rollup(self.conn))
+        self.assertEqual(self.rollup(), [("2024-05-01", "Cash", 3, 141.0, 0.0, 0, 0.0, 0)])
+
+    def test_stats(self):
+        """Test today's stats and pending invoices from the rollup"""
+        today = datetime.now().strftime('%Y-%m-%d')
+        yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        self.add(today, 30, discount=5)
+        self.add(today, 20, due=5)
+        self.add(yesterday, 10, due=1)
+        stats = self.sales.get_sales_stats()
+        self.assertEqual(stats["today"], {"count": 2, "total": 50})
+        self.assertEqual(stats["pending_invoices"], 2)
+        self.assertEqual(stats["discount_usage"], {"count": 1, "total": 5})
+
+
+class TestReportsFromRollup(unittest.TestCase):
+    """Test report summaries read from the rollup"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = DatabaseManager()
+        self.db.initialize(os.path.join(self.temp_dir, "shop.db"))
+        conn = DatabaseManager.get_sqlite_connection()
+        conn.execute('CREATE TABLE customers (id INTEGER PRIMARY KEY, full_name TEXT)')
+        sales = SalesModel(conn)
+        now = datetime.now()
+        for days_ago, total in [(0, 10), (3, 20), (10, 40), (45, 80)]:
+            day = (now - timedelta(days=days_ago)).strftime('%Y-%m-%d')
+            sales.add_sale(f"INV-{days_ago}", day, None, total)
+        global_cache.clear()
+
+    def tearDown(self):
+        global_cache.clear()
+        self.db.initialize(None)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_sales_summary_periods(self):
+        """Test whole-day periods that include today"""
+        reports = ReportsController()
+        self.assertEqual(reports.get_sales_summary("today")["total_sales"], 10)
+        week = reports.get_sales_summary("last_7_days")
+        self.assertEqual((week["total_sales"], week["total_orders"], week["average_order"]), (30, 2, 15))
+        self.assertEqual(reports.get_sales_summary("last_30_days")["total_orders"], 3)
+
+
+class TestLegacySalesSchema(unittest.TestCase):
+    """Test rollup figures on a sales table too old to carry the rollup"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = DatabaseManager()
+        self.db.initialize(os.path.join(self.temp_dir, "shop.db"))
+        self.conn = DatabaseManager.get_sqlite_connection()
+        # As in the shipped data/shop.db
+        self.conn.execute('''
+            CREATE TABLE sales (
+                id INTEGER PRIMARY KEY, user_id INTEGER, total_amount FLOAT, payment_method VARCHAR(50),
+                status VARCHAR(20), created_at DATETIME
+            )
+        ''')
+        self.today = datetime.now().strftime('%Y-%m-%d')
+        self.conn.executemany(
+            "INSERT INTO sales (user_id, total_amount, payment_method, created_at) VALUES (1, ?, ?, ?)",
+            [(10, "cash", f"{self.today} 09:00:00"), (30, "card", f"{self.today} 10:00:00"),
+             (99, "cash", "2001-01-01 10:00:00")])
+        self.conn.commit()
+        self.assertFalse(ensure_sales_rollup(self.conn))
+        global_cache.clear()
+
+    def tearDown(self):
+        global_cache.clear()
+        self.db.initialize(None)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_period_totals_from_sales(self):
+        """Test that totals are grouped from sales when there is no rollup table"""
+        totals = period_totals(self.conn, self.today, self.today)
+        self.assertEqual((totals["count"], totals["revenue"], totals["due_count"]), (2, 40.0, 0))
+        self.assertEqual(totals["by_payment_method"]["card"], {"count": 1, "revenue": 30.0})
+
+    def test_reports_without_rollup(self):
+        """Test that the SQL reports fall back instead of failing on the missing table"""
+        reports = ReportsController()
+        summary = reports.get_sales_summary("today")
+        self.assertNotIn("error", summary)
+        self.assertEqual((summary["total_sales"], summary["total_orders"]), (40.0, 2))
+        labels, values = reports.get_monthly_sales(1)
+        self.assertEqual(values, [40.0])
+
+
+class TestMonthlyReports(unittest.TestCase):
+    """Test calendar-month report series built with one grouped query"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = DatabaseManager()
+        self.db.initialize(os.path.join(self.temp_dir, "shop.db"))
+        self.conn = DatabaseManager.get_sqlite_connection()
+        self.conn.execute('''
+            CREATE TABLE customers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, full_name TEXT,
+                contact TEXT, address TEXT, history TEXT, created_at TEXT
+            )
+        ''')
+        sales = SalesModel(self.conn)
+        self.starts = _month_starts(24)
+        # First and last day of every month, which 30-day steps would misplace
+        for i, start in enumerate(self.starts):
+            last_day = (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+            sales.add_sale(f"INV-{i}-a", start.isoformat(), None, i + 1)
+            sales.add_sale(f"INV-{i}-b", last_day.isoformat(), None, 100)
+            self.conn.execute("INSERT INTO customers (name, created_at) VALUES (?, ?)",
+                              (f"C{i}", f"{last_day.isoformat()} 23:59:00"))
+        self.conn.commit()
+        global_cache.clear()
+
+    def tearDown(self):
+        global_cache.clear()
+        self.db.initialize(None)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def traced(self, call):
+        statements = []
+        self.conn.set_trace_callback(statements.append)
+        try:
+            return call(), statements
+        finally:
+            self.conn.set_trace_callback(None)
+
+    def test_monthly_sales_single_query(self):
+        """Test a 24-month sales chart in one round trip with calendar months"""
+        (labels, values), statements = self.traced(lambda: ReportsController().get_monthly_sales(24))
+        # Plus the schema lookup that picks the rollup over grouping sales
+        self.assertEqual(len([sql for sql in statements if "sqlite_master" not in sql]), 1)
+        self.assertIn("sales_daily_rollup", statements[-1])
+        self.assertEqual(values, [24 - i + 100.0 for i in range(24)])
+        self.assertEqual(labels[0], self.starts[-1].strftime('%b %y'))
+
+    def test_customer_growth_single_query(self):
+        """Test monthly new customer counts in one round trip"""
+        (labels, values), statements = self.traced(lambda: ReportsController().get_customer_growth(6))
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(values, [1] * 6)
+        self.assertEqual(labels, [start.strftime('%b') for start in reversed(self.starts[-6:])])
+
+    def test_resample_monthly(self):
+        """Test the pandas month buckets used on the Firebase path"""
+        starts = _month_starts(3, date(2024, 3, 15))
+        self.assertEqual(starts, [date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)])
+        values = _resample_monthly(
+            ["2024-01-31", "2024-02-29 10:00:00", None, "junk", "2023-12-31", "2024-03-01"],
+            [1, 2, 3, 4, 5, 6], starts)
+        self.assertEqual(values, [1, 2, 6])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models.sales import SalesModel
+from app.data.data_provider import SQLDataProvider
+from app.utils.error_handler import ValidationError
+
+
+class TestSaleWritePath(unittest.TestCase):
+    """Test the batched sale write path"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.conn = sqlite3.connect(os.path.join(self.temp_dir, "shop.db"))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('CREATE TABLE customers (id INTEGER PRIMARY KEY, full_name TEXT)')
+        self.conn.execute('CREATE TABLE products (id INTEGER PRIMARY KEY, name TEXT, stock_quantity INTEGER)')
+        self.conn.executemany('INSERT INTO products VALUES (?, ?, ?)',
+                              [(i, f"Item {i}", 1000) for i in range(1, 601)])
+        self.conn.commit()
+        self.sales = SalesModel(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def items(self, *lines):
+        return [{"product_id": pid, "quantity": qty, "unit_price": 2.0, "subtotal": 2.0 * qty}
+                for pid, qty in lines]
+
+    def stock(self, product_id):
+        return self.conn.execute('SELECT stock_quantity FROM products WHERE id = ?',
+                                 (product_id,)).fetchone()[0]
+
+    def statements(self, call):
+        """Run call() and return the SQL statements it issued"""
+        statements = []
+        self.conn.set_trace_callback(statements.append)
+        try:
+            result = call()
+        finally:
+            self.conn.set_trace_callback(None)
+        return result, statements
+
+    def test_wholesale_invoice(self):
+        """Test a large invoice with repeated products"""
+        lines = [(i % 600 + 1, 2) for i in range(900)]
+        sale_id, statements = self.statements(
+            lambda: self.sales.add_sale("INV-1", "2024-05-01", 1, 3600.0, items=self.items(*lines)))
+        self.assertEqual(self.conn.execute('SELECT COUNT(*) FROM sale_items WHERE sale_id = ?',
+                                           (sale_id,)).fetchone()[0], 900)
+        self.assertEqual(self.stock(1), 996)
+        self.assertEqual(self.stock(600), 998)
+        # Two chunked stock lookups, no per-item queries
+        checks = [sql for sql in statements if sql.lstrip().startswith("SELECT id, stock_quantity")]
+        self.assertEqual(len(checks), 2)
+        self.assertTrue(statements[0].startswith("BEGIN IMMEDIATE"))
+
+    def test_insufficient_stock_rolls_back(self):
+        """Test that a shortage on any product rejects the whole sale"""
+        with self.assertRaises(ValidationError) as ctx:
+            self.sales.add_sale("INV-1", "2024-05-01", 1, 10.0,
+                                items=self.items((1, 600), (2, 1), (1, 600), (999, 1)))
+        shortages = ctx.exception.details["shortages"]
+        self.assertEqual(shortages[1], {"requested": 1200, "available": 1000})
+        self.assertIsNone(shortages[999]["available"])
+        self.assertNotIn(2, shortages)
+        self.assertEqual(self.conn.execute('SELECT COUNT(*) FROM sales').fetchone()[0], 0)
+        self.assertEqual(self.stock(2), 1000)
+
+    def test_update_sale_moves_net_stock(self):
+        """Test that updating items adjusts stock by the net change, including removed products"""
+        sale_id = self.sales.add_sale("INV-1", "2024-05-01", 1, 10.0,
+                                      items=self.items((1, 5), (2, 3)))
+        self.sales.update_sale(sale_id, items=self.items((1, 2), (1, 4), (3, 7)))
+        self.assertEqual(self.stock(1), 994)
+        self.assertEqual(self.stock(2), 1000)
+        self.assertEqual(self.stock(3), 993)
+
+        with self.assertRaises(ValidationError):
+            self.sales.update_sale(sale_id, items=self.items((3, 2000)))
+        self.assertEqual(self.stock(3), 993)
+
+        self.sales.delete_sale(sale_id)
+        self.assertEqual([self.stock(pid) for pid in (1, 2, 3)], [1000, 1000, 1000])
+
+    def test_data_provider_add_sale(self):
+        """Test that the SQL data provider shares the batched path"""
+        provider = SQLDataProvider(self.conn)
+        sale_id = provider.add_sale({"invoice_number": "INV-2", "date": "2024-05-01",
+                                     "customer_id": 1, "total_price": 4.0,
+                                     "items": self.items((4, 2))})
+        self.assertEqual(self.stock(4), 998)
+        self.assertEqual(self.sales.get_sale_by_id(sale_id)["invoice_number"], "INV-2")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.search_index import (
+    ensure_search_index, drop_search_index, has_search_index, match_expression, search
+)
+from app.models.sales import SalesModel
+from app.models.customers import CustomersModel
+from app.data.data_provider import SQLDataProvider
+
+
+class TestSearchIndex(unittest.TestCase):
+    """Test the FTS5 search indexes and their sync triggers"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.conn = sqlite3.connect(os.path.join(self.temp_dir, "shop.db"))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('''
+            CREATE TABLE products (
+                id INTEGER PRIMARY KEY, name TEXT, details TEXT, category TEXT, stock_quantity INTEGER
+            )
+        ''')
+        self.conn.executemany('INSERT INTO products (name, details, category) VALUES (?, ?, ?)', [
+            ("Blue Pen", "Ballpoint, fine tip", "Stationery"),
+            ("Notebook", "Ruled pages, pen loop", "Stationery"),
+            ("Penguin Plush", "Soft toy", "Toys"),
+            ("Desk Lamp", "LED", "Electronics"),
+        ])
+        self.conn.commit()
+        self.assertEqual(ensure_search_index(self.conn, ['products']), ['products'])
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def names(self, query, **kwargs):
+        return [row["name"] for row in search('products', query, conn=self.conn, **kwargs)]
+
+    def test_match_expression(self):
+        """Test that free text becomes AND-ed prefix terms"""
+        self.assertEqual(match_expression('John  "555-12'), '"john"* "555"* "12"*')
+        self.assertEqual(match_expression(' -* '), '')
+
+    def test_prefix_search_ranks_names_first(self):
+        """Test prefix matching and that name matches outrank detail matches"""
+        names = self.names("pen")
+        self.assertEqual(set(names), {"Blue Pen", "Notebook", "Penguin Plush"})
+        self.assertEqual(names[-1], "Notebook")
+        self.assertEqual(self.names("stat led"), [])
+        self.assertEqual(self.names("elec la"), ["Desk Lamp"])
+        self.assertEqual(len(self.names("pen", limit=1)), 1)
+        self.assertEqual(self.names("!!"), [])
+
+    def test_best_match_among_many(self):
+        """Test that an old exact name match outranks thousands of newer weak matches"""
+        self.conn.executemany('INSERT INTO products (name, details, category) VALUES (?, ?, ?)',
+                              [(f"Item {i}", "pencil case", "Stationery") for i in range(2000)])
+        self.assertEqual(set(self.names("pen", limit=2)), {"Blue Pen", "Penguin Plush"})
+
+    def test_triggers_keep_index_in_sync(self):
+        """Test that inserts, updates and deletes on the table reach the index"""
+        self.conn.execute("INSERT INTO products (name, details, category) VALUES ('Stapler', '', 'Office')")
+        self.assertEqual(self.names("stap"), ["Stapler"])
+        self.conn.execute("UPDATE products SET name = 'Red Pen' WHERE name = 'Stapler'")
+        self.assertEqual(self.names("stap"), [])
+        self.assertIn("Red Pen", self.names("red"))
+        self.conn.execute("DELETE FROM products WHERE name = 'Red Pen'")
+        self.assertEqual(self.names("red"), [])
+        # Stock changes do not touch the index
+        self.conn.execute("UPDATE products SET stock_quantity = 3")
+        self.conn.execute("INSERT INTO products_fts(products_fts) VALUES ('integrity-check')")
+
+    def test_row_factory_and_provider(self):
+        """Test dict rows through the SQL data provider"""
+        results = SQLDataProvider(self.conn).search_products("lamp")
+        self.assertEqual(results, [{"id": 4, "name": "Desk Lamp", "details": "LED",
+                                    "category": "Electronics", "stock_quantity": None}])
+        with self.assertRaises(ValueError):
+            search('suppliers', "pen", conn=self.conn)
+
+    def test_drop(self):
+        """Test that dropping removes the index and its triggers"""
+        drop_search_index(self.conn)
+        self.assertFalse(has_search_index(self.conn, 'products'))
+        self.conn.execute("INSERT INTO products (name) VALUES ('Glue')")
+        self.assertEqual(self.conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger'").fetchone()[0], 0)
+
+
+class TestModelSearch(unittest.TestCase):
+    """Test customer and invoice search through the models"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.conn = sqlite3.connect(os.path.join(self.temp_dir, "shop.db"))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('''
+            CREATE TABLE customers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, full_name TEXT,
+                contact TEXT, address TEXT, history TEXT, created_at TEXT
+            )
+        ''')
+        self.customers = CustomersModel(self.conn)
+        self.sales = SalesModel(self.conn)
+        for i, name in enumerate(["Ann Lee", "Annabel Smith", "Bob Stone", "Joanne Annis"]):
+            self.conn.execute(
+                "INSERT INTO customers (name, full_name, contact, created_at) VALUES (?, ?, ?, ?)",
+                (name, name, f"555-010{i}", f"2024-05-0{i + 1}"))
+        for i in range(30):
+            self.sales.add_sale(f"INV-2024{i % 3 + 4:02d}-{i:04d}", f"2024-05-{i % 28 + 1:02d}",
+                                i % 4 + 1, 10.0)
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_customer_search(self):
+        """Test word-prefix customer search by name and contact"""
+        names = [row["name"] for row in self.customers.get_customers("ann")]
+        self.assertEqual(names, ["Joanne Annis", "Annabel Smith", "Ann Lee"])
+        self.assertEqual([row["name"] for row in self.customers.get_customers("0102")], ["Bob Stone"])
+        page = self.customers.get_customers_page("ann", page_size=2)
+        rest = self.customers.get_customers_page("ann", after=page["next_cursor"], page_size=2)
+        self.assertEqual([row["name"] for row in rest["rows"]], ["Ann Lee"])
+
+    def test_invoice_search(self):
+        """Test invoice search by number and by customer name"""
+        sales = self.sales.get_sales(search="INV-202405", limit=100)
+        self.assertEqual(len(sales), 10)
+        self.assertTrue(all(sale["invoice_number"].startswith("INV-202405") for sale in sales))
+        self.assertEqual(len(self.sales.get_sales(search="0007", limit=100)), 1)
+        by_customer = self.sales.get_sales(search="stone", limit=100)
+        self.assertEqual({sale["customer_name"] for sale in by_customer}, {"Bob Stone"})
+        self.assertEqual(len(self.sales.get_sales(search="--", limit=100)), 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+import threading
+from datetime import datetime
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.sequences import (
+    SequenceAllocator, SQLiteSequenceStore, FirebaseSequenceStore, MemorySequenceStore, issue_invoice_number
+)
+from app.utils.local_rtdb import LocalDatabase
+from app.models.sales import SalesModel
+from app.data.data_provider import SQLDataProvider
+
+
+class TestSQLiteSequences(unittest.TestCase):
+    """Test block allocation from the sequences table"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "shop.db")
+        self.local = threading.local()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def connection(self):
+        # One connection per thread, like DatabaseManager
+        if not hasattr(self.local, "conn"):
+            self.local.conn = sqlite3.connect(self.path, timeout=10)
+        return self.local.conn
+
+    def test_concurrent_terminals_never_collide(self):
+        """Test that several allocators on several threads issue distinct numbers"""
+        allocators = [SequenceAllocator(SQLiteSequenceStore(self.connection), block_size=7) for _ in range(3)]
+        issued = []
+        lock = threading.Lock()
+
+        def work(allocator):
+            numbers = [allocator.next("invoice") for _ in range(50)]
+            with lock:
+                issued.extend(numbers)
+
+        threads = [threading.Thread(target=work, args=(allocators[i % 3],)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(issued), 300)
+        self.assertEqual(len(set(issued)), 300)
+
+    def test_one_round_trip_per_block(self):
+        """Test that numbers inside a reserved block need no statement"""
+        conn = self.connection()
+        allocator = SequenceAllocator(SQLiteSequenceStore(conn), block_size=5)
+        statements = []
+        conn.set_trace_callback(statements.append)
+        numbers = [allocator.next("invoice") for _ in range(12)]
+        conn.set_trace_callback(None)
+        self.assertEqual(numbers, list(range(1, 13)))
+        self.assertEqual(sum("RETURNING" in sql for sql in statements), 3)
+
+    def test_seed_and_restart(self):
+        """Test seeding a new counter and skipping the unused rest of a block on restart"""
+        first = SequenceAllocator(SQLiteSequenceStore(self.connection), block_size=10)
+        self.assertEqual(first.next("invoice", lambda: 41), 42)
+        restarted = SequenceAllocator(SQLiteSequenceStore(self.connection), block_size=10)
+        self.assertEqual(restarted.next("invoice", lambda: 0), 52)
+
+
+class TestInvoiceNumbers(unittest.TestCase):
+    """Test invoice numbering through the sales model and data providers"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.conn = sqlite3.connect(os.path.join(self.temp_dir, "shop.db"))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('CREATE TABLE customers (id INTEGER PRIMARY KEY, full_name TEXT)')
+        self.sales = SalesModel(self.conn)
+        self.prefix = datetime.now().strftime('INV-%Y%m')
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_continues_after_existing_invoices(self):
+        """Test that a month's numbering starts after invoices already on file"""
+        self.sales.add_sale(f"{self.prefix}-0041", "2024-05-01", None, 10)
+        self.sales.add_sale("INV-199901-0999", "1999-01-01", None, 10)
+        self.assertEqual(self.sales.generate_invoice_number(), f"{self.prefix}-0042")
+        self.assertEqual(SQLDataProvider(self.conn).next_invoice_number(), f"{self.prefix}-0062")
+
+    def test_format_and_monthly_restart(self):
+        """Test the INV-YYYYMM-NNNN format and a fresh count each month"""
+        allocator = SequenceAllocator(MemorySequenceStore())
+        self.assertEqual(issue_invoice_number(allocator, when=datetime(2024, 1, 31)), "INV-202401-0001")
+        self.assertEqual(issue_invoice_number(allocator, when=datetime(2024, 1, 31)), "INV-202401-0002")
+        self.assertEqual(issue_invoice_number(allocator, when=datetime(2024, 2, 1)), "INV-202402-0001")
+
+
+class TestFirebaseSequences(unittest.TestCase):
+    """Test counters kept in the Realtime Database"""
+
+    def test_shared_counter(self):
+        """Test that terminals sharing a counters node get disjoint blocks"""
+        database = LocalDatabase({"counters": {"sales": 100}})
+        counters = database.reference("counters")
+        till_a = SequenceAllocator(FirebaseSequenceStore(counters), block_size=3)
+        till_b = SequenceAllocator(FirebaseSequenceStore(counters), block_size=3)
+        self.assertEqual([till_a.next("sales"), till_b.next("sales"), till_a.next("sales")], [101, 104, 102])
+        self.assertEqual(till_a.next("invoice", lambda: 9), 10)
+        self.assertEqual(counters.get(), {"sales": 106, "invoice": 12})
+        self.assertEqual(database.request_count, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
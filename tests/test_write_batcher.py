@@ -0,0 +1,122 @@
+import unittest
+import sys
+import os
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.local_rtdb import LocalDatabase
+from app.utils.firebase_replica import FirebaseReplica
+from app.utils.write_batcher import WriteBatcher, BatchResult
+
+
+class GuardedReference:
+    """Reference that rejects any update touching a locked product, like a security rule"""
+
+    def __init__(self, ref, locked):
+        self.ref = ref
+        self.locked = locked
+        self.path = ref.path
+
+    def update(self, value):
+        if any(path.split('/')[0] in self.locked for path in value):
+            raise PermissionError("Permission denied")
+        self.ref.update(value)
+
+
+class TestWriteBatcher(unittest.TestCase):
+    """Test multi-location batched writes against the local RTDB stand-in"""
+
+    def setUp(self):
+        self.database = LocalDatabase({
+            "inventory": {f"p{i}": {"name": f"Item {i}", "category": "Toys", "quantity": i} for i in range(2000)}
+        })
+        self.ref = self.database.reference("inventory")
+
+    def tearDown(self):
+        FirebaseReplica.reset_registry()
+
+    def test_bulk_recategorize_in_one_request(self):
+        """Test that 2,000 product updates go out as a single update call"""
+        replica = FirebaseReplica.for_reference(self.ref)
+        replica.ensure_loaded()
+        before = self.database.request_count
+        result = BatchResult()
+        batch = WriteBatcher(self.ref, on_written=lambda path, value: replica.patch(
+            path.split('/')[0], {path.split('/', 1)[1]: value}), on_flush=result.merge)
+        for i in range(2000):
+            batch.update(f"p{i}", {"category": "Other"})
+        batch.flush()
+        self.assertEqual(self.database.request_count - before, 1)
+        self.assertEqual((result.requests, len(result.keys()), result.ok), (1, 2000, True))
+        self.assertEqual(self.ref.child("p1999").get()["category"], "Other")
+        self.assertEqual(replica.get("p5")["category"], "Other")
+
+    def test_size_flush_and_coalescing(self):
+        """Test flushing at max_paths and merging writes to the same or nested paths"""
+        batch = WriteBatcher(self.ref, max_paths=3)
+        batch.set("p1/quantity", 5)
+        batch.set("p1/quantity", 6)
+        batch.delete("p2")
+        batch.update("p2", {"name": "Restored"})
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(self.database.request_count, 0)
+        batch.set("p3/quantity", 0)
+        self.assertEqual((len(batch), self.database.request_count), (0, 1))
+        self.assertEqual(self.ref.child("p1").get()["quantity"], 6)
+        self.assertEqual(self.ref.child("p2").get(), {"name": "Restored"})
+
+    def test_timed_flush(self):
+        """Test that pending writes go out max_delay after the first one"""
+        flushed = []
+        batch = WriteBatcher(self.ref, max_delay=0.05, on_flush=flushed.append)
+        batch.update("p1", {"quantity": 99})
+        batch.update("p2", {"quantity": 98})
+        deadline = time.time() + 2
+        while not flushed and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(flushed[0].requests, 1)
+        self.assertEqual(self.ref.child("p2").get()["quantity"], 98)
+
+    def test_per_path_failures(self):
+        """Test that a rejected batch is split to isolate the failing paths"""
+        batch = WriteBatcher(GuardedReference(self.ref, {"p7"}))
+        for i in range(16):
+            batch.update(f"p{i}", {"category": "Other"})
+        result = batch.flush()
+        self.assertEqual(set(result.failed), {"p7/category"})
+        self.assertIsInstance(result.failed["p7/category"], PermissionError)
+        self.assertEqual(len(result.written), 15)
+        self.assertLessEqual(result.requests, 1 + 2 * 4)
+        self.assertEqual(self.ref.child("p7").get()["category"], "Toys")
+        self.assertEqual(self.ref.child("p8").get()["category"], "Other")
+
+    def test_unreachable_batch_is_not_split(self):
+        """Test that a batch lost in transit fails as a whole after one request"""
+        class Unreachable:
+            path = "/inventory"
+
+            def update(self, value):
+                raise ConnectionError("Network is unreachable")
+
+        batch = WriteBatcher(Unreachable())
+        for i in range(2000):
+            batch.update(f"p{i}", {"category": "Other"})
+        result = batch.flush()
+        self.assertEqual((result.requests, len(result.failed), len(result.written)), (1, 2000, 0))
+
+    def test_context_manager(self):
+        """Test flushing on exit and discarding on error"""
+        with WriteBatcher(self.ref) as batch:
+            batch.update("p1", {"quantity": 1000})
+        self.assertEqual(self.ref.child("p1").get()["quantity"], 1000)
+        with self.assertRaises(RuntimeError):
+            with WriteBatcher(self.ref) as batch:
+                batch.update("p1", {"quantity": -1})
+                raise RuntimeError("abort")
+        self.assertEqual(self.ref.child("p1").get()["quantity"], 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.write_behind import WriteBehindQueue
+
+
+class RecordingStore:
+    """send() target that records each call and fails the keys it is told to"""
+
+    def __init__(self, fail_times=None, delay=0.0):
+        self.calls = []
+        self.data = {}
+        self.fail_times = dict(fail_times or {})
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def send(self, updates):
+        time.sleep(self.delay)
+        with self.lock:
+            self.calls.append(updates)
+            failed = {}
+            for key, fields in updates.items():
+                if self.fail_times.get(key, 0):
+                    self.fail_times[key] -= 1
+                    failed[key] = ConnectionError("offline")
+                else:
+                    self.data.setdefault(key, {}).update(fields)
+            return failed
+
+
+class TestWriteBehindQueue(unittest.TestCase):
+    """Test background persistence of optimistic edits"""
+
+    def setUp(self):
+        self.failures = []
+        self.queues = []
+
+    def tearDown(self):
+        for queue in self.queues:
+            queue.close(timeout=5)
+
+    def make_queue(self, store, **kwargs):
+        kwargs.setdefault('delay', 0.05)
+        kwargs.setdefault('backoff', 0.01)
+        queue = WriteBehindQueue(store.send, on_failure=lambda *args: self.failures.append(args), **kwargs)
+        self.queues.append(queue)
+        return queue
+
+    def test_rapid_edits_coalesce(self):
+        """Test that a burst of edits becomes one send with one entry per row"""
+        store = RecordingStore()
+        queue = self.make_queue(store, delay=0.2)
+        started = time.perf_counter()
+        for i in range(300):
+            queue.enqueue(f"p{i % 3}", {"quantity": i, f"field{i % 2}": i}, {"quantity": 0})
+        # Enqueueing never waits on the store
+        self.assertLess(time.perf_counter() - started, 0.1)
+        self.assertTrue(queue.flush(timeout=5))
+        self.assertEqual(len(store.calls), 1)
+        self.assertEqual(store.data["p2"], {"quantity": 299, "field1": 299, "field0": 296})
+        self.assertFalse(queue.is_dirty("p2"))
+
+    def test_retry_then_success(self):
+        """Test that a key failing fewer than max_attempts times is still written"""
+        store = RecordingStore(fail_times={"p1": 2})
+        queue = self.make_queue(store, max_attempts=3)
+        queue.enqueue("p1", {"quantity": 5}, {"quantity": 1})
+        self.assertTrue(queue.flush(timeout=5))
+        self.assertEqual(len(store.calls), 3)
+        self.assertEqual(store.data["p1"], {"quantity": 5})
+        self.assertEqual(self.failures, [])
+
+    def test_failure_rolls_back_to_confirmed_value(self):
+        """Test rollback to the value before the first unsaved edit"""
+        store = RecordingStore(fail_times={"p1": 10})
+        queue = self.make_queue(store, max_attempts=2)
+        queue.enqueue("p1", {"quantity": 5, "name": "Pen"}, {"quantity": 1, "name": "Old"})
+        queue.enqueue("p1", {"quantity": 6}, {"quantity": 5})
+        self.assertTrue(queue.flush(timeout=5))
+        self.assertEqual(len(store.calls), 2)
+        self.assertEqual(len(self.failures), 1)
+        key, rollback, message = self.failures[0]
+        self.assertEqual((key, rollback, message), ("p1", {"quantity": 1, "name": "Old"}, "offline"))
+        self.assertFalse(queue.is_dirty("p1"))
+
+    def test_newer_edit_survives_failed_write(self):
+        """Test that a field edited again while its write fails is not rolled back"""
+        store = RecordingStore(fail_times={"p1": 1}, delay=0.1)
+        queue = self.make_queue(store, max_attempts=1, delay=0.0)
+        queue.enqueue("p1", {"quantity": 5, "name": "Pen"}, {"quantity": 1, "name": "Old"})
+        time.sleep(0.05)  # first write is in flight
+        queue.enqueue("p1", {"quantity": 7}, {"quantity": 5})
+        self.assertTrue(queue.flush(timeout=5))
+        self.assertEqual(self.failures[0][1], {"name": "Old"})
+        self.assertEqual(store.data["p1"], {"quantity": 7})
+
+    def test_discard(self):
+        """Test that discarded edits are never sent"""
+        store = RecordingStore()
+        queue = self.make_queue(store, delay=0.5)
+        queue.enqueue("p1", {"quantity": 5})
+        queue.discard("p1")
+        self.assertTrue(queue.flush(timeout=5))
+        self.assertEqual(store.calls, [])
+
+
+if __name__ == '__main__':
+    unittest.main()